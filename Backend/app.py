@@ -16,16 +16,31 @@ import re
 import hashlib
 import json
 
-from flask import Flask, jsonify, request, render_template, redirect, url_for, flash
+from flask import Flask, Response, jsonify, request, render_template, redirect, url_for, flash, stream_with_context
 from flask_cors import CORS
 
 from services.topic_manager import get_random_topic, get_recent_topics, add_topic as add_topic_manager
-from services.question_generator import generate_dsa_question, generate_random_faang_question
-from services.codeCompiler import compile_code
-from services.submitCode import submit_code
+from services.question_generator import generate_dsa_question, generate_random_faang_question, stream_dsa_question
+from services.codeCompiler import BUILD_PROFILES, DEFAULT_PROFILE, compile_code, run_batch
+from services.complexity import profile_complexity
+from services.output_checker import CHECKER_MODES
+from services.compile_cache import compile_cache, make_cache_key
+from services.execution_pool import ExecutionPoolFull, execution_pool
+from services.job_store import job_store
+from services.single_flight import SingleFlightTimeout, compile_flight
+from services.cgroup_sandbox import cgroup_sandbox
+from services.python_pool import python_pool
+from services.node_pool import node_pool
+from services.java_server import java_compile_server, java_runner_pools
+from services.pch import pch_manager
+from services.workspace import workspace_manager
+from services.warmup import warmup
+from services.interactive import interactive_server
+from services.submitCode import stream_submit_code, submit_code
 from services.firebase_service import FirebaseService
-from services.askHelpToAI import ask_help_to_ai
-from config.config import get_gemini_readiness, get_llm_readiness, get_openrouter_readiness
+from services.askHelpToAI import ask_help_to_ai, stream_ask_help_to_ai
+from config.config import get_gemini_readiness, get_llm_readiness, get_llm_stats, get_openrouter_readiness
+from config.llm_cache import llm_cache
 from services.language_utils import normalize_language
 from services.github_service import GitHubService
 from services.question_cache import init_cache, QuestionCache, cache_question
@@ -47,6 +62,12 @@ load_dotenv()
 # Create Flask app
 app = Flask(__name__)
 
+# Compile and run a tiny program per language in the background; /health reports
+# "warming_up" until this finishes.
+warmup.start()
+# Interactive runs (live stdin/stdout over WebSocket) are served on INTERACTIVE_PORT.
+interactive_server.start()
+
 # Initialize cache
 init_cache(app)
 
@@ -119,6 +140,80 @@ def write_topics(topics):
     except Exception as e:
         return False
 
+def invalid_profile_response(profile):
+    """400 returned for a build profile that does not exist."""
+    return jsonify({
+        'result': 'Failure',
+        'message': f"Unknown build profile '{profile}'. Use one of: {', '.join(BUILD_PROFILES)}."
+    }), 400
+
+def execution_busy_response(error):
+    """503 returned when the code execution queue is full or a shared run takes too long."""
+    response = jsonify({
+        'result': 'Failure',
+        'message': str(error),
+        'retry_after': error.retry_after,
+    })
+    response.status_code = 503
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+def sse_response(events):
+    """Stream ``(event, data)`` pairs as Server-Sent Events; a failure mid-stream becomes an ``error`` event."""
+    def generate():
+        try:
+            for event, data in events:
+                payload = {'text': data} if event == 'token' else data
+                yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+        except ExecutionPoolFull as e:
+            yield f"event: error\ndata: {json.dumps({'message': str(e), 'retry_after': e.retry_after})}\n\n"
+        except Exception as e:
+            logger.exception("Streaming response failed")
+            yield f"event: error\ndata: {json.dumps({'message': str(e)})}\n\n"
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+
+def parse_submission(data):
+    """Validate a ``/submit`` body; returns ``(submit_code keyword arguments, error_response)``."""
+    actualSolution = data.get('actualSolution')
+    description = data.get('description')
+    typedSolution = data.get('typedSolution')
+    typedLanguage = data.get('language')
+    mode = str(data.get('mode', 'llm')).strip().lower()
+    testcases = data.get('testcases')
+    hidden_testcases = data.get('hidden_testcases') or data.get('hiddenTestcases')
+    narrative = bool(data.get('narrative', False))
+    profile = bool(data.get('profile', False))
+    checker = str(data.get('checker') or 'token').strip().lower()
+
+    if not all([description, typedSolution, typedLanguage]):
+        return None, (jsonify({
+            'result': 'Failure',
+            'message': 'Missing required fields in submission.'
+        }), 400)
+
+    if checker not in CHECKER_MODES:
+        return None, (jsonify({
+            'result': 'Failure',
+            'message': f"Unknown checker '{checker}'. Use one of: {', '.join(CHECKER_MODES)}."
+        }), 400)
+
+    return {
+        'actualSolution': actualSolution,
+        'description': description,
+        'typedSolution': typedSolution,
+        'typedLanguage': typedLanguage,
+        'testcases': testcases if isinstance(testcases, list) else None,
+        'hidden_testcases': hidden_testcases if isinstance(hidden_testcases, list) else None,
+        'mode': mode,
+        'narrative': narrative,
+        'profile': profile,
+        'checker': checker,
+    }, None
+
 @app.route('/submit', methods=['POST'])
 @limiter.limit("50 per minute")
 def submit():
@@ -131,20 +226,15 @@ def submit():
         }), 400
 
     try:
-        actualSolution = data.get('actualSolution')
-        description = data.get('description')
-        typedSolution = data.get('typedSolution')
-        typedLanguage = data.get('language')
+        arguments, error_response = parse_submission(data)
+        if error_response is not None:
+            return error_response
 
-        if not all([description, typedSolution, typedLanguage]):
-            return jsonify({
-                'result': 'Failure',
-                'message': 'Missing required fields in submission.'
-            }), 400
-
-        result = submit_code(actualSolution, description, typedSolution, typedLanguage)
-        return jsonify(result)
+        # Judge mode queues its runs on the execution pool itself and raises ExecutionPoolFull when it is full.
+        return jsonify(submit_code(**arguments))
 
+    except ExecutionPoolFull as e:
+        return execution_busy_response(e)
     except Exception as e:
         logger.exception("Error while processing submission")
         return jsonify({
@@ -152,6 +242,36 @@ def submit():
             'message': f'Error while processing submission: {str(e)}'
         }), 500
 
+@app.route('/submit/stream', methods=['POST'])
+@limiter.limit("50 per minute")
+def submit_stream():
+    """Server-Sent Events variant of ``/submit``: evaluation tokens, then the usual result."""
+    data = request.get_json(silent=True)
+    if data is None:
+        return jsonify({
+            'result': 'Failure',
+            'message': 'Invalid request format. JSON required.'
+        }), 400
+
+    try:
+        arguments, error_response = parse_submission(data)
+        if error_response is not None:
+            return error_response
+
+        if arguments['mode'] == 'judge':
+            # Judge reports come from running code, not from the LLM, so there is nothing to stream.
+            return sse_response(iter([('done', submit_code(**arguments))]))
+        return sse_response(stream_submit_code(**arguments))
+
+    except ExecutionPoolFull as e:
+        return execution_busy_response(e)
+    except Exception as e:
+        logger.exception("Error while processing streamed submission")
+        return jsonify({
+            'result': 'Failure',
+            'message': f'Error while processing submission: {str(e)}'
+        }), 500
+
 @limiter.limit("10 per minute")
 @app.route('/compiler', methods=['POST'])
 def compile():
@@ -179,9 +299,28 @@ def compile():
                 'message': 'cannot compile empty code'
             }), 400
 
-        result = compile_code(code, lang)
+        profile = str(data.get('profile') or DEFAULT_PROFILE).strip().lower()
+        if profile not in BUILD_PROFILES:
+            return invalid_profile_response(profile)
+
+        run_async = request.args.get('async', str(data.get('async', 'false'))).lower() == 'true'
+        if run_async:
+            job = job_store.submit(compile_code, code, lang, profile)
+            return jsonify({
+                'status': 'pending',
+                'job_id': job.job_id,
+                'check_url': f'/compiler/jobs/{job.job_id}'
+            }), 202
+
+        # Identical concurrent runs (e.g. a class pressing Run on the same starter
+        # code) share one execution; /compiler has no stdin, so it hashes as empty.
+        # Waiting callers still take a queue slot, so the usual 503 applies.
+        flight_key = make_cache_key('compile', lang, profile, code, '')
+        result = compile_flight.do(flight_key, execution_pool.run, compile_code, code, lang, profile)
         return jsonify(result)
 
+    except (ExecutionPoolFull, SingleFlightTimeout) as e:
+        return execution_busy_response(e)
     except Exception as e:
         logger.exception("Error while compiling code")
         return jsonify({
@@ -189,6 +328,113 @@ def compile():
             'message': f'Error while compiling: {str(e)}'
         }), 500
 
+COMPILE_JOB_MAX_WAIT_SECONDS = float(os.getenv('COMPILE_JOB_MAX_WAIT_SECONDS', '30'))
+
+@app.route('/compiler/jobs/<job_id>', methods=['GET'])
+def compile_job_status(job_id):
+    """Fetch an async compile job; ``?wait=N`` long-polls up to N seconds for it to finish."""
+    try:
+        wait = min(max(float(request.args.get('wait', 0)), 0), COMPILE_JOB_MAX_WAIT_SECONDS)
+    except ValueError:
+        return jsonify({
+            'result': 'Failure',
+            'message': 'wait must be a number of seconds.'
+        }), 400
+
+    job = job_store.get(job_id, wait=wait)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict())
+
+MAX_BATCH_INPUTS = int(os.getenv('MAX_BATCH_INPUTS', '50'))
+
+@app.route('/compiler/batch', methods=['POST'])
+@limiter.limit("10 per minute")
+def compile_batch():
+    """Compile code once and run it against a list of stdin inputs."""
+    data = request.get_json(silent=True)
+    if data is None:
+        return jsonify({
+            'result': 'Failure',
+            'message': 'Invalid request format. JSON required.'
+        }), 400
+
+    try:
+        lang = normalize_language(data.get('lang') or data.get('language'))
+        code = data.get('code')
+        inputs = data.get('inputs')
+
+        if not lang or code is None or not isinstance(inputs, list):
+            return jsonify({
+                'result': 'Failure',
+                'message': 'Language, code, and an inputs array are required.'
+            }), 400
+
+        if not code.strip():
+            return jsonify({
+                'result': 'Failure',
+                'message': 'cannot compile empty code'
+            }), 400
+
+        profile = str(data.get('profile') or DEFAULT_PROFILE).strip().lower()
+        if profile not in BUILD_PROFILES:
+            return invalid_profile_response(profile)
+
+        if len(inputs) > MAX_BATCH_INPUTS:
+            return jsonify({
+                'result': 'Failure',
+                'message': f'At most {MAX_BATCH_INPUTS} inputs are allowed per batch.'
+            }), 400
+
+        result = execution_pool.run(run_batch, code, lang, [str(item) for item in inputs], profile=profile)
+        return jsonify(result)
+
+    except ExecutionPoolFull as e:
+        return execution_busy_response(e)
+    except Exception as e:
+        logger.exception("Error while running batch")
+        return jsonify({
+            'result': 'Failure',
+            'message': f'Error while running batch: {str(e)}'
+        }), 500
+
+@app.route('/profile', methods=['POST'])
+@limiter.limit("5 per minute")
+def profile():
+    """Measure how a solution's running time grows with input size, optionally against the reference."""
+    data = request.get_json(silent=True)
+    if data is None:
+        return jsonify({
+            'result': 'Failure',
+            'message': 'Invalid request format. JSON required.'
+        }), 400
+
+    try:
+        lang = normalize_language(data.get('lang') or data.get('language'))
+        code = data.get('code')
+        sample_input = data.get('sampleInput')
+        testcases = data.get('testcases')
+        if sample_input is None and isinstance(testcases, list) and testcases and isinstance(testcases[0], dict):
+            sample_input = testcases[0].get('input')
+
+        if not lang or not code or not code.strip() or sample_input is None:
+            return jsonify({
+                'result': 'Failure',
+                'message': 'Language, code, and a sample input (sampleInput or testcases) are required.'
+            }), 400
+
+        result = execution_pool.run(profile_complexity, code, lang, str(sample_input), data.get('actualSolution'))
+        return jsonify(result)
+
+    except ExecutionPoolFull as e:
+        return execution_busy_response(e)
+    except Exception as e:
+        logger.exception("Error while profiling code")
+        return jsonify({
+            'result': 'Failure',
+            'message': f'Error while profiling: {str(e)}'
+        }), 500
+
 @app.route('/changeLanguage', methods=['POST'])
 def changeLanguage():
     """Convert the initial code from one language to another language"""
@@ -232,6 +478,90 @@ def generate_dsa_question_with_retry(topic, max_retries=3):
             else:
                 raise
 
+def resolve_question_topic():
+    """Resolve the ``topic`` query parameter (or a random topic); returns ``(topic_name, error_response)``."""
+    FirebaseService.initialize()
+
+    # Get topic from query parameter
+    topic_name = request.args.get('topic', '').strip()
+
+    # If no topic, get random
+    if not topic_name:
+        topic_details = FirebaseService.get_random_topic()
+        if not topic_details:
+            return None, (jsonify({'error': 'No topics available.'}), 404)
+        return topic_details['name'], None
+
+    resolved_topic = FirebaseService.find_topic(topic_name)
+    if not resolved_topic:
+        return None, (jsonify({'error': f"Topic '{topic_name}' was not found."}), 404)
+    topic_name = resolved_topic['name']
+    FirebaseService.track_topic_usage(topic_name)
+    return topic_name, None
+
+def question_prompt_topic(topic_name):
+    """Topic as given to the LLM: without the numeric prefix and dashes."""
+    processed_topic = re.sub(r'^\d+-', '', topic_name)
+    return processed_topic.replace('-', ' ')
+
+def finish_generated_question(topic_name, result, started_at):
+    """Attach topic and difficulty to a generated question and cache it."""
+    # Ensure topic is a string and clean it up
+    topic_str = str(topic_name).strip()
+    result['topic'] = topic_str
+
+    # Get the topic details including difficulty from Firestore
+    topics = FirebaseService.get_all_topics()
+
+    # Find the topic details
+    topic_details = {}
+    for t in topics:
+        try:
+            if 'name' in t and t['name'] and isinstance(t['name'], str):
+                if t['name'].lower() == topic_str.lower():
+                    topic_details = t
+                    break
+        except (AttributeError, TypeError):
+            continue
+
+    result['difficulty'] = topic_details.get('difficulty', 'medium').lower() if isinstance(topic_details, dict) else 'medium'
+
+    # Cache the result
+    QuestionCache.set_question(topic_name, result)
+
+    elapsed = time.perf_counter() - started_at
+    logger.info("Generated DSA question for topic '%s' in %.2fs", topic_str, elapsed)
+    result['from_cache'] = False
+    result['generation_time'] = elapsed
+    return result
+
+@app.route('/get_dsa_question/stream', methods=['GET'])
+@limiter.limit("30 per minute")
+def get_dsa_question_stream():
+    """Server-Sent Events variant of ``/get_dsa_question``: markdown tokens, then the question."""
+    started_at = time.perf_counter()
+    try:
+        topic_name, error_response = resolve_question_topic()
+        if error_response is not None:
+            return error_response
+    except Exception as e:
+        logger.exception("Error resolving topic for streamed question")
+        return jsonify({'error': f'Failed to generate question: {str(e)}'}), 500
+
+    cached_question = QuestionCache.get_question(topic_name)
+    if cached_question:
+        cached_question['from_cache'] = True
+        cached_question['generation_time'] = time.perf_counter() - started_at
+        return sse_response(iter([('done', cached_question)]))
+
+    def events():
+        for event, data in stream_dsa_question(question_prompt_topic(topic_name)):
+            if event == 'done':
+                data = finish_generated_question(topic_name, data, started_at)
+            yield event, data
+
+    return sse_response(events())
+
 @app.route('/get_dsa_question', methods=['GET'])
 @limiter.limit("30 per minute")
 def get_dsa_question():
@@ -241,24 +571,10 @@ def get_dsa_question():
     """
     started_at = time.perf_counter()
     try:
-        FirebaseService.initialize()
-
-        # Get topic from query parameter
-        topic_name = request.args.get('topic', '').strip()
         force_async = request.args.get('async', 'false').lower() == 'true'
-
-        # If no topic, get random
-        if not topic_name:
-            topic_details = FirebaseService.get_random_topic()
-            if not topic_details:
-                return jsonify({'error': 'No topics available.'}), 404
-            topic_name = topic_details['name']
-        else:
-            resolved_topic = FirebaseService.find_topic(topic_name)
-            if not resolved_topic:
-                return jsonify({'error': f"Topic '{topic_name}' was not found."}), 404
-            topic_name = resolved_topic['name']
-            FirebaseService.track_topic_usage(topic_name)
+        topic_name, error_response = resolve_question_topic()
+        if error_response is not None:
+            return error_response
 
         # Check cache first
         cached_question = QuestionCache.get_question(topic_name)
@@ -286,40 +602,9 @@ def get_dsa_question():
                 'check_url': f'/check_question_status/{request_id}'
             }), 202
 
-        processed_topic = re.sub(r'^\d+-', '', topic_name)
-        processed_topic = processed_topic.replace('-', ' ')
-
         # Synchronous generation with retry
-        result = generate_dsa_question_with_retry(processed_topic)
-
-        # Ensure topic is a string and clean it up
-        topic_str = str(topic_name).strip()
-        result['topic'] = topic_str
-
-        # Get the topic details including difficulty from Firestore
-        topics = FirebaseService.get_all_topics()
-
-        # Find the topic details
-        topic_details = {}
-        for t in topics:
-            try:
-                if 'name' in t and t['name'] and isinstance(t['name'], str):
-                    if t['name'].lower() == topic_str.lower():
-                        topic_details = t
-                        break
-            except (AttributeError, TypeError):
-                continue
-
-        result['difficulty'] = topic_details.get('difficulty', 'medium').lower() if isinstance(topic_details, dict) else 'medium'
-
-        # Cache the result
-        QuestionCache.set_question(topic_name, result)
-
-        elapsed = time.perf_counter() - started_at
-        logger.info("Generated DSA question for topic '%s' in %.2fs", topic_str, elapsed)
-        result['from_cache'] = False
-        result['generation_time'] = elapsed
-        return jsonify(result)
+        result = generate_dsa_question_with_retry(question_prompt_topic(topic_name))
+        return jsonify(finish_generated_question(topic_name, result, started_at))
 
     except Exception as e:
         elapsed = time.perf_counter() - started_at
@@ -749,10 +1034,16 @@ def health_check():
     llm_ready, llm_message = get_llm_readiness()
     gemini_ready, gemini_message = get_gemini_readiness()
     openrouter_ready, openrouter_message = get_openrouter_readiness()
-    is_healthy = firebase_ready and llm_ready
+    execution = warmup.stats()
+    is_healthy = firebase_ready and llm_ready and execution['ready']
+
+    if not execution['ready']:
+        status = 'warming_up'
+    else:
+        status = 'healthy' if is_healthy else 'degraded'
 
     return jsonify({
-        'status': 'healthy' if is_healthy else 'degraded',
+        'status': status,
         'services': {
             'firebase': {
                 'ready': firebase_ready,
@@ -770,6 +1061,7 @@ def health_check():
                 'ready': llm_ready,
                 'message': llm_message,
             },
+            'execution': execution,
         },
     }), 200 if is_healthy else 503
 
@@ -884,6 +1176,23 @@ def log_error(message, print_to_console=True):
         print(f"Error in log_error: {str(e)}", flush=True)
         traceback.print_exc()
 
+def parse_ask_help(data):
+    """Validate an ask-help body; returns ``(ask_help_to_ai arguments, error_response)``."""
+    message = data.get('message', '')
+    language = data.get('language', 'cpp')
+    problem_description = data.get('problemDescription') or data.get('problem Description', '')
+    problem_topic = data.get('problemTopic') or data.get('problem Topic', '')
+    initial_code = data.get('initialCode') or data.get('initial code', '')
+    user_code_progress = data.get('userCodeProgress') or data.get('user_code_progress', '')
+
+    if not message or not problem_description or not problem_topic:
+        return None, (jsonify({
+            'success': False,
+            'error': 'Message, problem description, and problem topic are required.'
+        }), 400)
+
+    return (message, language, problem_description, problem_topic, initial_code, user_code_progress), None
+
 @app.route('/api/ask-help-to-ai', methods=['POST'])
 def api_ask_help_to_ai():
     """
@@ -915,20 +1224,11 @@ def api_ask_help_to_ai():
         }), 400
 
     try:
-        message = data.get('message', '')
-        language = data.get('language', 'cpp')
-        problem_description = data.get('problemDescription') or data.get('problem Description', '')
-        problem_topic = data.get('problemTopic') or data.get('problem Topic', '')
-        initial_code = data.get('initialCode') or data.get('initial code', '')
-        user_code_progress = data.get('userCodeProgress') or data.get('user_code_progress', '')
-
-        if not message or not problem_description or not problem_topic:
-            return jsonify({
-                'success': False,
-                'error': 'Message, problem description, and problem topic are required.'
-            }), 400
+        arguments, error_response = parse_ask_help(data)
+        if error_response is not None:
+            return error_response
 
-        response = ask_help_to_ai(message, language, problem_description, problem_topic, initial_code, user_code_progress)
+        response = ask_help_to_ai(*arguments)
         return jsonify(response) 
 
     except Exception as e:
@@ -938,6 +1238,21 @@ def api_ask_help_to_ai():
             'error': f'Failed to process request: {str(e)}'
         }), 500
 
+@app.route('/api/ask-help-to-ai/stream', methods=['POST'])
+def api_ask_help_to_ai_stream():
+    """Server-Sent Events variant of ``/api/ask-help-to-ai``: answer tokens, then the usual response."""
+    data = request.get_json(silent=True)
+    if data is None:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid request format. JSON required.'
+        }), 400
+
+    arguments, error_response = parse_ask_help(data)
+    if error_response is not None:
+        return error_response
+    return sse_response(stream_ask_help_to_ai(*arguments))
+
 @app.route('/api/all-topics', methods=['GET'])
 def api_all_topics():
     """
@@ -992,6 +1307,20 @@ def cache_stats():
         stats = {
             'cached_questions': len(QuestionCache.get_cached_questions()),
             'queue_size': async_generator._queue.qsize() if async_generator._queue else 0,
+            'compile_cache': compile_cache.stats(),
+            'execution_pool': execution_pool.stats(),
+            'python_pool': python_pool.stats(),
+            'node_pool': node_pool.stats(),
+            'interactive': interactive_server.stats(),
+            'llm_cache': llm_cache.stats(),
+            'llm': get_llm_stats(),
+            'java_compile_server': java_compile_server.stats(),
+            'java_pool': {profile: pool.stats() for profile, pool in java_runner_pools.items()},
+            'pch': pch_manager.stats(),
+            'workspaces': workspace_manager.stats(),
+            'compile_jobs': job_store.stats(),
+            'compile_single_flight': compile_flight.stats(),
+            'cgroup_sandbox': cgroup_sandbox.stats(),
         }
         return jsonify(stats)
     except Exception as e:
@@ -0,0 +1,359 @@
+"""
+Latency benchmark for the compile/run path in ``services.codeCompiler``.
+
+Run from the Backend directory::
+
+    python -m benchmarks.bench_execution --iterations 20 --output bench.json
+    python -m benchmarks.bench_execution --baseline bench.json
+
+Every case is measured twice. "cold" runs get a unique source each time, so
+every run compiles from scratch (a compile-cache miss). "warm" runs repeat one
+source, so they hit the compile cache and the pre-started worker pools.
+
+The "python/pool" and "javascript/pool" cases isolate the interpreter pools: "cold" starts a
+fresh process for the script, "warm" hands it to a pre-started one. Each warm
+run first waits for the pool to refill, i.e. traffic below saturation, which
+is the situation the pool is sized for.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+from services.codeCompiler import (BUILD_PROFILES, COMPILERS, DEFAULT_PROFILE, SOURCE_FILES, _run_process,
+                                   compile_code, toolchain_version)
+from services.language_utils import LANGUAGE_LABELS
+from services.node_pool import node_pool
+from services.python_pool import python_pool
+from services.workspace import workspace_manager
+
+RUNTIMES = {
+    'c': 'gcc',
+    'cpp': 'g++',
+    'java': 'java',
+    'javascript': 'node',
+    'python': 'python3',
+}
+
+COMMENT_PREFIX = {
+    'c': '//',
+    'cpp': '//',
+    'java': '//',
+    'javascript': '//',
+    'python': '#',
+}
+
+HELLO_WORLD = {
+    'c': '#include <stdio.h>\nint main() { printf("hello\\n"); return 0; }\n',
+    'cpp': '#include <iostream>\nint main() { std::cout << "hello" << std::endl; return 0; }\n',
+    'java': 'public class Main { public static void main(String[] args) { System.out.println("hello"); } }\n',
+    'javascript': 'console.log("hello");\n',
+    'python': 'print("hello")\n',
+}
+
+CPU_LOOP = {
+    'c': """#include <stdio.h>
+int main() {
+    unsigned long long acc = 0;
+    for (unsigned long long i = 0; i < 50000000ULL; i++) acc += i % 7;
+    printf("%llu\\n", acc);
+    return 0;
+}
+""",
+    'cpp': """#include <iostream>
+int main() {
+    unsigned long long acc = 0;
+    for (unsigned long long i = 0; i < 50000000ULL; i++) acc += i % 7;
+    std::cout << acc << std::endl;
+    return 0;
+}
+""",
+    'java': """public class Main {
+    public static void main(String[] args) {
+        long acc = 0;
+        for (long i = 0; i < 50000000L; i++) acc += i % 7;
+        System.out.println(acc);
+    }
+}
+""",
+    'javascript': """let acc = 0;
+for (let i = 0; i < 50000000; i++) acc += i % 7;
+console.log(acc);
+""",
+    'python': """acc = 0
+for i in range(2000000):
+    acc += i % 7
+print(acc)
+""",
+}
+
+STL_HEAVY_CPP = """#include <bits/stdc++.h>
+using namespace std;
+int main() {
+    vector<int> values(200000);
+    iota(values.begin(), values.end(), 0);
+    shuffle(values.begin(), values.end(), mt19937(42));
+    sort(values.begin(), values.end());
+    map<int, int> counts;
+    unordered_map<int, string> names;
+    for (int v : values) {
+        counts[v % 1000]++;
+        names[v % 5000] = to_string(v);
+    }
+    set<string> unique;
+    for (auto &entry : names) unique.insert(entry.second);
+    cout << counts.size() << " " << unique.size() << endl;
+    return 0;
+}
+"""
+
+JAVA_COLLECTIONS = """import java.util.*;
+
+public class Main {
+    public static void main(String[] args) {
+        List<Integer> values = new ArrayList<>();
+        for (int i = 0; i < 200000; i++) values.add(i);
+        Collections.shuffle(values, new Random(42));
+        Collections.sort(values);
+        Map<Integer, Integer> counts = new HashMap<>();
+        TreeMap<Integer, String> names = new TreeMap<>();
+        for (int v : values) {
+            counts.merge(v % 1000, 1, Integer::sum);
+            names.put(v % 5000, Integer.toString(v));
+        }
+        Set<String> unique = new HashSet<>(names.values());
+        System.out.println(counts.size() + " " + unique.size());
+    }
+}
+"""
+
+
+def build_cases() -> list[dict]:
+    """Representative programs for every supported language."""
+    cases = []
+    for lang in LANGUAGE_LABELS:
+        cases.append({'name': f'{lang}/hello', 'lang': lang, 'code': HELLO_WORLD[lang]})
+        cases.append({'name': f'{lang}/cpu_loop', 'lang': lang, 'code': CPU_LOOP[lang]})
+    cases.append({'name': 'cpp/stl_heavy', 'lang': 'cpp', 'code': STL_HEAVY_CPP})
+    cases.append({'name': 'java/collections', 'lang': 'java', 'code': JAVA_COLLECTIONS})
+    return cases
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Linear-interpolated percentile of an already sorted list."""
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize(samples: list[float]) -> dict:
+    ordered = sorted(samples)
+    return {
+        'count': len(ordered),
+        'min_ms': round(ordered[0], 2),
+        'p50_ms': round(percentile(ordered, 0.50), 2),
+        'p90_ms': round(percentile(ordered, 0.90), 2),
+        'p95_ms': round(percentile(ordered, 0.95), 2),
+        'p99_ms': round(percentile(ordered, 0.99), 2),
+        'max_ms': round(ordered[-1], 2),
+        'mean_ms': round(statistics.fmean(ordered), 2),
+    }
+
+
+def _timed_run(code: str, lang: str, profile: str) -> tuple[float, dict]:
+    started_at = time.perf_counter()
+    result = compile_code(code, lang, profile)
+    elapsed = (time.perf_counter() - started_at) * 1000
+    if result['result'] != 'Success':
+        raise RuntimeError(f"{lang} benchmark failed: {result['result']}: {str(result.get('message', ''))[:200]}")
+    return elapsed, result
+
+
+def bench_case(case: dict, iterations: int, profile: str = DEFAULT_PROFILE) -> dict:
+    code, lang = case['code'], case['lang']
+    comment = COMMENT_PREFIX[lang]
+
+    cold = []
+    for _ in range(iterations):
+        # A unique trailing comment changes the cache key without changing the program.
+        elapsed, _ = _timed_run(f"{code}\n{comment} bench {uuid.uuid4().hex}\n", lang, profile)
+        cold.append(elapsed)
+
+    _timed_run(code, lang, profile)
+    warm, cached = [], 0
+    for _ in range(iterations):
+        elapsed, result = _timed_run(code, lang, profile)
+        warm.append(elapsed)
+        cached += bool(result.get('cached'))
+
+    return {
+        'name': case['name'],
+        'language': lang,
+        'cold': summarize(cold),
+        'warm': {**summarize(warm), 'cache_hits': cached},
+    }
+
+
+# language -> (pool, run (code, script) in the pool, argv prefix of the equivalent fresh process)
+POOLS = {
+    'python': (python_pool, lambda code, script: python_pool.run(code, b'', 10), ['python3', '-u']),
+    'javascript': (node_pool, lambda code, script: node_pool.run(script, b'', 10), ['node']),
+}
+
+
+def _wait_for_refill(pool, limit: float = 10, settle: float = 0.1) -> None:
+    deadline = time.monotonic() + limit
+    while pool.stats()['idle'] < pool.size and time.monotonic() < deadline:
+        time.sleep(0.005)
+    # A refilled process is queued as soon as it is spawned; give it time to finish starting up.
+    time.sleep(settle)
+
+
+def bench_pool(lang: str, iterations: int) -> dict:
+    pool, run_pooled, fresh_argv = POOLS[lang]
+    code = HELLO_WORLD[lang]
+    pool.start()
+
+    fresh, pooled = [], []
+    with workspace_manager.workspace() as workspace:
+        script = os.path.join(workspace, SOURCE_FILES[lang])
+        with open(script, 'w') as f:
+            f.write(code)
+        for _ in range(iterations):
+            # Let the previous run's refill finish so neither timing pays for it.
+            _wait_for_refill(pool)
+            started_at = time.perf_counter()
+            _run_process(fresh_argv + [script], b'', 10)
+            fresh.append((time.perf_counter() - started_at) * 1000)
+
+            started_at = time.perf_counter()
+            run_pooled(code, script)
+            pooled.append((time.perf_counter() - started_at) * 1000)
+
+    return {
+        'name': f'{lang}/pool',
+        'language': lang,
+        'cold': summarize(fresh),
+        'warm': {**summarize(pooled), 'pool': pool.stats()},
+    }
+
+
+def missing_toolchain(lang: str) -> str | None:
+    for tool in {RUNTIMES[lang], *COMPILERS.get(lang, [])[:1]}:
+        if shutil.which(tool) is None:
+            return tool
+    return None
+
+
+def environment() -> dict:
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'toolchains': {lang: toolchain_version(compiler[0]) for lang, compiler in COMPILERS.items()},
+    }
+
+
+def compare(results: list[dict], baseline: dict, threshold: float, min_delta_ms: float) -> list[str]:
+    """
+    Return a message for every case whose p50 grew by more than ``threshold`` (a fraction).
+
+    Growth smaller than ``min_delta_ms`` is ignored so millisecond-scale jitter
+    on fast cases is not reported.
+    """
+    previous = {entry['name']: entry for entry in baseline.get('results', []) if 'cold' in entry}
+    regressions = []
+    for entry in results:
+        old = previous.get(entry.get('name'))
+        if old is None or 'cold' not in entry:
+            continue
+        for phase in ('cold', 'warm'):
+            before, after = old[phase]['p50_ms'], entry[phase]['p50_ms']
+            if after > before * (1 + threshold) and after - before >= min_delta_ms:
+                regressions.append(f"{entry['name']} {phase}: p50 {before:.1f} ms -> {after:.1f} ms")
+    return regressions
+
+
+def print_table(results: list[dict], file=sys.stdout) -> None:
+    print(f"{'case':<22} {'phase':<5} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}", file=file)
+    for entry in results:
+        if 'skipped' in entry:
+            print(f"{entry['name']:<22} skipped: {entry['skipped']}", file=file)
+            continue
+        for phase in ('cold', 'warm'):
+            stats = entry[phase]
+            print(f"{entry['name']:<22} {phase:<5} {stats['p50_ms']:>9.1f} {stats['p90_ms']:>9.1f} "
+                  f"{stats['p99_ms']:>9.1f} {stats['max_ms']:>9.1f}", file=file)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=10, help='timed runs per case and phase')
+    parser.add_argument('--profile', choices=sorted(BUILD_PROFILES), default=DEFAULT_PROFILE,
+                        help='build profile for compiled languages')
+    parser.add_argument('--language', action='append', help='only benchmark this language (repeatable)')
+    parser.add_argument('--case', action='append', help='only benchmark cases whose name contains this')
+    parser.add_argument('--output', help="write JSON results to this file ('-' for stdout)")
+    parser.add_argument('--baseline', help='JSON results to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='p50 growth over the baseline that counts as a regression (default 0.2 = 20%%)')
+    parser.add_argument('--min-delta-ms', type=float, default=5.0,
+                        help='ignore p50 growth smaller than this many milliseconds')
+    args = parser.parse_args(argv)
+
+    results = []
+    for case in build_cases():
+        if args.language and case['lang'] not in args.language:
+            continue
+        if args.case and not any(fragment in case['name'] for fragment in args.case):
+            continue
+        missing = missing_toolchain(case['lang'])
+        if missing:
+            results.append({'name': case['name'], 'language': case['lang'], 'skipped': f'{missing} not found'})
+            continue
+        print(f"benchmarking {case['name']} ...", file=sys.stderr)
+        results.append(bench_case(case, max(args.iterations, 1), args.profile))
+
+    for lang in POOLS:
+        name = f'{lang}/pool'
+        if args.language and lang not in args.language:
+            continue
+        if args.case and not any(fragment in name for fragment in args.case):
+            continue
+        if shutil.which(RUNTIMES[lang]) is None:
+            results.append({'name': name, 'language': lang, 'skipped': f'{RUNTIMES[lang]} not found'})
+            continue
+        print(f"benchmarking {name} ...", file=sys.stderr)
+        results.append(bench_pool(lang, max(args.iterations, 1)))
+
+    report = {'environment': environment(), 'profile': args.profile, 'iterations': args.iterations,
+              'results': results}
+    if args.output == '-':
+        print_table(results, file=sys.stderr)
+        print(json.dumps(report, indent=2))
+    else:
+        print_table(results)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold, args.min_delta_ms)
+        for message in regressions:
+            print(f"REGRESSION {message}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,8 +1,25 @@
+import asyncio
+import json
 import os
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from types import SimpleNamespace
+from typing import Any, Callable, Iterator
 
 from dotenv import load_dotenv
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config.hedging import ahedged_call, hedged_call, make_latency_tracker
+from config.llm_cache import CachedLLM, llm_cache
+
+try:
+    import httpx
+except ModuleNotFoundError:
+    httpx = None
 
 try:
     from langchain_google_genai import ChatGoogleGenerativeAI
@@ -20,6 +37,11 @@ class LLMConfigurationError(RuntimeError):
 
 
 _llm = None
+_http_session = None
+_http_session_lock = threading.Lock()
+_hedge_executor = None
+_async_loop = None
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, tuple]" = weakref.WeakKeyDictionary()
 
 
 def _get_google_api_key() -> str | None:
@@ -39,6 +61,118 @@ def _get_openrouter_model() -> str:
     return os.getenv("OPENROUTER_MODEL") or "openai/gpt-4o-mini"
 
 
+def _get_openrouter_backup_model() -> str:
+    return os.getenv("OPENROUTER_BACKUP_MODEL") or _get_openrouter_model()
+
+
+def _get_http_timeout() -> tuple[float, float]:
+    return (
+        float(os.getenv("LLM_CONNECT_TIMEOUT") or 5),
+        float(os.getenv("LLM_READ_TIMEOUT") or 60),
+    )
+
+
+def _get_http_session() -> requests.Session:
+    """
+    Return the keep-alive session shared by all LLM HTTP calls.
+
+    Connections are pooled per host, so concurrent gunicorn threads reuse warm
+    TLS connections instead of handshaking on every call. Connection errors and
+    502/503/504 responses are retried with backoff; 429s are left to
+    ``FallbackLLM``.
+    """
+    global _http_session
+
+    with _http_session_lock:
+        if _http_session is None:
+            retries = int(os.getenv("LLM_HTTP_RETRIES") or 2)
+            retry = Retry(
+                total=retries,
+                connect=retries,
+                # Not retried: the request may already be running upstream, and
+                # False re-raises the read timeout itself instead of MaxRetryError.
+                read=False,
+                status=retries,
+                status_forcelist=(502, 503, 504),
+                allowed_methods=frozenset({"POST"}),
+                backoff_factor=0.5,
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(
+                pool_connections=int(os.getenv("LLM_HTTP_POOL_CONNECTIONS") or 4),
+                pool_maxsize=int(os.getenv("LLM_HTTP_POOL_MAXSIZE") or 16),
+                max_retries=retry,
+            )
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _http_session = session
+        return _http_session
+
+
+def _get_hedge_executor() -> ThreadPoolExecutor:
+    """
+    Threads that run both sides of hedged sync calls; a call that loses the race finishes here in the background.
+
+    Each hedged call needs up to two threads, so the default of 16 covers
+    ``GUNICORN_THREADS=8`` request threads without queueing.
+    """
+    global _hedge_executor
+
+    with _http_session_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(
+                max_workers=int(os.getenv("LLM_HEDGE_MAX_WORKERS") or 16),
+                thread_name_prefix="llm-hedge",
+            )
+        return _hedge_executor
+
+
+def _get_async_client() -> tuple["httpx.AsyncClient", asyncio.Semaphore]:
+    """
+    Return the ``httpx.AsyncClient`` and concurrency semaphore for the running event loop.
+
+    Both are bound to the loop that created them, so each loop gets its own
+    pair; within a loop, every ``ainvoke`` reuses the same keep-alive pool and
+    at most ``LLM_ASYNC_MAX_CONCURRENCY`` requests are in flight.
+    """
+    loop = asyncio.get_running_loop()
+    with _http_session_lock:
+        state = _async_clients.get(loop)
+        if state is not None:
+            return state
+
+        connect_timeout, read_timeout = _get_http_timeout()
+        pool_size = int(os.getenv("LLM_HTTP_POOL_MAXSIZE") or 16)
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            # Retries here cover connection failures only, like the sync session's connect retries.
+            transport=httpx.AsyncHTTPTransport(retries=int(os.getenv("LLM_HTTP_RETRIES") or 2)),
+        )
+        state = (client, asyncio.Semaphore(int(os.getenv("LLM_ASYNC_MAX_CONCURRENCY") or 8)))
+        _async_clients[loop] = state
+        return state
+
+
+def _get_async_loop() -> asyncio.AbstractEventLoop:
+    """
+    Return the background event loop that runs ``invoke_many`` batches.
+
+    The loop lives for the whole process, so every thread's batches share its
+    keep-alive client and its ``LLM_ASYNC_MAX_CONCURRENCY`` bound, and the
+    client is never closed under another caller.
+    """
+    global _async_loop
+
+    with _http_session_lock:
+        if _async_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="llm-async", daemon=True).start()
+            _async_loop = loop
+        return _async_loop
+
+
 def _is_rate_limit_error(exc: Exception) -> bool:
     message = str(exc).lower()
     rate_limit_markers = [
@@ -52,59 +186,221 @@ def _is_rate_limit_error(exc: Exception) -> bool:
     return any(marker in message for marker in rate_limit_markers)
 
 
+def _provider_identity(llm) -> tuple:
+    """What makes two clients interchangeable: same class, endpoint and model."""
+    return type(llm).__name__, getattr(llm, "base_url", None), getattr(llm, "model", None)
+
+
+def _message_content(data: dict) -> str:
+    content = data["choices"][0]["message"]["content"]
+    if isinstance(content, list):
+        content = "".join(
+            item.get("text", "") if isinstance(item, dict) else str(item)
+            for item in content
+        )
+    return str(content).strip()
+
+
 class OpenRouterLLM:
-    def __init__(self, api_key: str, base_url: str, model: str, temperature: float = 0.7):
+    def __init__(self, api_key: str, base_url: str, model: str, temperature: float = 0.7,
+                 session: requests.Session | None = None):
         self.api_key = api_key
         self.base_url = base_url
         self.model = model
         self.temperature = temperature
+        self.session = session or _get_http_session()
+        self.timeout = _get_http_timeout()
+
+    def _request(self, prompt: str, stream: bool = False) -> tuple[str, dict, dict]:
+        """URL, headers and JSON body of a chat completion request."""
+        payload = {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": prompt,
+                }
+            ],
+            "temperature": self.temperature,
+        }
+        if stream:
+            payload["stream"] = True
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+        return f"{self.base_url}/chat/completions", headers, payload
+
+    def _post(self, prompt: str, stream: bool = False) -> requests.Response:
+        url, headers, payload = self._request(prompt, stream)
+        response = self.session.post(url, headers=headers, json=payload, timeout=self.timeout, stream=stream)
+        response.raise_for_status()
+        return response
 
     def invoke(self, prompt: str):
-        response = requests.post(
-            f"{self.base_url}/chat/completions",
-            headers={
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "model": self.model,
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": prompt,
-                    }
-                ],
-                "temperature": self.temperature,
-            },
-            timeout=60,
-        )
+        return SimpleNamespace(content=_message_content(self._post(prompt).json()))
+
+    async def ainvoke(self, prompt: str):
+        """Asynchronous ``invoke`` on a pooled ``httpx.AsyncClient``, bounded by the shared semaphore."""
+        if httpx is None:
+            return await asyncio.to_thread(self.invoke, prompt)
+
+        client, semaphore = _get_async_client()
+        url, headers, payload = self._request(prompt)
+        async with semaphore:
+            response = await client.post(url, headers=headers, json=payload)
         response.raise_for_status()
-        data = response.json()
-        content = data["choices"][0]["message"]["content"]
-        if isinstance(content, list):
-            content = "".join(
-                item.get("text", "") if isinstance(item, dict) else str(item)
-                for item in content
-            )
-        return SimpleNamespace(content=str(content).strip())
+        return SimpleNamespace(content=_message_content(response.json()))
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        """Yield the completion's text as the provider produces it."""
+        with self._post(prompt, stream=True) as response:
+            for line in response.iter_lines(decode_unicode=True):
+                # Blank lines separate events; lines starting with ":" are keep-alive comments.
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    return
+                chunk = json.loads(data)
+                if "error" in chunk:
+                    raise RuntimeError(f"OpenRouter stream error: {chunk['error']}")
+                choices = chunk.get("choices") or [{}]
+                content = (choices[0].get("delta") or {}).get("content")
+                if content:
+                    yield content
 
 
 class FallbackLLM:
-    def __init__(self, primary, backup):
+    """
+    Primary LLM with a backup for rate limits and, optionally, slow answers.
+
+    With ``hedging`` on, a primary call still running after its provider's p95
+    latency (see ``config.hedging``) is raced against the backup and the first
+    answer wins. Hedging needs a backup with a different provider or model, since
+    racing a client against its twin just doubles the spend. Latency is
+    tracked per provider from successful calls. Streaming is not hedged.
+    """
+
+    def __init__(self, primary, backup, hedging: bool = False):
         self.primary = primary
         self.backup = backup
+        self.hedging = (hedging and primary is not None and backup is not None
+                        and _provider_identity(primary) != _provider_identity(backup))
+        self.latency = {"primary": make_latency_tracker(), "backup": make_latency_tracker()}
+        self._lock = threading.Lock()
+        self._hedged = 0
+        self._backup_wins = 0
+
+    def _timed(self, role: str, prompt: str):
+        started_at = time.monotonic()
+        response = getattr(self, role).invoke(prompt)
+        self.latency[role].record(time.monotonic() - started_at)
+        return response
+
+    async def _atimed(self, role: str, prompt: str):
+        started_at = time.monotonic()
+        response = await getattr(self, role).ainvoke(prompt)
+        self.latency[role].record(time.monotonic() - started_at)
+        return response
+
+    def _count_hedge(self) -> None:
+        with self._lock:
+            self._hedged += 1
+
+    def _count_winner(self, role: str) -> None:
+        if role == "backup":
+            with self._lock:
+                self._backup_wins += 1
 
     def invoke(self, prompt: str):
         if self.primary is None:
             return self.backup.invoke(prompt)
 
         try:
-            return self.primary.invoke(prompt)
+            if not self.hedging:
+                return self._timed("primary", prompt)
+            role, response = hedged_call(
+                lambda: ("primary", self._timed("primary", prompt)),
+                lambda: ("backup", self._timed("backup", prompt)),
+                self.latency["primary"].deadline(),
+                _get_hedge_executor(),
+                on_hedge=self._count_hedge,
+            )
+            self._count_winner(role)
+            return response
         except Exception as exc:
             if self.backup is not None and _is_rate_limit_error(exc):
-                return self.backup.invoke(prompt)
+                return self._timed("backup", prompt)
             raise
 
+    async def ainvoke(self, prompt: str):
+        if self.primary is None:
+            return await self.backup.ainvoke(prompt)
+
+        async def attempt(role: str):
+            return role, await self._atimed(role, prompt)
+
+        try:
+            if not self.hedging:
+                return await self._atimed("primary", prompt)
+            role, response = await ahedged_call(
+                lambda: attempt("primary"),
+                lambda: attempt("backup"),
+                self.latency["primary"].deadline(),
+                on_hedge=self._count_hedge,
+            )
+            self._count_winner(role)
+            return response
+        except Exception as exc:
+            if self.backup is not None and _is_rate_limit_error(exc):
+                return await self._atimed("backup", prompt)
+            raise
+
+    def stats(self) -> dict:
+        with self._lock:
+            hedged, backup_wins = self._hedged, self._backup_wins
+        return {
+            "hedging": self.hedging,
+            "hedged": hedged,
+            "backup_wins": backup_wins,
+            "latency": {role: tracker.stats() for role, tracker in self.latency.items()},
+        }
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        """Stream from the primary, switching to the backup only if it is rate limited before the first token."""
+        if self.primary is None:
+            yield from self.backup.stream(prompt)
+            return
+
+        started = False
+        try:
+            for token in self.primary.stream(prompt):
+                started = True
+                yield token
+            return
+        except Exception as exc:
+            if started or self.backup is None or not _is_rate_limit_error(exc):
+                raise
+        yield from self.backup.stream(prompt)
+
+
+def stream_events(prompt: str, finish: Callable[[str], Any],
+                  cache_ttl: float | None = None) -> Iterator[tuple[str, Any]]:
+    """
+    Stream ``prompt`` through the shared LLM as ``("token", text)`` events.
+
+    Once the completion ends, ``finish`` receives the full text and its result
+    is yielded as a final ``("done", result)`` event, so streaming endpoints
+    post-process exactly like their blocking counterparts. ``cache_ttl`` is
+    passed to ``get_llm``.
+    """
+    parts = []
+    for token in get_llm(cache_ttl).stream(prompt):
+        parts.append(token)
+        yield "token", token
+    yield "done", finish("".join(parts).strip())
+
 
 def get_gemini_readiness() -> tuple[bool, str]:
     """Report whether Gemini can be initialized with the current environment."""
@@ -153,7 +449,7 @@ def _build_gemini_llm():
     )
 
 
-def _build_openrouter_llm():
+def _build_openrouter_llm(model: str | None = None):
     api_key = _get_openrouter_api_key()
     if not api_key:
         return None
@@ -161,13 +457,25 @@ def _build_openrouter_llm():
     return OpenRouterLLM(
         api_key=api_key,
         base_url=_get_openrouter_base_url(),
-        model=_get_openrouter_model(),
+        model=model or _get_openrouter_model(),
         temperature=0.7,
     )
 
 
-def get_llm():
-    """Lazily create and return the shared LLM client with OpenRouter fallback."""
+def get_llm(cache_ttl: float | None = None):
+    """
+    Lazily create and return the shared LLM client with OpenRouter fallback.
+
+    With ``cache_ttl`` (seconds), the client answers prompts seen within that
+    window from the on-disk response cache instead of calling the provider.
+    """
+    llm = _get_shared_llm()
+    if cache_ttl and llm_cache.enabled:
+        return CachedLLM(llm, llm_cache, cache_ttl)
+    return llm
+
+
+def _get_shared_llm():
     global _llm
 
     if _llm is not None:
@@ -175,10 +483,11 @@ def get_llm():
 
     try:
         primary = _build_openrouter_llm()
-        backup = _build_openrouter_llm()
+        backup = _build_openrouter_llm(_get_openrouter_backup_model())
 
         if primary and backup:
-            _llm = FallbackLLM(primary=primary, backup=backup)
+            _llm = FallbackLLM(primary=primary, backup=backup,
+                               hedging=os.getenv("LLM_HEDGE_ENABLED", "true").lower() == "true")
         elif primary:
             _llm = primary
         elif backup:
@@ -194,3 +503,33 @@ def get_llm():
         raise LLMConfigurationError(
             f"Failed to initialize LLM client: {exc}"
         ) from exc
+
+
+async def agather(prompts: list[str], cache_ttl: float | None = None, return_exceptions: bool = False) -> list:
+    """
+    Send ``prompts`` to the shared LLM concurrently and return the responses in order.
+
+    Concurrency is bounded by ``LLM_ASYNC_MAX_CONCURRENCY``, so the batch takes
+    about as long as its slowest call. With ``return_exceptions`` a failed
+    prompt yields its exception instead of failing the whole batch.
+    """
+    llm = get_llm(cache_ttl)
+    return await asyncio.gather(*(llm.ainvoke(prompt) for prompt in prompts), return_exceptions=return_exceptions)
+
+
+def invoke_many(prompts: list[str], cache_ttl: float | None = None, return_exceptions: bool = False) -> list:
+    """
+    Blocking ``agather`` for synchronous callers such as Flask views and worker threads.
+
+    The batch runs on the shared background loop (see ``_get_async_loop``), so
+    this is safe from any thread, including one whose own event loop is
+    running; coroutines should still ``await agather`` rather than block.
+    """
+    return asyncio.run_coroutine_threadsafe(
+        agather(prompts, cache_ttl, return_exceptions), _get_async_loop()
+    ).result()
+
+
+def get_llm_stats() -> dict | None:
+    """Hedging and latency counters of the shared client, once it exists."""
+    return _llm.stats() if hasattr(_llm, "stats") else None
@@ -0,0 +1,129 @@
+import asyncio
+import math
+import os
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Optional
+
+
+class LatencyTracker:
+    """
+    Rolling window of successful call latencies for one provider.
+
+    ``deadline()`` is the window's p95, clamped to ``[floor, ceiling]``; until
+    ``min_samples`` calls have been seen it is ``default``.
+    """
+
+    def __init__(self, window: int, min_samples: int, default: float, floor: float, ceiling: float):
+        self.min_samples = min_samples
+        self.default = default
+        self.floor = floor
+        self.ceiling = ceiling
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, math.ceil(fraction * len(samples)) - 1)]
+
+    def deadline(self) -> float:
+        with self._lock:
+            enough = len(self._samples) >= self.min_samples
+        if not enough:
+            return self.default
+        return min(max(self.percentile(0.95), self.floor), self.ceiling)
+
+    def stats(self) -> dict:
+        p50, p95 = self.percentile(0.5), self.percentile(0.95)
+        with self._lock:
+            samples = len(self._samples)
+        return {
+            "samples": samples,
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "deadline_ms": round(self.deadline() * 1000, 1),
+        }
+
+
+def make_latency_tracker() -> LatencyTracker:
+    return LatencyTracker(
+        window=int(os.getenv("LLM_HEDGE_WINDOW", "200")),
+        min_samples=int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20")),
+        default=float(os.getenv("LLM_HEDGE_DEFAULT_SECONDS", "15")),
+        floor=float(os.getenv("LLM_HEDGE_MIN_SECONDS", "2")),
+        ceiling=float(os.getenv("LLM_HEDGE_MAX_SECONDS", "30")),
+    )
+
+
+def _first_success(futures: list[Future]) -> Any:
+    pending = set(futures)
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                for other in pending:
+                    other.cancel()
+                return future.result()
+            error = future.exception()
+    raise error
+
+
+def hedged_call(
+    primary: Callable[[], Any],
+    backup: Callable[[], Any],
+    deadline: float,
+    executor: ThreadPoolExecutor,
+    on_hedge: Callable[[], None] = lambda: None,
+) -> Any:
+    """
+    Run ``primary`` on ``executor``; if it has not finished after ``deadline``
+    seconds, also start ``backup`` there and return whichever succeeds first.
+
+    An error from ``primary`` before the deadline is raised as is, so callers
+    keep their own failover rules. A blocking call that loses the race cannot
+    be interrupted; it finishes in the background and its result is dropped.
+    """
+    first = executor.submit(primary)
+    done, _ = wait([first], timeout=deadline)
+    if done:
+        return first.result()
+    on_hedge()
+    return _first_success([first, executor.submit(backup)])
+
+
+async def ahedged_call(
+    primary: Callable[[], Awaitable[Any]],
+    backup: Callable[[], Awaitable[Any]],
+    deadline: float,
+    on_hedge: Callable[[], None] = lambda: None,
+) -> Any:
+    """Asynchronous ``hedged_call``: the losing request is cancelled outright."""
+    first = asyncio.ensure_future(primary())
+    try:
+        return await asyncio.wait_for(asyncio.shield(first), deadline)
+    except asyncio.TimeoutError:
+        pass
+    on_hedge()
+
+    pending = {first, asyncio.ensure_future(backup())}
+    error = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
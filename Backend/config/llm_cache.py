@@ -0,0 +1,207 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from types import SimpleNamespace
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "gencode-llm-cache")
+
+
+def make_llm_cache_key(model: str, temperature: float, prompt: str) -> str:
+    digest = hashlib.sha256()
+    for part in (model, repr(float(temperature)), prompt):
+        encoded = part.encode()
+        digest.update(len(encoded).to_bytes(8, "big"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Size-bounded LRU cache of LLM completions on local disk.
+
+    Each entry is a small JSON file named after the hash of (model,
+    temperature, prompt), so the cache survives restarts and is shared by all
+    worker processes on the host. Freshness is decided per lookup: callers
+    pass the TTL that suits their call site, and stale entries are dropped.
+    """
+
+    def __init__(self, root: str, max_bytes: int, enabled: bool = True):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._expired = 0
+        self._evictions = 0
+        if enabled:
+            self._load_existing()
+
+    def _load_existing(self) -> None:
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            names = [name for name in os.listdir(self.root) if name.endswith(".json")]
+        except OSError as exc:
+            logger.warning("LLM cache directory %s is unavailable: %s", self.root, exc)
+            self.enabled = False
+            return
+
+        entries = []
+        for name in names:
+            try:
+                stat = os.stat(os.path.join(self.root, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, name[:-len(".json")], stat.st_size))
+        for _mtime, key, size in sorted(entries):
+            self._entries[key] = size
+            self._total_bytes += size
+        self._evict_locked()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.json")
+
+    def _drop_locked(self, key: str) -> None:
+        self._total_bytes -= self._entries.pop(key, 0)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict_locked(self) -> None:
+        while self._entries and self._total_bytes > self.max_bytes:
+            self._drop_locked(next(iter(self._entries)))
+            self._evictions += 1
+
+    def get(self, key: str, ttl: float) -> Optional[str]:
+        """Return the cached completion for ``key`` if it is younger than ``ttl`` seconds."""
+        if not self.enabled:
+            return None
+        try:
+            with open(self._path(key)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self._misses += 1
+            return None
+
+        with self._lock:
+            if time.time() - entry.get("created_at", 0) > ttl:
+                self._expired += 1
+                self._misses += 1
+                self._drop_locked(key)
+                return None
+            self._hits += 1
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        return entry.get("content")
+
+    def set(self, key: str, content: str) -> None:
+        if not self.enabled:
+            return
+        data = json.dumps({"created_at": time.time(), "content": content})
+        staging = os.path.join(self.root, f".{key}.{uuid.uuid4().hex}.tmp")
+        try:
+            with open(staging, "w") as f:
+                f.write(data)
+            os.replace(staging, self._path(key))
+        except OSError as exc:
+            logger.warning("Could not store LLM response in cache: %s", exc)
+            try:
+                os.remove(staging)
+            except OSError:
+                pass
+            return
+
+        with self._lock:
+            self._total_bytes -= self._entries.pop(key, 0)
+            self._entries[key] = len(data.encode())
+            self._total_bytes += self._entries[key]
+            self._evict_locked()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "expired": self._expired,
+                "evictions": self._evictions,
+                "entries": len(self._entries),
+                "size_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+class CachedLLM:
+    """Wrap an LLM client so identical prompts within ``ttl`` seconds are answered from ``cache``."""
+
+    def __init__(self, llm, cache: LLMResponseCache, ttl: float):
+        self.llm = llm
+        self.cache = cache
+        self.ttl = ttl
+
+    def _key(self, prompt: str) -> str:
+        model, temperature = describe_llm(self.llm)
+        return make_llm_cache_key(model, temperature, prompt)
+
+    def invoke(self, prompt: str):
+        key = self._key(prompt)
+        content = self.cache.get(key, self.ttl)
+        if content is not None:
+            return SimpleNamespace(content=content)
+        response = self.llm.invoke(prompt)
+        self.cache.set(key, response.content)
+        return response
+
+    async def ainvoke(self, prompt: str):
+        key = self._key(prompt)
+        content = self.cache.get(key, self.ttl)
+        if content is not None:
+            return SimpleNamespace(content=content)
+        response = await self.llm.ainvoke(prompt)
+        self.cache.set(key, response.content)
+        return response
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        """Replay a cached completion as a single token, or stream and cache a fresh one."""
+        key = self._key(prompt)
+        content = self.cache.get(key, self.ttl)
+        if content is not None:
+            yield content
+            return
+        parts = []
+        for token in self.llm.stream(prompt):
+            parts.append(token)
+            yield token
+        self.cache.set(key, "".join(parts).strip())
+
+
+def describe_llm(llm) -> tuple[str, float]:
+    """Model identity and temperature used in cache keys; fallback chains list every model."""
+    if hasattr(llm, "primary"):
+        models = [describe_llm(part)[0] for part in (llm.primary, llm.backup) if part is not None]
+        temperature = describe_llm(llm.primary or llm.backup)[1]
+        return "|".join(models), temperature
+    model = getattr(llm, "model", None) or getattr(llm, "model_name", None) or type(llm).__name__
+    return str(model), float(getattr(llm, "temperature", 0) or 0)
+
+
+llm_cache = LLMResponseCache(
+    root=os.getenv("LLM_CACHE_DIR", DEFAULT_CACHE_DIR),
+    max_bytes=int(os.getenv("LLM_CACHE_MAX_MB", "64")) * 1024 * 1024,
+    enabled=os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true",
+)
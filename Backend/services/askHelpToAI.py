@@ -1,6 +1,7 @@
-from typing import Dict, Any
+from functools import partial
+from typing import Any, Dict, Iterator
 
-from config.config import get_llm
+from config.config import get_llm, stream_events
 
 # Singleton pattern for memory and conversation objects to avoid re-instantiation
 class _ConversationManager:
@@ -75,19 +76,15 @@ Preferred structure:
 If the user asks a very small question, a shorter markdown answer is fine.
 """
 
-def ask_help_to_ai(
+def build_ask_help_prompt(
     message: str,
     language: str,
     problem_description: str,
     problem_topic: str,
     initial_code: str,
     user_code_progress: str
-) -> Dict[str, Any]:
-    """
-    Ask help to AI with summary memory and markdown formatting.
-    Returns a dictionary with sender, output, and status keys.
-    """
-    prompt = _PROMPT_TEMPLATE.format(
+) -> str:
+    return _PROMPT_TEMPLATE.format(
         message=message,
         language=language,
         problem_description=problem_description,
@@ -97,7 +94,8 @@ def ask_help_to_ai(
         conversation_history=_ConversationManager.format_history(),
     )
 
-    raw_response = get_llm().invoke(prompt).content.strip()
+
+def _finish_answer(message: str, raw_response: str) -> Dict[str, Any]:
     _ConversationManager.add_turn("user", message)
     _ConversationManager.add_turn("assistant", raw_response)
 
@@ -106,3 +104,35 @@ def ask_help_to_ai(
         "output": raw_response,
         "status": "success",
     }
+
+
+def ask_help_to_ai(
+    message: str,
+    language: str,
+    problem_description: str,
+    problem_topic: str,
+    initial_code: str,
+    user_code_progress: str
+) -> Dict[str, Any]:
+    """
+    Ask help to AI with summary memory and markdown formatting.
+    Returns a dictionary with sender, output, and status keys.
+    """
+    prompt = build_ask_help_prompt(message, language, problem_description, problem_topic,
+                                   initial_code, user_code_progress)
+    raw_response = get_llm().invoke(prompt).content.strip()
+    return _finish_answer(message, raw_response)
+
+
+def stream_ask_help_to_ai(
+    message: str,
+    language: str,
+    problem_description: str,
+    problem_topic: str,
+    initial_code: str,
+    user_code_progress: str
+) -> Iterator[tuple[str, Any]]:
+    """Streaming ``ask_help_to_ai``: token events, then the same result dict as a ``done`` event."""
+    prompt = build_ask_help_prompt(message, language, problem_description, problem_topic,
+                                   initial_code, user_code_progress)
+    return stream_events(prompt, partial(_finish_answer, message))
@@ -1,3 +1,4 @@
+import os
 import threading
 import queue
 import hashlib
@@ -7,10 +8,13 @@ import logging
 from typing import Optional, Dict, Any
 
 from .firebase_service import FirebaseService
-from .question_generator import generate_dsa_question
+from .question_generator import generate_dsa_questions
 
 logger = logging.getLogger(__name__)
 
+# Queued requests generated together; they run concurrently, so a batch takes as long as its slowest question.
+BATCH_SIZE = int(os.getenv('QUESTION_GENERATION_BATCH_SIZE', '4'))
+
 class AsyncQuestionGenerator:
     """Handle asynchronous question generation"""
     
@@ -50,37 +54,44 @@ class AsyncQuestionGenerator:
         """Process queued question generation requests"""
         while not self._stop_event.is_set():
             try:
-                # Get next request with timeout
-                request = self._queue.get(timeout=5)
-                self._generate_question(request)
-                self._queue.task_done()
+                # Get next request with timeout, then pick up whatever else is already waiting
+                batch = [self._queue.get(timeout=5)]
+                while len(batch) < BATCH_SIZE:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                self._generate_questions(batch)
+                for _ in batch:
+                    self._queue.task_done()
             except queue.Empty:
                 continue
             except Exception as e:
                 logger.error(f"Error processing question generation: {str(e)}")
     
-    def _generate_question(self, request: Dict[str, Any]):
-        """Generate a question for a request"""
-        topic = request['topic']
-        request_id = request['request_id']
-        
+    def _generate_questions(self, requests: list[Dict[str, Any]]):
+        """Generate questions for a batch of requests concurrently"""
+        topics = [request['topic'] for request in requests]
+        logger.info(f"Generating questions for topics {topics}")
+
         try:
-            logger.info(f"Generating question for topic '{topic}' (request: {request_id})")
-            
-            # Generate the question
-            result = generate_dsa_question(topic)
-            result['topic'] = topic
-            
+            results = generate_dsa_questions(topics)
+        except Exception as e:
+            results = [e] * len(requests)
+
+        FirebaseService.initialize()
+        for request, result in zip(requests, results):
+            topic = request['topic']
+            request_id = request['request_id']
+            if isinstance(result, Exception):
+                logger.error(f"Error generating question for topic '{topic}': {str(result)}")
+                FirebaseService.update_pending_question(request_id, None, 'failed', error=str(result))
+                continue
+
             # Store the result
-            FirebaseService.initialize()
+            result['topic'] = topic
             FirebaseService.update_pending_question(request_id, result, 'completed')
-            
-            logger.info(f"Successfully generated question for topic '{topic}'")
-            
-        except Exception as e:
-            logger.error(f"Error generating question for topic '{topic}': {str(e)}")
-            FirebaseService.initialize()
-            FirebaseService.update_pending_question(request_id, None, 'failed', error=str(e))
+            logger.info(f"Successfully generated question for topic '{topic}' (request: {request_id})")
     
     def get_status(self, request_id: str) -> Optional[Dict[str, Any]]:
         """Get the status of a pending question"""
@@ -0,0 +1,243 @@
+import os
+import selectors
+import subprocess
+import time
+
+OUTPUT_LIMIT_BYTES = int(os.getenv('RUN_OUTPUT_LIMIT_BYTES', str(1024 * 1024)))
+
+_READ_CHUNK = 64 * 1024
+_WRITE_CHUNK = 64 * 1024
+# How often a running program's resident-set high-water mark is sampled.
+_RSS_SAMPLE_SECONDS = 0.01
+
+
+class BoundedCompletedProcess(subprocess.CompletedProcess):
+    """``CompletedProcess`` that also records the output cap and the child's resource usage."""
+
+    def __init__(self, args, returncode, stdout, stderr, truncated: bool = False, usage: dict | None = None):
+        super().__init__(args, returncode, stdout, stderr)
+        self.truncated = truncated
+        self.usage = usage
+
+
+def decode_output(data: bytes) -> str:
+    """Decode like ``subprocess.run(text=True)``, including newline translation."""
+    return data.decode(errors='replace').replace('\r\n', '\n').replace('\r', '\n')
+
+
+def _kill(proc: subprocess.Popen) -> None:
+    try:
+        proc.kill()
+    except ProcessLookupError:
+        pass
+
+
+class PeakRssSampler:
+    """
+    Track a running process's ``VmHWM`` (resident-set high-water mark) from ``/proc``.
+
+    ``wait4``'s ``ru_maxrss`` cannot be used: a forked child keeps the peak of
+    the parent it was forked from across ``exec``, so every run would report
+    at least the size of the web worker. Sampling stops once the process has
+    exited, so the result is a lower bound that misses a final spike.
+    """
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.peak_kb: int | None = None
+        self._next_at = 0.0
+
+    def sample(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now < self._next_at:
+            return
+        self._next_at = now + _RSS_SAMPLE_SECONDS
+        try:
+            with open(f'/proc/{self.pid}/status') as status:
+                for line in status:
+                    if line.startswith('VmHWM:'):
+                        self.peak_kb = max(self.peak_kb or 0, int(line.split()[1]))
+                        return
+        except (OSError, ValueError):
+            pass
+
+
+def _usage(started_at: float, rusage=None) -> dict:
+    usage = {'wall_ms': round((time.monotonic() - started_at) * 1000, 2)}
+    if rusage is not None:
+        usage.update({
+            'cpu_user_ms': round(rusage.ru_utime * 1000, 2),
+            'cpu_sys_ms': round(rusage.ru_stime * 1000, 2),
+        })
+    return usage
+
+
+def _add_peak_memory(usage: dict, sampler: PeakRssSampler, cgroup=None) -> dict:
+    """
+    Set ``max_rss_kb`` from the run cgroup's ``memory.peak`` or, without one,
+    from sampled ``VmHWM``; ``max_rss_source`` says which. Left out when neither
+    is known.
+    """
+    if cgroup is not None:
+        usage['cgroup'] = cgroup.report()
+        if usage['cgroup']['attached'] and usage['cgroup']['memory_peak_kb'] is not None:
+            usage['max_rss_kb'] = usage['cgroup']['memory_peak_kb']
+            usage['max_rss_source'] = 'cgroup'
+            return usage
+    if sampler.peak_kb is not None:
+        usage['max_rss_kb'] = sampler.peak_kb
+        usage['max_rss_source'] = 'sampled'
+    return usage
+
+
+def reap(proc: subprocess.Popen, started_at: float, deadline: float | None = None,
+         sampler: PeakRssSampler | None = None) -> dict:
+    """
+    Wait for ``proc`` with ``wait4`` and return its wall time and CPU times.
+
+    Raises ``subprocess.TimeoutExpired`` if it is still running at ``deadline``.
+    While waiting, ``sampler`` (if any) keeps sampling the process's memory.
+    """
+    delay = 0.0005
+    while True:
+        if sampler is not None and deadline is not None:
+            sampler.sample(force=True)
+        try:
+            pid, status, rusage = os.wait4(proc.pid, 0 if deadline is None else os.WNOHANG)
+        except ChildProcessError:
+            # Already reaped elsewhere; only the wall time is known.
+            proc.wait()
+            return _usage(started_at)
+        if pid:
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            return _usage(started_at, rusage)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise subprocess.TimeoutExpired(proc.args, 0)
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, 0.01)
+
+
+def communicate_bounded(
+    proc: subprocess.Popen,
+    stdin: bytes = b'',
+    timeout: float | None = None,
+    limit: int = OUTPUT_LIMIT_BYTES,
+    cgroup=None,
+) -> BoundedCompletedProcess:
+    """
+    Feed ``stdin`` to ``proc`` and collect at most ``limit`` bytes of stdout and of stderr.
+
+    Output is read incrementally, so memory use stays bounded by ``limit`` no
+    matter how much the program prints. The process is killed as soon as
+    either stream exceeds the cap, and the result is marked ``truncated``.
+    Raises ``subprocess.TimeoutExpired`` after killing the process when it
+    runs longer than ``timeout``, like ``subprocess.run``; the exception's
+    ``usage`` attribute still carries the child's resource usage.
+
+    When the process runs in a ``cgroup`` (see ``services.cgroup_sandbox``),
+    its OOM/throttling report is added to the usage under ``'cgroup'`` and its
+    ``memory.peak`` is the run's ``max_rss_kb``; otherwise that is sampled from
+    ``/proc`` (see ``PeakRssSampler``).
+    """
+    started_at = time.monotonic()
+    sampler = PeakRssSampler(proc.pid)
+    sampler.sample()
+    deadline = None if timeout is None else started_at + timeout
+    stdin_fd = proc.stdin.fileno() if proc.stdin is not None else None
+    out_fd = proc.stdout.fileno() if proc.stdout is not None else None
+    err_fd = proc.stderr.fileno() if proc.stderr is not None else None
+    buffers = {fd: bytearray() for fd in (out_fd, err_fd) if fd is not None}
+    truncated = False
+
+    def close_streams() -> None:
+        for stream in (proc.stdin, proc.stdout, proc.stderr):
+            if stream is not None and not stream.closed:
+                try:
+                    stream.close()
+                except BrokenPipeError:
+                    pass
+
+    with selectors.DefaultSelector() as selector:
+        for fd in buffers:
+            selector.register(fd, selectors.EVENT_READ)
+
+        pending = memoryview(stdin)
+        if stdin_fd is not None:
+            if pending:
+                os.set_blocking(stdin_fd, False)
+                selector.register(stdin_fd, selectors.EVENT_WRITE)
+            else:
+                proc.stdin.close()
+
+        while selector.get_map():
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                sampler.sample(force=True)
+                _kill(proc)
+                usage = _add_peak_memory(reap(proc, started_at), sampler, cgroup)
+                close_streams()
+                timeout_error = subprocess.TimeoutExpired(
+                    proc.args, timeout,
+                    output=bytes(buffers[out_fd]) if out_fd is not None else None,
+                    stderr=bytes(buffers[err_fd]) if err_fd is not None else None,
+                )
+                timeout_error.usage = usage
+                raise timeout_error
+
+            sampler.sample()
+            wait = _RSS_SAMPLE_SECONDS if remaining is None else min(remaining, _RSS_SAMPLE_SECONDS)
+            for key, _ in selector.select(wait):
+                fd = key.fd
+                if fd == stdin_fd:
+                    try:
+                        pending = pending[os.write(fd, pending[:_WRITE_CHUNK]):]
+                    except BlockingIOError:
+                        continue
+                    except BrokenPipeError:
+                        pending = pending[len(pending):]
+                    if not pending:
+                        selector.unregister(fd)
+                        try:
+                            proc.stdin.close()
+                        except BrokenPipeError:
+                            pass
+                    continue
+
+                chunk = os.read(fd, _READ_CHUNK)
+                if not chunk:
+                    selector.unregister(fd)
+                    continue
+                buffer = buffers[fd]
+                room = limit - len(buffer)
+                buffer.extend(chunk[:room])
+                if len(chunk) > room:
+                    # Stop reading and kill the program; everything past the cap is dropped.
+                    truncated = True
+                    sampler.sample(force=True)
+                    _kill(proc)
+                    for registered in list(selector.get_map()):
+                        selector.unregister(registered)
+                    break
+
+    try:
+        usage = reap(proc, started_at, deadline, sampler)
+    except subprocess.TimeoutExpired:
+        # The program closed its pipes but kept running.
+        _kill(proc)
+        usage = _add_peak_memory(reap(proc, started_at), sampler, cgroup)
+        close_streams()
+        timeout_error = subprocess.TimeoutExpired(proc.args, timeout)
+        timeout_error.usage = usage
+        raise timeout_error from None
+    close_streams()
+    _add_peak_memory(usage, sampler, cgroup)
+
+    return BoundedCompletedProcess(
+        proc.args,
+        proc.returncode,
+        decode_output(bytes(buffers[out_fd])) if out_fd is not None else None,
+        decode_output(bytes(buffers[err_fd])) if err_fd is not None else None,
+        truncated=truncated,
+        usage=usage,
+    )
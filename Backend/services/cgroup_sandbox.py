@@ -0,0 +1,292 @@
+import errno
+import logging
+import os
+import shutil
+import signal
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_CONTROLLERS = ('cpu', 'memory', 'pids')
+CPU_PERIOD_USEC = 100000
+
+# A gated command waits for one line on stdin before exec'ing the real
+# program, which gives the parent time to move it into its run cgroup
+# (see ``RunCgroup.attach``) without a ``preexec_fn``.
+GATE = b'\n'
+_GATE_PREFIX = ['/bin/sh', '-c', 'read -r _ && exec "$@"', 'gate']
+
+
+def gate_command(command: list[str]) -> list[str]:
+    """Wrap ``command`` so it only starts once ``GATE`` is written to its stdin."""
+    if shutil.which(command[0]) is None:
+        raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), command[0])
+    return _GATE_PREFIX + command
+
+
+def _find_cgroup2_mount() -> Optional[str]:
+    try:
+        with open('/proc/self/mountinfo') as f:
+            for line in f:
+                fields = line.split()
+                separator = fields.index('-')
+                if fields[separator + 1] == 'cgroup2':
+                    return fields[4]
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _own_cgroup_path() -> Optional[str]:
+    try:
+        with open('/proc/self/cgroup') as f:
+            for line in f:
+                if line.startswith('0::'):
+                    return line[3:].strip()
+    except OSError:
+        pass
+    return None
+
+
+def _read_keyed(path: str) -> dict:
+    """Parse a flat-keyed cgroup file such as ``memory.events`` or ``cpu.stat``."""
+    values = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                key, _, value = line.partition(' ')
+                if value.strip().isdigit():
+                    values[key] = int(value)
+    except OSError:
+        pass
+    return values
+
+
+def _read_int(path: str) -> Optional[int]:
+    try:
+        with open(path) as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def _write(path: str, value: str) -> None:
+    with open(path, 'w') as f:
+        f.write(value)
+
+
+class RunCgroup:
+    """A leaf cgroup holding one program run."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._procs = os.path.join(path, 'cgroup.procs')
+        self.attach_error: Optional[str] = None
+
+    def attach(self, pid: int) -> bool:
+        """
+        Move a process that has not started the user's code yet (a gated
+        command or a pooled worker blocked on stdin) into this cgroup.
+
+        A failure is logged and shows up in ``report()``; the run itself goes
+        ahead unconfined.
+        """
+        try:
+            _write(self._procs, str(pid))
+            return True
+        except OSError as exc:
+            self.attach_error = str(exc)
+            logger.warning("Could not move pid %s into %s: %s", pid, self.path, exc)
+            return False
+
+    def report(self) -> dict:
+        """Summarise OOM kills, throttling and limit hits recorded for this run."""
+        memory = _read_keyed(os.path.join(self.path, 'memory.events'))
+        cpu = _read_keyed(os.path.join(self.path, 'cpu.stat'))
+        pids = _read_keyed(os.path.join(self.path, 'pids.events'))
+        peak = _read_int(os.path.join(self.path, 'memory.peak'))
+        return {
+            'attached': self.attach_error is None,
+            'attach_error': self.attach_error,
+            'oom_killed': memory.get('oom_kill', 0) > 0,
+            'memory_limit_hits': memory.get('max', 0),
+            'memory_peak_kb': peak // 1024 if peak is not None else None,
+            'cpu_usage_ms': round(cpu.get('usage_usec', 0) / 1000, 2),
+            'cpu_throttled_ms': round(cpu.get('throttled_usec', 0) / 1000, 2),
+            'nr_throttled': cpu.get('nr_throttled', 0),
+            'pids_limit_hits': pids.get('max', 0),
+        }
+
+    def destroy(self) -> None:
+        """Kill anything left in the cgroup (e.g. forked children) and remove it."""
+        try:
+            _write(os.path.join(self.path, 'cgroup.kill'), '1')
+        except OSError:
+            # cgroup.kill needs Linux 5.14; signal the members one by one instead.
+            for _ in range(3):
+                try:
+                    with open(self._procs) as f:
+                        pids = [int(line) for line in f if line.strip()]
+                except OSError:
+                    break
+                for pid in pids:
+                    try:
+                        os.kill(pid, signal.SIGKILL)
+                    except ProcessLookupError:
+                        pass
+        for _ in range(50):
+            try:
+                os.rmdir(self.path)
+                return
+            except FileNotFoundError:
+                return
+            except OSError as exc:
+                if exc.errno != errno.EBUSY:
+                    break
+                time.sleep(0.01)
+        logger.warning("Could not remove cgroup %s", self.path)
+
+
+class CgroupSandbox:
+    """
+    Place each program run in its own cgroup v2 with CPU, memory and pids limits.
+
+    The first use sets up a ``gencode-runs`` parent under this process's
+    cgroup (or ``parent`` when given) and enables the cpu, memory and pids
+    controllers for it. If cgroup v2 or those controllers are unavailable, or
+    not writable, ``group()`` yields ``None`` and runs go ahead unconfined.
+    """
+
+    def __init__(self, enabled: bool, cpu_limit: float, memory_limit_mb: int, pids_max: int,
+                 parent: Optional[str] = None):
+        self.enabled = enabled
+        self.cpu_limit = cpu_limit
+        self.memory_limit_mb = memory_limit_mb
+        self.pids_max = pids_max
+        self.parent = parent
+        self._lock = threading.Lock()
+        self._runs_root: Optional[str] = None
+        self._checked = False
+        self.unavailable_reason: Optional[str] = None if enabled else 'disabled'
+        self._runs = 0
+        self._oom_kills = 0
+        self._throttled_runs = 0
+        self._attach_failures = 0
+
+    def _enable_controllers(self, path: str) -> None:
+        with open(os.path.join(path, 'cgroup.controllers')) as f:
+            available = f.read().split()
+        missing = [name for name in REQUIRED_CONTROLLERS if name not in available]
+        if missing:
+            raise RuntimeError(f"controllers not delegated to {path}: {', '.join(missing)}")
+        _write(os.path.join(path, 'cgroup.subtree_control'), ' '.join(f'+{name}' for name in REQUIRED_CONTROLLERS))
+
+    def _setup(self) -> str:
+        base = self.parent
+        if base is None:
+            mount, own = _find_cgroup2_mount(), _own_cgroup_path()
+            if mount is None or own is None:
+                raise RuntimeError('cgroup v2 is not mounted')
+            base = os.path.join(mount, own.lstrip('/'))
+
+        try:
+            self._enable_controllers(base)
+        except OSError as exc:
+            if exc.errno != errno.EBUSY:
+                raise
+            # cgroup v2 forbids controllers on a cgroup that holds processes, so
+            # move the service's own processes into a leaf next to the runs.
+            service = os.path.join(base, 'gencode-service')
+            os.makedirs(service, exist_ok=True)
+            with open(os.path.join(base, 'cgroup.procs')) as f:
+                for pid in f.read().split():
+                    try:
+                        _write(os.path.join(service, 'cgroup.procs'), pid)
+                    except OSError:
+                        pass
+            self._enable_controllers(base)
+
+        runs_root = os.path.join(base, 'gencode-runs')
+        os.makedirs(runs_root, exist_ok=True)
+        self._enable_controllers(runs_root)
+        return runs_root
+
+    def _runs_root_or_none(self) -> Optional[str]:
+        with self._lock:
+            if not self._checked and self.enabled:
+                self._checked = True
+                try:
+                    self._runs_root = self._setup()
+                    logger.info("Running user programs in cgroups under %s", self._runs_root)
+                except Exception as exc:
+                    self.unavailable_reason = str(exc)
+                    logger.warning("cgroup isolation unavailable, running without it: %s", exc)
+            return self._runs_root
+
+    def _create(self, runs_root: str) -> RunCgroup:
+        group = RunCgroup(os.path.join(runs_root, f'run-{uuid.uuid4().hex[:16]}'))
+        os.mkdir(group.path)
+        try:
+            quota = max(int(self.cpu_limit * CPU_PERIOD_USEC), 1000)
+            _write(os.path.join(group.path, 'cpu.max'), f'{quota} {CPU_PERIOD_USEC}')
+            _write(os.path.join(group.path, 'memory.max'), str(self.memory_limit_mb * 1024 * 1024))
+            if os.path.exists(os.path.join(group.path, 'memory.swap.max')):
+                _write(os.path.join(group.path, 'memory.swap.max'), '0')
+            if os.path.exists(os.path.join(group.path, 'memory.oom.group')):
+                _write(os.path.join(group.path, 'memory.oom.group'), '1')
+            _write(os.path.join(group.path, 'pids.max'), str(self.pids_max))
+        except OSError:
+            group.destroy()
+            raise
+        return group
+
+    @contextmanager
+    def group(self) -> Iterator[Optional[RunCgroup]]:
+        """Yield a fresh limited cgroup for one run (or ``None``), destroying it afterwards."""
+        runs_root = self._runs_root_or_none()
+        if runs_root is None:
+            yield None
+            return
+        try:
+            group = self._create(runs_root)
+        except OSError as exc:
+            logger.warning("Could not create a run cgroup: %s", exc)
+            yield None
+            return
+        try:
+            yield group
+        finally:
+            report = group.report()
+            group.destroy()
+            with self._lock:
+                self._runs += 1
+                self._oom_kills += report['oom_killed']
+                self._throttled_runs += report['nr_throttled'] > 0
+                self._attach_failures += not report['attached']
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'available': self._runs_root is not None,
+                'reason': self.unavailable_reason if self._runs_root is None else None,
+                'cpu_limit': self.cpu_limit,
+                'memory_limit_mb': self.memory_limit_mb,
+                'pids_max': self.pids_max,
+                'runs': self._runs,
+                'oom_kills': self._oom_kills,
+                'throttled_runs': self._throttled_runs,
+                'attach_failures': self._attach_failures,
+            }
+
+
+cgroup_sandbox = CgroupSandbox(
+    enabled=os.getenv('SANDBOX_CGROUPS', 'auto').lower() != 'off',
+    cpu_limit=float(os.getenv('SANDBOX_CPU_LIMIT', '1')),
+    memory_limit_mb=int(os.getenv('SANDBOX_MEMORY_MB', '256')),
+    pids_max=int(os.getenv('SANDBOX_PIDS_MAX', '64')),
+    parent=os.getenv('SANDBOX_CGROUP_PARENT') or None,
+)
@@ -1,8 +1,12 @@
+import os
 import re
 
 from config.config import get_llm
 from services.language_utils import is_supported_language, language_label, normalize_language
 
+# Starter code is converted between the same language pairs over and over.
+CACHE_TTL_SECONDS = float(os.getenv('LANGUAGE_CHANGE_CACHE_TTL_SECONDS', str(7 * 24 * 3600)))
+
 def LangChange(code, fromLang, toLang):
     """Convert the initial code from one language to another language"""
     source_language = normalize_language(fromLang)
@@ -57,7 +61,7 @@ Source code:
 ```
 """
 
-    response = get_llm().invoke(prompt).content.strip()
+    response = get_llm(cache_ttl=CACHE_TTL_SECONDS).invoke(prompt).content.strip()
     result_match = re.search(r"\[Result\]:\s*(.+?)(?:\n|$)", response, re.IGNORECASE)
     result = result_match.group(1).strip() if result_match else "Failure"
 
@@ -1,8 +1,59 @@
+import logging
 import subprocess
-import tempfile
 import os
-import shutil
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache, partial
+from typing import Callable, Iterator
+
+from services.compile_cache import compile_cache, make_cache_key
+from services.java_server import JVM_FLAGS, JavaServerUnavailable, java_compile_server, java_runner_pools
+from services.language_utils import is_supported_language, normalize_language
+from services.pch import pch_manager
+from services.node_pool import node_pool
+from services.python_pool import python_pool
+from services.bounded_process import OUTPUT_LIMIT_BYTES, BoundedCompletedProcess, communicate_bounded
+from services.cgroup_sandbox import GATE, cgroup_sandbox, gate_command
+from services.workspace import workspace_manager
+
+logger = logging.getLogger(__name__)
+
+RUN_TIMEOUT = 5
+COMPILE_TIMEOUT = 30
+BATCH_MAX_WORKERS = int(os.getenv('BATCH_MAX_WORKERS', str(os.cpu_count() or 1)))
+
+# run(stdin, timeout) for a prepared program.
+Runner = Callable[[bytes, float], BoundedCompletedProcess]
+
+# Compiler invocation per build profile and compiled language. "run" favours
+# compile speed for interactive runs, "judge" produces optimized binaries for
+# test cases. Flags are part of the cache key, so changing them never serves a
+# stale artifact.
+BUILD_PROFILES = {
+    'run': {
+        'c': ['gcc', '-O0', '-pipe', '-std=gnu17'],
+        'cpp': ['g++', '-O0', '-pipe', '-std=c++17'],
+        'java': ['javac'],
+    },
+    'judge': {
+        'c': ['gcc', '-O2', '-pipe', '-std=gnu17'],
+        'cpp': ['g++', '-O2', '-pipe', '-std=c++17'],
+        'java': ['javac', '-g:none'],
+    },
+}
+DEFAULT_PROFILE = 'run'
+JUDGE_PROFILE = 'judge'
+COMPILERS = BUILD_PROFILES[DEFAULT_PROFILE]
+
+SOURCE_FILES = {
+    'c': 'main.c',
+    'cpp': 'main.cpp',
+    'javascript': 'main.js',
+    'python': 'main.py',
+}
+
 
 def extract_java_class_name(code: str) -> str:
     """Extracts the public class name from Java source code."""
@@ -12,63 +63,275 @@ def extract_java_class_name(code: str) -> str:
     else:
         raise ValueError("No public class found in Java code")
 
-def compile_code(code: str, lang: str) -> dict:
+
+@lru_cache(maxsize=None)
+def toolchain_version(compiler: str) -> str:
+    """Return the first line of the compiler's version banner."""
     try:
-        if lang == 'python':
-            with tempfile.NamedTemporaryFile(suffix=".py", delete=False) as temp:
-                temp.write(code.encode())
-                temp.flush()
-                result = subprocess.run(['python3', temp.name], capture_output=True, text=True, timeout=5)
-
-        elif lang == 'c':
-            with tempfile.NamedTemporaryFile(suffix=".c", delete=False) as source:
-                source.write(code.encode())
-                source.flush()
-                exe_file = source.name.replace('.c', '')
-                compile_proc = subprocess.run(['gcc', source.name, '-o', exe_file], capture_output=True, text=True)
-                if compile_proc.returncode != 0:
-                    return {'result': 'Compilation Error', 'message': compile_proc.stderr}
-                result = subprocess.run([exe_file], capture_output=True, text=True, timeout=5)
-
-        elif lang == 'cpp':
-            with tempfile.NamedTemporaryFile(suffix=".cpp", delete=False) as source:
-                source.write(code.encode())
-                source.flush()
-                exe_file = source.name.replace('.cpp', '')
-                compile_proc = subprocess.run(['g++', source.name, '-o', exe_file], capture_output=True, text=True)
-                if compile_proc.returncode != 0:
-                    return {'result': 'Compilation Error', 'message': compile_proc.stderr}
-                result = subprocess.run([exe_file], capture_output=True, text=True, timeout=5)
-
-        elif lang == 'java':
-            temp_dir = tempfile.mkdtemp()
-            try:
-                class_name = extract_java_class_name(code)
-                java_file = os.path.join(temp_dir, f"{class_name}.java")
-                with open(java_file, "w") as f:
-                    f.write(code)
-                compile_proc = subprocess.run(['javac', java_file], capture_output=True, text=True)
-                if compile_proc.returncode != 0:
-                    return {'result': 'Compilation Error', 'message': compile_proc.stderr}
-                result = subprocess.run(['java', '-cp', temp_dir, class_name], capture_output=True, text=True, timeout=5)
-            finally:
-                shutil.rmtree(temp_dir)
-
-        elif lang == 'javascript':
-            with tempfile.NamedTemporaryFile(suffix=".js", delete=False) as temp:
-                temp.write(code.encode())
-                temp.flush()
-                result = subprocess.run(['node', temp.name], capture_output=True, text=True, timeout=5)
+        proc = subprocess.run([compiler, '-version' if compiler == 'javac' else '--version'],
+                              capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return 'unknown'
+    banner = (proc.stdout or proc.stderr).strip()
+    return banner.splitlines()[0] if banner else 'unknown'
+
+
+def _spawn(command: list[str], env: dict | None = None) -> subprocess.Popen:
+    return subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env)
+
+
+def _write_source(workspace: str, filename: str, code: str) -> str:
+    path = os.path.join(workspace, filename)
+    with open(path, 'w') as f:
+        f.write(code)
+    return path
+
+
+def _build_native(code: str, lang: str, compiler: list[str], usage: dict, out_dir: str) -> str | None:
+    pch_args = pch_manager.args_for(lang, code, compiler, toolchain_version(compiler[0]))
+    with workspace_manager.workspace() as workspace:
+        source = _write_source(workspace, SOURCE_FILES[lang], code)
+        # Keep the compiler's intermediate files in the workspace too.
+        compile_proc = communicate_bounded(
+            _spawn(compiler + pch_args + [source, '-o', os.path.join(out_dir, 'main')],
+                   env={**os.environ, 'TMPDIR': workspace}),
+            timeout=COMPILE_TIMEOUT,
+        )
+    usage.update(compile_proc.usage)
+    return compile_proc.stderr if compile_proc.returncode != 0 else None
+
+
+def _build_java(code: str, class_name: str, compiler: list[str], usage: dict, out_dir: str) -> str | None:
+    started_at = time.monotonic()
+    try:
+        error = java_compile_server.compile(code, class_name, out_dir, compiler[1:], timeout=COMPILE_TIMEOUT)
+        # The compile server is shared, so only the wall time belongs to this build.
+        usage['wall_ms'] = round((time.monotonic() - started_at) * 1000, 2)
+        return error
+    except JavaServerUnavailable as exc:
+        logger.warning("Falling back to javac: %s", exc)
+
+    with workspace_manager.workspace() as workspace:
+        java_file = _write_source(workspace, f"{class_name}.java", code)
+        compile_proc = communicate_bounded(
+            _spawn(compiler + ['-d', out_dir, java_file]),
+            timeout=COMPILE_TIMEOUT,
+        )
+    usage.update(compile_proc.usage)
+    return compile_proc.stderr if compile_proc.returncode != 0 else None
+
+
+def _run_process(command: list[str], stdin: bytes, timeout: float) -> BoundedCompletedProcess:
+    with cgroup_sandbox.group() as cgroup:
+        if cgroup is None:
+            return communicate_bounded(_spawn(command), stdin, timeout)
+        proc = _spawn(gate_command(command))
+        cgroup.attach(proc.pid)
+        return communicate_bounded(proc, GATE + stdin, timeout, cgroup=cgroup)
+
+
+def _oom_killed(usage: dict | None) -> bool:
+    return bool(((usage or {}).get('cgroup') or {}).get('oom_killed'))
+
+
+def _run_java(class_dir: str, class_name: str, profile: str, stdin: bytes, timeout: float) -> BoundedCompletedProcess:
+    try:
+        return java_runner_pools[profile].run(class_dir, class_name, stdin, timeout)
+    except JavaServerUnavailable as exc:
+        logger.warning("Falling back to a cold JVM: %s", exc)
+    return _run_process(['java'] + JVM_FLAGS[profile] + ['-cp', class_dir, class_name], stdin, timeout)
+
+
+class PreparedProgram:
+    """
+    A submission compiled once and ready to run.
+
+    ``run(stdin, timeout)`` executes the program and may be called any number
+    of times, concurrently. ``command`` is the equivalent plain argv, for
+    callers that drive the process themselves (e.g. interactive runs).
+    ``error`` holds compiler diagnostics when the build failed, and
+    ``compile_usage`` the build's resource usage (``None`` for interpreted
+    languages and cache hits).
+    """
+
+    def __init__(self, run: Runner | None = None, error: str | None = None,
+                 cached: bool = False, compile_usage: dict | None = None,
+                 command: list[str] | None = None):
+        self.run = run
+        self.error = error
+        self.cached = cached
+        self.compile_usage = compile_usage
+        self.command = command
 
+
+@contextmanager
+def prepare_program(code: str, lang: str, profile: str = DEFAULT_PROFILE) -> Iterator[PreparedProgram]:
+    """Compile ``code`` with the ``profile`` flags (or reuse a cached build) for the lifetime of the context."""
+    if lang == 'python':
+        with workspace_manager.workspace() as workspace:
+            script = _write_source(workspace, SOURCE_FILES[lang], code)
+            yield PreparedProgram(run=partial(python_pool.run, code),
+                                  command=[python_pool.argv[0], '-u', script])
+
+    elif lang == 'javascript':
+        with workspace_manager.workspace() as workspace:
+            script = _write_source(workspace, SOURCE_FILES[lang], code)
+            yield PreparedProgram(run=partial(node_pool.run, script), command=[node_pool.node, script])
+
+    elif lang in COMPILERS:
+        if profile not in BUILD_PROFILES:
+            raise ValueError(f'Unknown build profile: {profile}')
+        compiler = BUILD_PROFILES[profile][lang]
+        usage = {}
+        if lang == 'java':
+            class_name = extract_java_class_name(code)
+            builder = partial(_build_java, code, class_name, compiler, usage)
         else:
-            return {'result': 'Compilation Error', 'message': f'Unsupported language: {lang}'}
+            builder = partial(_build_native, code, lang, compiler, usage)
+
+        key = make_cache_key(lang, code, profile, ' '.join(compiler), toolchain_version(compiler[0]))
+        with compile_cache.lease(key, builder) as (artifact, error, cached):
+            compile_usage = usage or None
+            if error is not None:
+                yield PreparedProgram(error=error, compile_usage=compile_usage)
+            elif lang == 'java':
+                yield PreparedProgram(partial(_run_java, artifact, class_name, profile), cached=cached,
+                                      compile_usage=compile_usage,
+                                      command=['java'] + JVM_FLAGS[profile] + ['-cp', artifact, class_name])
+            else:
+                binary = os.path.join(artifact, 'main')
+                yield PreparedProgram(partial(_run_process, [binary]), cached=cached,
+                                      compile_usage=compile_usage, command=[binary])
+
+    else:
+        raise ValueError(f'Unsupported language: {lang}')
+
+
+def _log_usage(lang: str, compile_usage: dict | None, run_usage: dict | None) -> None:
+    if compile_usage:
+        logger.info("Compiled %s submission: %s", lang, compile_usage)
+    if run_usage:
+        logger.info("Ran %s submission: %s", lang, run_usage)
+
+
+def compile_code(code: str, lang: str, profile: str = DEFAULT_PROFILE) -> dict:
+    lang = normalize_language(lang)
+    if not is_supported_language(lang):
+        return {'result': 'Compilation Error', 'message': f'Unsupported language: {lang}', 'language': lang}
+
+    usage = {'compile': None, 'run': None}
+    try:
+        with prepare_program(code, lang, profile) as program:
+            usage['compile'] = program.compile_usage
+            if program.error is not None:
+                _log_usage(lang, usage['compile'], None)
+                return {'result': 'Compilation Error', 'message': program.error, 'language': lang, 'usage': usage}
+            result = program.run(b'', RUN_TIMEOUT)
+
+        usage['run'] = result.usage
+        _log_usage(lang, usage['compile'], usage['run'])
+
+        if _oom_killed(result.usage):
+            return {
+                'result': 'Memory Limit Exceeded',
+                'message': result.stderr + f'\nKilled: memory limit of {cgroup_sandbox.memory_limit_mb} MB exceeded',
+                'language': lang,
+                'cached': program.cached,
+                'truncated': False,
+                'usage': usage,
+            }
+
+        if result.truncated:
+            return {
+                'result': 'Output Limit Exceeded',
+                'message': result.stdout + f'\n... output truncated after {OUTPUT_LIMIT_BYTES} bytes',
+                'language': lang,
+                'cached': program.cached,
+                'truncated': True,
+                'usage': usage,
+            }
 
         return {
-            'result': 'success' if result.returncode == 0 else 'Compilation Error',
+            'result': 'Success' if result.returncode == 0 else 'Compilation Error',
             'message': result.stdout if result.returncode == 0 else result.stderr,
+            'language': lang,
+            'cached': program.cached,
+            'truncated': False,
+            'usage': usage,
+        }
+
+    except subprocess.TimeoutExpired as e:
+        usage['run'] = getattr(e, 'usage', None)
+        _log_usage(lang, usage['compile'], usage['run'])
+        return {'result': 'Compilation Error', 'message': 'Execution timed out', 'language': lang, 'usage': usage}
+    except Exception as e:
+        return {'result': 'Compilation Error', 'message': str(e), 'language': lang}
+
+
+def _run_case(run: Runner, timeout: float, index: int, stdin: str) -> dict:
+    started_at = time.perf_counter()
+    try:
+        proc = run(stdin.encode(), timeout)
+    except subprocess.TimeoutExpired as e:
+        return {
+            'index': index,
+            'status': 'Time Limit Exceeded',
+            'exit_code': None,
+            'stdout': '',
+            'stderr': 'Execution timed out',
+            'truncated': False,
+            'time_ms': round((time.perf_counter() - started_at) * 1000, 2),
+            'usage': getattr(e, 'usage', None),
         }
+    if _oom_killed(proc.usage):
+        status = 'Memory Limit Exceeded'
+    elif proc.truncated:
+        status = 'Output Limit Exceeded'
+    else:
+        status = 'OK' if proc.returncode == 0 else 'Runtime Error'
+    return {
+        'index': index,
+        'status': status,
+        'exit_code': proc.returncode,
+        'stdout': proc.stdout,
+        'stderr': proc.stderr,
+        'truncated': proc.truncated,
+        'time_ms': round((time.perf_counter() - started_at) * 1000, 2),
+        'usage': proc.usage,
+    }
+
+
+def run_batch(code: str, lang: str, inputs: list[str], timeout: float = RUN_TIMEOUT,
+              profile: str = DEFAULT_PROFILE) -> dict:
+    """
+    Compile ``code`` once and run it against every stdin in ``inputs``.
 
-    except subprocess.TimeoutExpired:
-        return {'result': 'Compilation Error', 'message': 'Execution timed out'}
+    Runs are spread over up to ``BATCH_MAX_WORKERS`` processes at a time and
+    returned in input order with their stdout, exit status, wall time and
+    resource usage.
+    """
+    lang = normalize_language(lang)
+    if not is_supported_language(lang):
+        return {'result': 'Compilation Error', 'message': f'Unsupported language: {lang}', 'language': lang, 'results': []}
+
+    try:
+        with prepare_program(code, lang, profile) as program:
+            if program.error is not None:
+                return {'result': 'Compilation Error', 'message': program.error, 'language': lang,
+                        'results': [], 'compile_usage': program.compile_usage}
+            if not inputs:
+                results = []
+            else:
+                with ThreadPoolExecutor(max_workers=min(len(inputs), BATCH_MAX_WORKERS)) as executor:
+                    results = list(executor.map(partial(_run_case, program.run, timeout), range(len(inputs)), inputs))
     except Exception as e:
-        return {'result': 'Compilation Error', 'message': str(e)}
+        return {'result': 'Compilation Error', 'message': str(e), 'language': lang, 'results': []}
+
+    _log_usage(lang, program.compile_usage, None)
+    return {
+        'result': 'Success',
+        'language': lang,
+        'cached': program.cached,
+        'compile_usage': program.compile_usage,
+        'results': results,
+    }
@@ -0,0 +1,184 @@
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'gencode-compile-cache')
+STALE_STAGING_SECONDS = 3600
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                continue
+    return total
+
+
+def make_cache_key(*parts: str) -> str:
+    """Build a content-addressed key from the parts that influence a build."""
+    digest = hashlib.sha256()
+    for part in parts:
+        encoded = str(part).encode()
+        digest.update(len(encoded).to_bytes(8, 'big'))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+class CompileCache:
+    """Size-bounded LRU cache of compiled artifact directories on local disk."""
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, int]' = OrderedDict()
+        self._leases: Dict[str, int] = {}
+        self._total_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._load_existing()
+
+    def _load_existing(self) -> None:
+        """Index artifacts left by a previous process, oldest first."""
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            for name in os.listdir(self.root):
+                staging = os.path.join(self.root, name)
+                if name.startswith('.staging-') and time.time() - os.path.getmtime(staging) > STALE_STAGING_SECONDS:
+                    shutil.rmtree(staging, ignore_errors=True)
+            names = [
+                name for name in os.listdir(self.root)
+                if not name.startswith('.') and os.path.isdir(os.path.join(self.root, name))
+            ]
+        except OSError as exc:
+            logger.warning("Compile cache directory %s is unavailable: %s", self.root, exc)
+            return
+
+        names.sort(key=lambda name: os.path.getmtime(os.path.join(self.root, name)))
+        for name in names:
+            size = _dir_size(os.path.join(self.root, name))
+            self._entries[name] = size
+            self._total_bytes += size
+        self._evict_locked()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def _evict_locked(self) -> None:
+        for key in list(self._entries):
+            if self._total_bytes <= self.max_bytes:
+                break
+            if self._leases.get(key):
+                continue
+            size = self._entries.pop(key)
+            self._total_bytes -= size
+            self._evictions += 1
+            shutil.rmtree(self._path(key), ignore_errors=True)
+
+    def _touch_locked(self, key: str) -> None:
+        self._entries.move_to_end(key)
+        try:
+            os.utime(self._path(key))
+        except OSError:
+            pass
+
+    @contextmanager
+    def lease(
+        self,
+        key: str,
+        builder: Callable[[str], Optional[str]],
+    ) -> Iterator[Tuple[Optional[str], Optional[str], bool]]:
+        """
+        Yield ``(artifact_dir, error, cached)`` for ``key``.
+
+        On a miss ``builder`` is called with an empty staging directory and must
+        return ``None`` on success or an error message. Successful builds are
+        moved into the cache. The artifact directory is protected from eviction
+        until the context exits.
+        """
+        with self._lock:
+            cached = key in self._entries
+            if cached:
+                self._hits += 1
+                self._touch_locked(key)
+                self._leases[key] = self._leases.get(key, 0) + 1
+            else:
+                self._misses += 1
+
+        if not cached:
+            staging = os.path.join(self.root, f".staging-{uuid.uuid4().hex}")
+            os.makedirs(staging)
+            try:
+                error = builder(staging)
+                if error is not None:
+                    yield None, error, False
+                    return
+                self._store(key, staging)
+            finally:
+                shutil.rmtree(staging, ignore_errors=True)
+
+        try:
+            yield self._path(key), None, cached
+        finally:
+            with self._lock:
+                remaining = self._leases.get(key, 1) - 1
+                if remaining:
+                    self._leases[key] = remaining
+                else:
+                    self._leases.pop(key, None)
+                self._evict_locked()
+
+    def _store(self, key: str, staging: str) -> None:
+        size = _dir_size(staging)
+        with self._lock:
+            if key not in self._entries:
+                try:
+                    os.rename(staging, self._path(key))
+                except OSError:
+                    # Another process published the same artifact first.
+                    size = _dir_size(self._path(key))
+                self._entries[key] = size
+                self._total_bytes += size
+            self._touch_locked(key)
+            self._leases[key] = self._leases.get(key, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._entries):
+                if self._leases.get(key):
+                    continue
+                self._total_bytes -= self._entries.pop(key)
+                shutil.rmtree(self._path(key), ignore_errors=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0,
+                'evictions': self._evictions,
+                'entries': len(self._entries),
+                'size_bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+
+compile_cache = CompileCache(
+    root=os.getenv('COMPILE_CACHE_DIR', DEFAULT_CACHE_DIR),
+    max_bytes=int(os.getenv('COMPILE_CACHE_MAX_MB', '256')) * 1024 * 1024,
+)
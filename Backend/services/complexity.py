@@ -0,0 +1,244 @@
+import math
+import os
+import re
+import subprocess
+import time
+from typing import Callable
+
+from services.codeCompiler import JUDGE_PROFILE, Runner, prepare_program
+from services.language_utils import is_supported_language, normalize_language
+
+PROFILE_MIN_SIZE = int(os.getenv('PROFILE_MIN_SIZE', '64'))
+PROFILE_MAX_SIZE = int(os.getenv('PROFILE_MAX_SIZE', '262144'))
+PROFILE_RUN_TIMEOUT = float(os.getenv('PROFILE_RUN_TIMEOUT', '2'))
+PROFILE_BUDGET_SECONDS = float(os.getenv('PROFILE_BUDGET_SECONDS', '15'))
+PROFILE_REPEATS = int(os.getenv('PROFILE_REPEATS', '3'))
+# Submissions slower than the reference by more than this factor at the largest size are "Too Slow".
+PROFILE_SLOWDOWN_LIMIT = float(os.getenv('PROFILE_SLOWDOWN_LIMIT', '5'))
+
+# Timing differences below this are indistinguishable from process start-up noise.
+MIN_MEASURABLE_MS = 5.0
+
+# Complexity classes in increasing order of growth.
+COMPLEXITY_CLASSES: list[tuple[str, Callable[[int], float]]] = [
+    ('O(1)', lambda n: 0.0),
+    ('O(log n)', lambda n: math.log2(n)),
+    ('O(n)', lambda n: float(n)),
+    ('O(n log n)', lambda n: n * math.log2(n)),
+    ('O(n^2)', lambda n: float(n) ** 2),
+    ('O(n^3)', lambda n: float(n) ** 3),
+    ('O(2^n)', lambda n: 2.0 ** n if n < 1000 else math.inf),
+]
+COMPLEXITY_RANK = {name: rank for rank, (name, _) in enumerate(COMPLEXITY_CLASSES)}
+
+_BRACKETED_LIST = re.compile(r'\[([^\[\]]*)\]')
+
+
+def _cycle(items: list[str], n: int) -> list[str]:
+    return [items[i % len(items)] for i in range(n)]
+
+
+def _join_rows(rows: list[list[str]]) -> str:
+    return '\n'.join(' '.join(row) for row in rows) + '\n'
+
+
+def make_input_scaler(sample: str) -> Callable[[int], str] | None:
+    """
+    Return ``scale(n)`` producing a version of ``sample`` whose main collection has ``n`` elements.
+
+    Recognised shapes, tried in order: a bracketed list (``[1, 2, 3]``), a
+    line of several values, optionally preceded by its length on the same
+    line or the line above (``3 1 2 3``, ``3\\n1 2 3``), and a single word
+    (scaled by characters). Elements are cycled from the sample so the values
+    stay in the problem's domain.
+    Returns ``None`` when the sample has no recognisable collection.
+    """
+    lists = list(_BRACKETED_LIST.finditer(sample))
+    if lists:
+        match = max(lists, key=lambda m: len(m.group(1)))
+        items = [item.strip() for item in match.group(1).split(',') if item.strip()]
+        if items:
+            prefix, suffix = sample[:match.start()], sample[match.end():]
+            return lambda n: f"{prefix}[{','.join(_cycle(items, n))}]{suffix}"
+
+    lines = sample.strip().splitlines()
+    rows = [line.split() for line in lines]
+    widest = max(range(len(rows)), key=lambda i: len(rows[i]), default=None)
+    if widest is not None and len(rows[widest]) >= 2:
+        row = rows[widest]
+        before, after = rows[:widest], rows[widest + 1:]
+        if row[0].isdigit() and int(row[0]) == len(row) - 1:
+            # "3 1 2 3": the count shares the line with the values.
+            return lambda n: _join_rows(before + [[str(n)] + _cycle(row[1:], n)] + after)
+        count_at = None
+        if before and str(len(row)) in before[-1]:
+            # "3\n1 2 3" or "3 7\n1 2 3": the count is on the line above.
+            count_at = before[-1].index(str(len(row)))
+
+        def scale(n: int) -> str:
+            head = [list(r) for r in before]
+            if count_at is not None:
+                head[-1][count_at] = str(n)
+            return _join_rows(head + [_cycle(row, n)] + after)
+        return scale
+
+    tokens = sample.split()
+    if len(tokens) == 1 and tokens[0].isalpha():
+        return lambda n: ''.join(_cycle(list(tokens[0]), n)) + '\n'
+    return None
+
+
+def profile_sizes(min_size: int = PROFILE_MIN_SIZE, max_size: int = PROFILE_MAX_SIZE) -> list[int]:
+    sizes, n = [], max(min_size, 2)
+    while n <= max_size:
+        sizes.append(n)
+        n *= 2
+    return sizes
+
+
+def _measure(run: Runner, stdin: bytes) -> tuple[str, float]:
+    """Run once and return ``(status, cpu_ms)``; CPU time is less noisy than wall time."""
+    started_at = time.perf_counter()
+    try:
+        proc = run(stdin, PROFILE_RUN_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        return 'Time Limit Exceeded', PROFILE_RUN_TIMEOUT * 1000
+    usage = proc.usage or {}
+    if 'cpu_user_ms' in usage:
+        elapsed = usage['cpu_user_ms'] + usage['cpu_sys_ms']
+    else:
+        elapsed = (time.perf_counter() - started_at) * 1000
+    if proc.truncated:
+        return 'Output Limit Exceeded', elapsed
+    return ('OK' if proc.returncode == 0 else 'Runtime Error'), elapsed
+
+
+def measure_growth(run: Runner, scale: Callable[[int], str], sizes: list[int]) -> list[dict]:
+    """
+    Time ``run`` on each scaled input, keeping the best of ``PROFILE_REPEATS`` runs.
+
+    Stops at the first size that does not finish cleanly or once
+    ``PROFILE_BUDGET_SECONDS`` has been spent, so slow solutions end early.
+    """
+    points = []
+    deadline = time.monotonic() + PROFILE_BUDGET_SECONDS
+    for n in sizes:
+        stdin = scale(n).encode()
+        best, status = math.inf, 'OK'
+        for _ in range(max(PROFILE_REPEATS, 1)):
+            status, elapsed = _measure(run, stdin)
+            if status != 'OK':
+                break
+            best = min(best, elapsed)
+        points.append({'n': n, 'status': status, 'time_ms': round(best, 2) if status == 'OK' else None})
+        if status != 'OK' or time.monotonic() > deadline:
+            break
+    return points
+
+
+def fit_complexity(points: list[dict]) -> dict:
+    """
+    Fit ``time = a + c * f(n)`` for every complexity class and pick the best.
+
+    The lowest class whose residual is within 10% of the best fit wins, so
+    noise does not push a linear curve into a higher class.
+    """
+    samples = [(p['n'], p['time_ms']) for p in points if p['status'] == 'OK']
+    if len(samples) < 3:
+        return {'complexity': None, 'note': 'Not enough successful runs to fit a curve'}
+    times = [t for _, t in samples]
+    if max(times) - min(times) < MIN_MEASURABLE_MS:
+        return {'complexity': 'O(1)', 'note': 'Growth is below the timer resolution at these sizes'}
+
+    fits = []
+    for name, f in COMPLEXITY_CLASSES:
+        xs = [f(n) for n, _ in samples]
+        if not all(math.isfinite(x) for x in xs):
+            continue
+        try:
+            mean_x, mean_t = sum(xs) / len(xs), sum(times) / len(times)
+            var_x = sum((x - mean_x) ** 2 for x in xs)
+            slope = sum((x - mean_x) * (t - mean_t) for x, t in zip(xs, times)) / var_x if var_x else 0.0
+            intercept = mean_t - slope * mean_x
+            residual = sum((t - intercept - slope * x) ** 2 for x, t in zip(xs, times))
+        except OverflowError:
+            # e.g. O(2^n) at a few hundred elements: far too steep to describe these runs.
+            continue
+        if slope < 0 or not all(math.isfinite(value) for value in (var_x, slope, residual)):
+            continue
+        fits.append((name, residual))
+
+    best_residual = min(residual for _, residual in fits)
+    tolerance = best_residual * 1.1 + 1e-9
+    name = next(name for name, residual in fits if residual <= tolerance)
+    return {'complexity': name, 'note': None}
+
+
+def _profile_program(code: str, lang: str, scale: Callable[[int], str], sizes: list[int]) -> dict:
+    with prepare_program(code, lang, JUDGE_PROFILE) as program:
+        if program.error is not None:
+            return {'result': 'Compilation Error', 'message': program.error, 'language': lang}
+        points = measure_growth(program.run, scale, sizes)
+    return {'result': 'Success', 'language': lang, 'points': points, **fit_complexity(points)}
+
+
+def profile_complexity(
+    typed_solution: str,
+    typed_language: str,
+    sample_input: str,
+    reference_solution: str | None = None,
+    reference_language: str = 'cpp',
+) -> dict:
+    """
+    Estimate the submission's time complexity from runs on inputs of growing size.
+
+    ``sample_input`` is scaled with ``make_input_scaler``. When a reference
+    solution is given it is measured on the same inputs, and the verdict is
+    ``Too Slow`` if the submission grows faster, times out where the reference
+    does not, or (in the same language) is more than ``PROFILE_SLOWDOWN_LIMIT``
+    times slower at the largest size both finished.
+    """
+    typed_language = normalize_language(typed_language)
+    if not is_supported_language(typed_language):
+        return {'result': 'Failure', 'message': f'Unsupported language: {typed_language}'}
+    scale = make_input_scaler(sample_input or '')
+    if scale is None:
+        return {'result': 'Failure', 'message': 'Could not find a list or string to scale in the sample input'}
+
+    sizes = profile_sizes()
+    submission = _profile_program(typed_solution, typed_language, scale, sizes)
+    if submission['result'] != 'Success':
+        return {'result': 'Compilation Error', 'message': submission['message']}
+
+    reference = None
+    if reference_solution and reference_solution.strip():
+        reference = _profile_program(reference_solution, normalize_language(reference_language), scale, sizes)
+        if reference['result'] != 'Success':
+            reference = None
+
+    report = {'result': 'Success', 'sizes': sizes, 'submission': submission, 'reference': reference,
+              'slowdown': None, 'verdict': 'OK', 'reasons': []}
+    if reference is None:
+        return report
+
+    timings = {p['n']: p['time_ms'] for p in reference['points'] if p['status'] == 'OK'}
+    common = [p for p in submission['points'] if p['status'] == 'OK' and p['n'] in timings]
+    if common:
+        largest = common[-1]
+        report['slowdown'] = round(largest['time_ms'] / max(timings[largest['n']], 0.01), 2)
+        # Constant factors differ too much between languages to compare raw times.
+        same_language = submission['language'] == reference['language']
+        if same_language and report['slowdown'] > PROFILE_SLOWDOWN_LIMIT and largest['time_ms'] >= MIN_MEASURABLE_MS:
+            report['reasons'].append(f"{report['slowdown']}x slower than the reference at n={largest['n']}")
+
+    failed = next((p for p in submission['points'] if p['status'] != 'OK'), None)
+    if failed is not None and reference['points'][-1]['n'] > failed['n']:
+        report['reasons'].append(f"{failed['status']} at n={failed['n']} where the reference finished")
+
+    ours, theirs = submission.get('complexity'), reference.get('complexity')
+    if ours and theirs and COMPLEXITY_RANK[ours] > COMPLEXITY_RANK[theirs]:
+        report['reasons'].append(f"Measured growth {ours} versus {theirs} for the reference")
+
+    if report['reasons']:
+        report['verdict'] = 'Too Slow'
+    return report
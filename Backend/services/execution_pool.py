@@ -0,0 +1,118 @@
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+
+class ExecutionPoolFull(RuntimeError):
+    """Raised when the execution queue is full; ``retry_after`` is a suggested wait in seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Code execution is busy, please retry shortly.")
+        self.retry_after = retry_after
+
+
+class ExecutionPool:
+    """
+    Dedicated worker pool for compile/run jobs with admission control.
+
+    At most ``max_concurrency`` jobs run at once and at most ``max_queue`` wait
+    behind them. Anything beyond that is rejected immediately with
+    ``ExecutionPoolFull`` instead of tying up another request thread.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int):
+        self.max_concurrency = max(max_concurrency, 1)
+        self.max_queue = max(max_queue, 0)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='execution')
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._reserved = 0
+        self._submitted = 0
+        self._rejected = 0
+        self._completed = 0
+        self._waits = deque(maxlen=200)
+        self._avg_run_seconds = 1.0
+
+    def _retry_after_locked(self) -> int:
+        queued = self._pending - self._running
+        return max(1, math.ceil(self._avg_run_seconds * (queued + 1) / self.max_concurrency))
+
+    def _admit_locked(self) -> None:
+        if self._pending >= self.max_concurrency + self.max_queue:
+            self._rejected += 1
+            raise ExecutionPoolFull(self._retry_after_locked())
+        self._pending += 1
+
+    @contextmanager
+    def reserve(self) -> Iterator[None]:
+        """
+        Hold a queue slot without running anything, e.g. while waiting for an
+        identical job that is already in flight. Raises ``ExecutionPoolFull``
+        like ``submit`` when there is no room.
+        """
+        with self._lock:
+            self._admit_locked()
+            self._reserved += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._reserved -= 1
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """Queue ``fn`` for execution or raise ``ExecutionPoolFull`` when there is no room."""
+        with self._lock:
+            self._admit_locked()
+            self._submitted += 1
+        enqueued_at = time.monotonic()
+
+        def task():
+            started_at = time.monotonic()
+            with self._lock:
+                self._running += 1
+                self._waits.append(started_at - enqueued_at)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.monotonic() - started_at
+                with self._lock:
+                    self._running -= 1
+                    self._pending -= 1
+                    self._completed += 1
+                    self._avg_run_seconds = 0.8 * self._avg_run_seconds + 0.2 * elapsed
+
+        return self._executor.submit(task)
+
+    def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Submit ``fn`` and block until it finishes."""
+        return self.submit(fn, *args, **kwargs).result()
+
+    def stats(self) -> dict:
+        with self._lock:
+            waits = sorted(self._waits)
+            return {
+                'max_concurrency': self.max_concurrency,
+                'max_queue': self.max_queue,
+                'running': self._running,
+                'queue_depth': self._pending - self._running,
+                'reserved': self._reserved,
+                'submitted': self._submitted,
+                'rejected': self._rejected,
+                'completed': self._completed,
+                'wait_ms_avg': round(sum(waits) / len(waits) * 1000, 2) if waits else 0.0,
+                'wait_ms_p95': round(waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 2) if waits else 0.0,
+                'avg_run_ms': round(self._avg_run_seconds * 1000, 2),
+            }
+
+
+execution_pool = ExecutionPool(
+    max_concurrency=int(os.getenv('EXECUTION_MAX_CONCURRENCY', '2')),
+    max_queue=int(os.getenv('EXECUTION_MAX_QUEUE', '4')),
+)
@@ -0,0 +1,350 @@
+import asyncio
+import codecs
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from contextlib import ExitStack
+from typing import Awaitable, Callable, Optional
+
+from services.bounded_process import OUTPUT_LIMIT_BYTES
+from services.cgroup_sandbox import GATE, cgroup_sandbox, gate_command
+from services.codeCompiler import BUILD_PROFILES, DEFAULT_PROFILE, prepare_program
+from services.execution_pool import ExecutionPoolFull, execution_pool
+from services.language_utils import is_supported_language, normalize_language
+
+try:
+    from websockets.asyncio.server import serve
+    from websockets.exceptions import ConnectionClosed
+    _websockets_import_error = None
+except ModuleNotFoundError as exc:
+    serve = None
+    ConnectionClosed = None
+    _websockets_import_error = exc
+
+logger = logging.getLogger(__name__)
+
+READ_CHUNK_BYTES = 4096
+MAX_MESSAGE_BYTES = 1024 * 1024
+# Stdin waiting for a program that is not reading it; input beyond this is rejected.
+STDIN_BUFFER_BYTES = int(os.getenv('INTERACTIVE_STDIN_BUFFER_BYTES', str(MAX_MESSAGE_BYTES)))
+# Compiled C/C++ programs fully buffer stdout on a pipe; stdbuf makes prompts appear as they are printed.
+STDBUF = shutil.which('stdbuf')
+
+Send = Callable[[dict], Awaitable[None]]
+
+
+class InteractiveSession:
+    """
+    One program run with stdin streamed in and stdout/stderr streamed out.
+
+    Events are passed to ``send`` as they happen: ``compiled`` or
+    ``compile_error`` after the build, then ``stdout``/``stderr`` chunks, and
+    finally ``exit`` with the run's status. The process is killed after
+    ``max_seconds`` in total, after ``idle_seconds`` without consuming input or
+    producing output, or once it prints more than ``OUTPUT_LIMIT_BYTES``. At
+    most ``STDIN_BUFFER_BYTES`` of stdin wait for the program at a time.
+    Waiting on a quiet program costs no thread; only the build runs on the
+    execution pool.
+    """
+
+    def __init__(self, send: Send, max_seconds: float, idle_seconds: float):
+        self.send = send
+        self.max_seconds = max_seconds
+        self.idle_seconds = idle_seconds
+        self._stack = ExitStack()
+        self._proc: Optional[asyncio.subprocess.Process] = None
+        self._cgroup = None
+        self._stdin: 'asyncio.Queue[Optional[bytes]]' = asyncio.Queue()
+        self._stdin_pending = 0
+        self._output_bytes = 0
+        self._last_activity = time.monotonic()
+        self._status: Optional[str] = None
+
+    @property
+    def running(self) -> bool:
+        return self._proc is not None and self._proc.returncode is None
+
+    async def run(self, code: str, language: str, profile: str = DEFAULT_PROFILE) -> None:
+        """Build and run ``code``, returning once the program has exited and ``exit`` was sent."""
+        loop = asyncio.get_running_loop()
+        try:
+            lang = normalize_language(language)
+            if not is_supported_language(lang):
+                await self.send({'type': 'error', 'message': f'Unsupported language: {lang}'})
+                return
+            if profile not in BUILD_PROFILES:
+                await self.send({'type': 'error', 'message': f'Unknown build profile: {profile}'})
+                return
+
+            try:
+                program = await loop.run_in_executor(
+                    None, execution_pool.run, self._stack.enter_context, prepare_program(code, lang, profile))
+            except ExecutionPoolFull as exc:
+                await self.send({'type': 'error', 'message': str(exc), 'retry_after': exc.retry_after})
+                return
+            if program.error is not None:
+                await self.send({'type': 'compile_error', 'message': program.error})
+                return
+            await self.send({'type': 'compiled', 'language': lang, 'cached': program.cached})
+            if self._status is not None:
+                await self.send({'type': 'exit', 'status': self._status, 'exit_code': None, 'usage': None})
+                return
+
+            command = program.command
+            if lang in ('c', 'cpp') and STDBUF:
+                command = [STDBUF, '-oL', '-eL'] + command
+            self._cgroup = self._stack.enter_context(cgroup_sandbox.group())
+            started_at = time.monotonic()
+            self._last_activity = started_at
+            if self._cgroup is not None:
+                command = gate_command(command)
+            self._proc = await asyncio.create_subprocess_exec(
+                *command,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            if self._cgroup is not None:
+                self._cgroup.attach(self._proc.pid)
+                self._proc.stdin.write(GATE)
+            pumps = [
+                asyncio.create_task(self._pump(self._proc.stdout, 'stdout')),
+                asyncio.create_task(self._pump(self._proc.stderr, 'stderr')),
+            ]
+            writer = asyncio.create_task(self._write_stdin())
+
+            await self._wait(started_at)
+            # Give the pipes a moment to drain; a leftover child holding them open must not stall the reply.
+            _, pending = await asyncio.wait(pumps, timeout=1)
+            for task in list(pending) + [writer]:
+                task.cancel()
+            await self.send(self._exit_event(started_at))
+        except Exception as exc:
+            logger.error("Interactive run failed: %s", exc)
+            await self.send({'type': 'error', 'message': str(exc)})
+        finally:
+            if self.running:
+                self._proc.kill()
+                await self._proc.wait()
+            await loop.run_in_executor(None, self._stack.close)
+
+    async def _wait(self, started_at: float) -> None:
+        while self._proc.returncode is None:
+            now = time.monotonic()
+            deadline = min(started_at + self.max_seconds, self._last_activity + self.idle_seconds)
+            if now >= deadline:
+                self._stop('Time Limit Exceeded')
+                break
+            try:
+                await asyncio.wait_for(self._proc.wait(), deadline - now)
+            except asyncio.TimeoutError:
+                continue
+        await self._proc.wait()
+
+    async def _pump(self, stream: asyncio.StreamReader, name: str) -> None:
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        while True:
+            chunk = await stream.read(READ_CHUNK_BYTES)
+            if not chunk:
+                break
+            self._last_activity = time.monotonic()
+            room = OUTPUT_LIMIT_BYTES - self._output_bytes
+            if len(chunk) > room:
+                chunk = chunk[:max(room, 0)]
+                self._stop('Output Limit Exceeded')
+            self._output_bytes += len(chunk)
+            text = decoder.decode(chunk)
+            if text:
+                await self.send({'type': name, 'data': text})
+            if self._status == 'Output Limit Exceeded':
+                break
+        tail = decoder.decode(b'', final=True)
+        if tail:
+            await self.send({'type': name, 'data': tail})
+
+    async def _write_stdin(self) -> None:
+        while True:
+            data = await self._stdin.get()
+            try:
+                if data is None:
+                    self._proc.stdin.close()
+                    return
+                self._proc.stdin.write(data)
+                await self._proc.stdin.drain()
+            except (BrokenPipeError, ConnectionResetError):
+                return
+            # Only input the program has taken counts as activity.
+            self._stdin_pending -= len(data)
+            self._last_activity = time.monotonic()
+
+    def _stop(self, status: str) -> None:
+        if self._status is None:
+            self._status = status
+        if self.running:
+            self._proc.kill()
+
+    def _exit_event(self, started_at: float) -> dict:
+        report = self._cgroup.report() if self._cgroup is not None else None
+        if self._status is not None:
+            status = self._status
+        elif report and report['oom_killed']:
+            status = 'Memory Limit Exceeded'
+        else:
+            status = 'OK' if self._proc.returncode == 0 else 'Runtime Error'
+        usage = {'wall_ms': round((time.monotonic() - started_at) * 1000, 2)}
+        if report is not None:
+            usage['cgroup'] = report
+        return {'type': 'exit', 'status': status, 'exit_code': self._proc.returncode, 'usage': usage}
+
+    def write(self, data: str) -> bool:
+        """
+        Queue ``data`` for the program's stdin. Returns ``False`` and drops it
+        when that would leave more than ``STDIN_BUFFER_BYTES`` waiting.
+        """
+        encoded = data.encode()
+        if self._stdin_pending + len(encoded) > STDIN_BUFFER_BYTES:
+            return False
+        self._stdin_pending += len(encoded)
+        self._stdin.put_nowait(encoded)
+        return True
+
+    def close_stdin(self) -> None:
+        self._stdin.put_nowait(None)
+
+    def kill(self) -> None:
+        self._stop('Killed')
+
+
+class InteractiveServer:
+    """
+    WebSocket endpoint for interactive runs, served from its own event loop thread.
+
+    Each connection carries one run. The client sends
+    ``{"type": "start", "language", "code", "profile"?}``, then any number of
+    ``{"type": "stdin", "data"}`` messages, ``{"type": "eof"}`` to close stdin
+    and ``{"type": "kill"}`` to stop the program; the server replies with the
+    ``InteractiveSession`` events and closes the socket after ``exit``. The
+    port is bound with ``SO_REUSEPORT`` so every gunicorn worker can serve it.
+    With ``enabled=None`` the ``INTERACTIVE_ENABLED`` flag is read when
+    ``start()`` is called, so it can be turned off after import.
+    """
+
+    def __init__(self, enabled: Optional[bool], host: str, port: int, max_sessions: int,
+                 max_seconds: float, idle_seconds: float):
+        self.enabled = enabled
+        self.host = host
+        self.port = port
+        self.max_sessions = max_sessions
+        self.max_seconds = max_seconds
+        self.idle_seconds = idle_seconds
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._active = 0
+        self._sessions = 0
+        self._rejected = 0
+        self.unavailable_reason: Optional[str] = 'disabled' if enabled is False else None
+
+    def start(self) -> None:
+        """Serve in a background thread (idempotent)."""
+        with self._lock:
+            if self.enabled is None:
+                self.enabled = os.getenv('INTERACTIVE_ENABLED', 'true').lower() == 'true'
+                if not self.enabled:
+                    self.unavailable_reason = 'disabled'
+            if self._thread is not None or not self.enabled:
+                return
+            if serve is None:
+                self.unavailable_reason = f'websockets is not installed: {_websockets_import_error}'
+                logger.warning("Interactive runs unavailable: %s", self.unavailable_reason)
+                return
+            self._thread = threading.Thread(target=asyncio.run, args=(self._serve(),),
+                                            name='interactive-server', daemon=True)
+            self._thread.start()
+
+    async def _serve(self) -> None:
+        try:
+            async with serve(self._handle, self.host, self.port, reuse_port=True, max_size=MAX_MESSAGE_BYTES):
+                logger.info("Interactive runs listening on ws://%s:%s", self.host, self.port)
+                await asyncio.Future()
+        except OSError as exc:
+            self.unavailable_reason = str(exc)
+            logger.error("Interactive server could not start: %s", exc)
+
+    async def _handle(self, websocket) -> None:
+        with self._lock:
+            if self._active >= self.max_sessions:
+                self._rejected += 1
+                full = True
+            else:
+                self._active += 1
+                self._sessions += 1
+                full = False
+        if full:
+            await websocket.send(json.dumps({'type': 'error', 'message': 'Too many interactive sessions, please retry shortly.'}))
+            await websocket.close()
+            return
+
+        async def send(event: dict) -> None:
+            try:
+                await websocket.send(json.dumps(event))
+            except ConnectionClosed:
+                session.kill()
+
+        session = InteractiveSession(send, self.max_seconds, self.idle_seconds)
+        run_task = None
+        try:
+            async for message in websocket:
+                try:
+                    event = json.loads(message)
+                    kind = event['type']
+                except (ValueError, KeyError, TypeError):
+                    await send({'type': 'error', 'message': 'Messages must be JSON objects with a "type"'})
+                    continue
+
+                if kind == 'start' and run_task is None:
+                    run_task = asyncio.create_task(session.run(
+                        str(event.get('code') or ''), event.get('language'),
+                        str(event.get('profile') or DEFAULT_PROFILE)))
+                    run_task.add_done_callback(lambda _: asyncio.create_task(websocket.close()))
+                elif kind == 'stdin' and run_task is not None:
+                    if not session.write(str(event.get('data', ''))):
+                        await send({'type': 'error', 'message': 'The program is not reading stdin; input dropped'})
+                elif kind == 'eof' and run_task is not None:
+                    session.close_stdin()
+                elif kind == 'kill' and run_task is not None:
+                    session.kill()
+                else:
+                    await send({'type': 'error', 'message': f'Unexpected message: {kind}'})
+        except ConnectionClosed:
+            pass
+        finally:
+            if run_task is not None:
+                session.kill()
+                await run_task
+            with self._lock:
+                self._active -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'available': self._thread is not None and self.unavailable_reason is None,
+                'reason': self.unavailable_reason,
+                'port': self.port,
+                'active': self._active,
+                'max_sessions': self.max_sessions,
+                'sessions': self._sessions,
+                'rejected': self._rejected,
+            }
+
+
+interactive_server = InteractiveServer(
+    enabled=None,
+    host=os.getenv('INTERACTIVE_HOST', '0.0.0.0'),
+    port=int(os.getenv('INTERACTIVE_PORT', '8765')),
+    max_sessions=int(os.getenv('INTERACTIVE_MAX_SESSIONS', '8')),
+    max_seconds=float(os.getenv('INTERACTIVE_MAX_SECONDS', '120')),
+    idle_seconds=float(os.getenv('INTERACTIVE_IDLE_SECONDS', '30')),
+)
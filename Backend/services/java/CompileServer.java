@@ -0,0 +1,108 @@
+import java.io.ByteArrayOutputStream;
+import java.io.DataInputStream;
+import java.io.File;
+import java.io.IOException;
+import java.io.OutputStream;
+import java.io.PrintStream;
+import java.io.StringWriter;
+import java.net.URI;
+import java.nio.charset.StandardCharsets;
+import java.util.ArrayList;
+import java.util.Arrays;
+import java.util.Collections;
+import java.util.List;
+import javax.tools.JavaCompiler;
+import javax.tools.JavaFileObject;
+import javax.tools.SimpleJavaFileObject;
+import javax.tools.StandardJavaFileManager;
+import javax.tools.StandardLocation;
+import javax.tools.ToolProvider;
+
+/**
+ * Long-lived javac used by services/java_server.py.
+ *
+ * Protocol (one request at a time over stdin/stdout):
+ *   request:  "<outDir>\t<className>\t<options>\t<sourceBytes>\n" followed by the UTF-8 source
+ *   response: "<status> <diagnosticBytes>\n" followed by the UTF-8 diagnostics
+ * Status 0 means the classes were written to outDir. The file manager is reused
+ * between requests so the platform classes are only indexed once.
+ */
+public final class CompileServer {
+
+    private static final class StringSource extends SimpleJavaFileObject {
+        private final String fileName;
+        private final String code;
+
+        StringSource(String className, String code) {
+            super(URI.create("string:///" + className + Kind.SOURCE.extension), Kind.SOURCE);
+            this.fileName = className + Kind.SOURCE.extension;
+            this.code = code;
+        }
+
+        @Override
+        public String getName() {
+            return fileName;
+        }
+
+        @Override
+        public CharSequence getCharContent(boolean ignoreEncodingErrors) {
+            return code;
+        }
+    }
+
+    private static String readLine(DataInputStream in) throws IOException {
+        ByteArrayOutputStream line = new ByteArrayOutputStream();
+        int b;
+        while ((b = in.read()) != -1 && b != '\n') {
+            line.write(b);
+        }
+        if (b == -1 && line.size() == 0) {
+            return null;
+        }
+        return line.toString(StandardCharsets.UTF_8.name());
+    }
+
+    private static void respond(OutputStream out, int status, String diagnostics) throws IOException {
+        byte[] body = diagnostics.getBytes(StandardCharsets.UTF_8);
+        out.write((status + " " + body.length + "\n").getBytes(StandardCharsets.UTF_8));
+        out.write(body);
+        out.flush();
+    }
+
+    public static void main(String[] args) throws IOException {
+        JavaCompiler compiler = ToolProvider.getSystemJavaCompiler();
+        if (compiler == null) {
+            System.err.println("No system Java compiler available (is this a JRE?)");
+            System.exit(2);
+        }
+        StandardJavaFileManager fileManager = compiler.getStandardFileManager(null, null, StandardCharsets.UTF_8);
+        DataInputStream in = new DataInputStream(System.in);
+        PrintStream out = new PrintStream(System.out, false, StandardCharsets.UTF_8.name());
+        // Keep stray prints from annotation processors off the protocol stream.
+        System.setOut(System.err);
+
+        String header;
+        while ((header = readLine(in)) != null) {
+            String[] parts = header.split("\t", -1);
+            byte[] source = new byte[Integer.parseInt(parts[3])];
+            in.readFully(source);
+
+            StringWriter diagnostics = new StringWriter();
+            boolean ok;
+            try {
+                fileManager.setLocation(StandardLocation.CLASS_OUTPUT, Collections.singletonList(new File(parts[0])));
+                List<String> options = new ArrayList<>();
+                if (!parts[2].isEmpty()) {
+                    options.addAll(Arrays.asList(parts[2].split(" ")));
+                }
+                List<JavaFileObject> units = Collections.singletonList(
+                        new StringSource(parts[1], new String(source, StandardCharsets.UTF_8)));
+                ok = compiler.getTask(diagnostics, fileManager, null, options, null, units).call();
+            } catch (RuntimeException | IOException e) {
+                diagnostics.write(e.toString());
+                ok = false;
+            }
+            respond(out, ok ? 0 : 1, diagnostics.toString());
+        }
+    }
+}
@@ -0,0 +1,70 @@
+import java.io.ByteArrayOutputStream;
+import java.io.File;
+import java.io.IOException;
+import java.io.InputStream;
+import java.lang.reflect.InvocationTargetException;
+import java.lang.reflect.Method;
+import java.net.URL;
+import java.net.URLClassLoader;
+import java.nio.charset.StandardCharsets;
+import java.util.ArrayList;
+import java.util.List;
+
+/**
+ * Pre-started, single-use JVM used by services/java_server.py.
+ *
+ * Blocks until "<classDir>\t<className>\n" arrives on stdin, then runs that
+ * class's main method. Everything after the header stays on System.in for the
+ * program. Uncaught exceptions are reported like the default launcher does.
+ */
+public final class JavaRunner {
+
+    private static String readHeader(InputStream in) throws IOException {
+        ByteArrayOutputStream line = new ByteArrayOutputStream();
+        int b;
+        while ((b = in.read()) != -1 && b != '\n') {
+            line.write(b);
+        }
+        return line.toString(StandardCharsets.UTF_8.name());
+    }
+
+    private static void trimLauncherFrames(Throwable error) {
+        List<StackTraceElement> frames = new ArrayList<>();
+        for (StackTraceElement frame : error.getStackTrace()) {
+            String owner = frame.getClassName();
+            if (owner.startsWith("jdk.internal.reflect.") || owner.startsWith("java.lang.reflect.")
+                    || owner.startsWith("sun.reflect.") || owner.equals(JavaRunner.class.getName())) {
+                break;
+            }
+            frames.add(frame);
+        }
+        error.setStackTrace(frames.toArray(new StackTraceElement[0]));
+    }
+
+    public static void main(String[] args) throws Exception {
+        String[] header = readHeader(System.in).split("\t", -1);
+        URLClassLoader loader = new URLClassLoader(
+                new URL[] {new File(header[0]).toURI().toURL()}, JavaRunner.class.getClassLoader());
+        Thread.currentThread().setContextClassLoader(loader);
+
+        Method main;
+        try {
+            main = Class.forName(header[1], true, loader).getMethod("main", String[].class);
+        } catch (ClassNotFoundException | NoSuchMethodException e) {
+            System.err.println("Error: Main method not found in class " + header[1]);
+            System.exit(1);
+            return;
+        }
+
+        try {
+            main.invoke(null, (Object) new String[0]);
+        } catch (InvocationTargetException e) {
+            Throwable cause = e.getCause();
+            trimLauncherFrames(cause);
+            System.err.print("Exception in thread \"main\" ");
+            cause.printStackTrace();
+            System.exit(1);
+        }
+        System.out.flush();
+    }
+}
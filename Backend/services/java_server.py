@@ -0,0 +1,217 @@
+import atexit
+import hashlib
+import logging
+import os
+import select
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from typing import Optional
+
+from services.bounded_process import BoundedCompletedProcess
+from services.cgroup_sandbox import cgroup_sandbox
+from services.warm_pool import WarmProcessPool
+
+logger = logging.getLogger(__name__)
+
+SUPPORT_SOURCES = [
+    os.path.join(os.path.dirname(__file__), 'java', 'CompileServer.java'),
+    os.path.join(os.path.dirname(__file__), 'java', 'JavaRunner.java'),
+]
+
+# Pooled JVMs start before they are moved into a run cgroup, so size the heap
+# for the sandbox's memory limit explicitly rather than for the container.
+_COMMON_JVM_FLAGS = ['-XX:+UseSerialGC', '-Xshare:auto', f'-Xmx{max(cgroup_sandbox.memory_limit_mb // 2, 16)}m']
+
+# JVM flags per build profile (see ``codeCompiler.BUILD_PROFILES``). Short
+# "run" programs start faster on C1 alone; "judge" keeps full tiered
+# compilation so hot loops reach C2, as they would on a normal JVM.
+JVM_FLAGS = {
+    'run': _COMMON_JVM_FLAGS + ['-XX:TieredStopAtLevel=1'],
+    'judge': _COMMON_JVM_FLAGS,
+}
+
+
+class JavaServerUnavailable(RuntimeError):
+    """Raised when the persistent Java tooling cannot be used and callers should fall back to javac."""
+
+
+_support_lock = threading.Lock()
+_support_dir: Optional[str] = None
+_support_error: Optional[JavaServerUnavailable] = None
+
+
+def support_classpath() -> str:
+    """Compile the bundled helper classes once and return their class directory."""
+    global _support_dir, _support_error
+
+    if _support_dir is not None:
+        return _support_dir
+
+    with _support_lock:
+        if _support_dir is not None:
+            return _support_dir
+        if _support_error is not None:
+            raise _support_error
+
+        digest = hashlib.sha256()
+        for path in SUPPORT_SOURCES:
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        root = os.getenv('JAVA_SUPPORT_DIR', os.path.join(tempfile.gettempdir(), 'gencode-java-support'))
+        target = os.path.join(root, digest.hexdigest()[:16])
+
+        if not os.path.exists(os.path.join(target, 'CompileServer.class')):
+            os.makedirs(root, exist_ok=True)
+            staging = tempfile.mkdtemp(dir=root)
+            try:
+                proc = subprocess.run(['javac', '-d', staging] + SUPPORT_SOURCES,
+                                      capture_output=True, text=True, timeout=120)
+                if proc.returncode != 0:
+                    raise JavaServerUnavailable(f"Could not build Java support classes: {proc.stderr}")
+                try:
+                    os.rename(staging, target)
+                except OSError:
+                    # Another worker built the same classes concurrently.
+                    pass
+            except JavaServerUnavailable as exc:
+                _support_error = exc
+                raise
+            except (OSError, subprocess.TimeoutExpired) as exc:
+                _support_error = JavaServerUnavailable(f"Could not build Java support classes: {exc}")
+                raise _support_error from exc
+            finally:
+                shutil.rmtree(staging, ignore_errors=True)
+
+        _support_dir = target
+        return _support_dir
+
+
+class JavaCompileServer:
+    """
+    Persistent javac running the JDK compiler API in a single long-lived JVM.
+
+    Requests are serialized over the server's stdin/stdout. If the server dies
+    or a compile exceeds its deadline it is killed and restarted on next use.
+    """
+
+    MAX_CONSECUTIVE_FAILURES = 3
+
+    def __init__(self):
+        self._proc: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+        self._compiles = 0
+        self._restarts = 0
+        self._failures = 0
+
+    def _ensure_started(self) -> subprocess.Popen:
+        if self._proc is not None and self._proc.poll() is None:
+            return self._proc
+        if self._failures >= self.MAX_CONSECUTIVE_FAILURES:
+            raise JavaServerUnavailable("Java compile server disabled after repeated failures")
+        if self._proc is not None:
+            self._restarts += 1
+        try:
+            self._proc = subprocess.Popen(
+                ['java', '-cp', support_classpath(), 'CompileServer'],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError as exc:
+            raise JavaServerUnavailable(f"Could not start Java compile server: {exc}") from exc
+        logger.info("Started Java compile server (pid %s)", self._proc.pid)
+        return self._proc
+
+    def _stop(self) -> None:
+        if self._proc is not None:
+            self._proc.kill()
+            self._proc.wait()
+
+    @staticmethod
+    def _read_reply(proc: subprocess.Popen, deadline: float) -> tuple[int, str]:
+        """Read one ``"<status> <size>\\n<diagnostics>"`` reply without blocking past ``deadline``."""
+        fd = proc.stdout.fileno()
+        buffer = bytearray()
+        status, body_size = 0, None
+        while True:
+            if body_size is None and b'\n' in buffer:
+                line, _, rest = bytes(buffer).partition(b'\n')
+                status, body_size = (int(field) for field in line.split())
+                buffer = bytearray(rest)
+            if body_size is not None and len(buffer) >= body_size:
+                return status, buffer[:body_size].decode(errors='replace')
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise subprocess.TimeoutExpired(proc.args, 0)
+            ready, _, _ = select.select([fd], [], [], remaining)
+            if not ready:
+                continue
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                raise JavaServerUnavailable("Java compile server exited unexpectedly")
+            buffer.extend(chunk)
+
+    def compile(self, code: str, class_name: str, out_dir: str, options: list[str], timeout: float) -> Optional[str]:
+        """Compile ``code`` into ``out_dir``; return javac diagnostics on failure, else ``None``."""
+        source = code.encode()
+        header = f"{out_dir}\t{class_name}\t{' '.join(options)}\t{len(source)}\n".encode()
+        with self._lock:
+            try:
+                proc = self._ensure_started()
+                proc.stdin.write(header + source)
+                proc.stdin.flush()
+                status, diagnostics = self._read_reply(proc, time.monotonic() + timeout)
+            except (BrokenPipeError, JavaServerUnavailable) as exc:
+                self._stop()
+                self._failures += 1
+                raise JavaServerUnavailable(str(exc) or "Java compile server exited unexpectedly") from exc
+            except subprocess.TimeoutExpired:
+                self._stop()
+                raise
+            self._compiles += 1
+            self._failures = 0
+        return None if status == 0 else diagnostics
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._stop()
+
+    def stats(self) -> dict:
+        return {
+            'running': self._proc is not None and self._proc.poll() is None,
+            'compiles': self._compiles,
+            'restarts': self._restarts,
+        }
+
+
+class JavaRunnerPool(WarmProcessPool):
+    """
+    Pre-started JVMs that each run one compiled class, skipping JVM startup on the request path.
+
+    JVM flags are fixed when a JVM starts, so each build profile has its own pool.
+    """
+
+    def __init__(self, size: int, profile: str):
+        super().__init__(f'java-{profile}', ['java'] + JVM_FLAGS[profile], size)
+        self.profile = profile
+
+    def _spawn(self) -> subprocess.Popen:
+        self.argv = ['java'] + JVM_FLAGS[self.profile] + ['-cp', support_classpath(), 'JavaRunner']
+        return super()._spawn()
+
+    def run(self, class_dir: str, class_name: str, stdin: bytes = b'', timeout: float = 5) -> BoundedCompletedProcess:
+        return self.execute(f"{class_dir}\t{class_name}\n".encode() + stdin, timeout)
+
+
+java_compile_server = JavaCompileServer()
+java_runner_pools = {
+    'run': JavaRunnerPool(size=int(os.getenv('JAVA_POOL_SIZE', '1')), profile='run'),
+    'judge': JavaRunnerPool(size=int(os.getenv('JAVA_JUDGE_POOL_SIZE', '1')), profile='judge'),
+}
+atexit.register(java_compile_server.shutdown)
+for _pool in java_runner_pools.values():
+    atexit.register(_pool.shutdown)
@@ -0,0 +1,117 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable
+
+from services.execution_pool import ExecutionPool, execution_pool
+
+
+class Job:
+    """A queued compile/run job and, once finished, its result or error."""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.status = 'pending'
+        self.result: Any = None
+        self.error: str | None = None
+        self.created_at = time.time()
+        self.finished_at: float | None = None
+        self.done = threading.Event()
+
+    def to_dict(self) -> dict:
+        finished_at = self.finished_at or time.time()
+        payload = {
+            'job_id': self.job_id,
+            'status': self.status,
+            'elapsed_ms': round((finished_at - self.created_at) * 1000, 2),
+        }
+        if self.status == 'completed':
+            payload['result'] = self.result
+        elif self.status == 'failed':
+            payload['error'] = self.error
+        return payload
+
+
+class JobStore:
+    """
+    Run jobs on the execution pool and keep their results for later polling.
+
+    Finished jobs are dropped ``ttl`` seconds after they complete, and the
+    oldest finished jobs are evicted once more than ``max_jobs`` are held.
+    Unfinished jobs are never evicted; their number is already bounded by the
+    execution pool's admission control, which raises ``ExecutionPoolFull``.
+    """
+
+    def __init__(self, pool: ExecutionPool, max_jobs: int, ttl: float):
+        self.pool = pool
+        self.max_jobs = max(max_jobs, 1)
+        self.ttl = ttl
+        self._jobs: 'OrderedDict[str, Job]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._evicted = 0
+
+    def _evict_locked(self) -> None:
+        now = time.time()
+        finished = [job for job in self._jobs.values() if job.finished_at is not None]
+        expired = {job.job_id for job in finished if now - job.finished_at > self.ttl}
+        overflow = len(self._jobs) - len(expired) - self.max_jobs
+        for job in finished:
+            if overflow <= 0:
+                break
+            if job.job_id not in expired:
+                expired.add(job.job_id)
+                overflow -= 1
+        for job_id in expired:
+            del self._jobs[job_id]
+        self._evicted += len(expired)
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Job:
+        """Queue ``fn`` on the execution pool and return its job immediately."""
+        job = Job(uuid.uuid4().hex)
+
+        def task():
+            job.status = 'running'
+            try:
+                job.result = fn(*args, **kwargs)
+                job.status = 'completed'
+            except Exception as exc:
+                job.error = str(exc)
+                job.status = 'failed'
+            finally:
+                job.finished_at = time.time()
+                job.done.set()
+
+        with self._lock:
+            self._evict_locked()
+            self.pool.submit(task)
+            self._jobs[job.job_id] = job
+        return job
+
+    def get(self, job_id: str, wait: float = 0) -> Job | None:
+        """Look up a job, waiting up to ``wait`` seconds for it to finish."""
+        with self._lock:
+            self._evict_locked()
+            job = self._jobs.get(job_id)
+        if job is not None and wait > 0:
+            job.done.wait(wait)
+        return job
+
+    def stats(self) -> dict:
+        with self._lock:
+            unfinished = sum(1 for job in self._jobs.values() if job.finished_at is None)
+            return {
+                'jobs': len(self._jobs),
+                'unfinished': unfinished,
+                'max_jobs': self.max_jobs,
+                'ttl_seconds': self.ttl,
+                'evicted': self._evicted,
+            }
+
+
+job_store = JobStore(
+    execution_pool,
+    max_jobs=int(os.getenv('COMPILE_JOB_MAX_JOBS', '500')),
+    ttl=float(os.getenv('COMPILE_JOB_TTL_SECONDS', '300')),
+)
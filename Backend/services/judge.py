@@ -0,0 +1,99 @@
+from services.codeCompiler import JUDGE_PROFILE, run_batch
+from services.language_utils import normalize_language
+from services.output_checker import DEFAULT_EPSILON, check_output
+
+REFERENCE_LANGUAGE = 'cpp'
+
+
+def outputs_match(expected: str, actual: str) -> bool:
+    """Compare program output token by token, ignoring whitespace layout."""
+    return check_output(expected, actual, 'token')['passed']
+
+
+def _collect_cases(testcases: list[dict] | None, hidden_testcases: list[dict] | None) -> list[dict]:
+    cases = []
+    for category, items in (('Sample', testcases or []), ('Hidden', hidden_testcases or [])):
+        for item in items:
+            if not isinstance(item, dict) or 'input' not in item:
+                continue
+            cases.append({
+                'id': f"TC{len(cases) + 1:02d}",
+                'category': category,
+                'input': str(item.get('input', '')),
+                'expected_output': str(item.get('expected_output', '')),
+            })
+    return cases
+
+
+def judge_code(
+    typed_solution: str,
+    typed_language: str,
+    reference_solution: str | None,
+    testcases: list[dict] | None,
+    hidden_testcases: list[dict] | None,
+    reference_language: str = REFERENCE_LANGUAGE,
+    checker: str = 'token',
+    epsilon: float = DEFAULT_EPSILON,
+) -> dict:
+    """
+    Run the submission and the reference solution on every test case and compare outputs.
+
+    The reference solution's output is the oracle whenever it runs cleanly; the
+    stored ``expected_output`` is used only for cases where it does not. Both
+    are built with the optimized ``judge`` profile. Outputs are compared with
+    the ``checker`` mode of ``services.output_checker``.
+    """
+    cases = _collect_cases(testcases, hidden_testcases)
+    inputs = [case['input'] for case in cases]
+
+    submission = run_batch(typed_solution, normalize_language(typed_language), inputs, profile=JUDGE_PROFILE)
+    if submission['result'] != 'Success':
+        return {
+            'result': 'Compilation Error',
+            'message': submission.get('message', ''),
+            'total': len(cases),
+            'passed': 0,
+            'failed': len(cases),
+            'pass_rate': 0,
+            'details': [],
+        }
+
+    reference_runs = [None] * len(cases)
+    if reference_solution and reference_solution.strip():
+        reference = run_batch(reference_solution, reference_language, inputs, profile=JUDGE_PROFILE)
+        if reference['result'] == 'Success':
+            reference_runs = reference['results']
+
+    details = []
+    for case, run, reference_run in zip(cases, submission['results'], reference_runs):
+        if reference_run is not None and reference_run['status'] == 'OK':
+            expected, expected_source = reference_run['stdout'], 'reference'
+        else:
+            expected, expected_source = case['expected_output'], 'testcase'
+
+        if run['status'] == 'OK':
+            check = check_output(expected, run['stdout'], checker, epsilon)
+        else:
+            check = {'passed': False, 'message': run['status']}
+        details.append({
+            **case,
+            'expected_output': expected,
+            'expected_source': expected_source,
+            'actual_output': run['stdout'],
+            'stderr': run['stderr'],
+            'run_status': run['status'],
+            'time_ms': run['time_ms'],
+            'max_rss_kb': (run.get('usage') or {}).get('max_rss_kb'),
+            'checker_message': check['message'],
+            'status': check['passed'],
+        })
+
+    passed_count = sum(1 for detail in details if detail['status'])
+    return {
+        'result': 'Success',
+        'total': len(details),
+        'passed': passed_count,
+        'failed': len(details) - passed_count,
+        'pass_rate': round(passed_count / len(details) * 100, 2) if details else 0,
+        'details': details,
+    }
@@ -0,0 +1,25 @@
+// Preloaded (`node -r`) into the pre-started, single-use Node.js processes
+// that run /compiler JavaScript submissions.
+//
+// The process is started with a placeholder main script that does not exist
+// yet. This blocks until the path of the submission's real main.js arrives on
+// stdin as one line, then links the placeholder to it. Node resolves the main
+// module through the link, so the program runs exactly as `node main.js`
+// would: same __filename, stack traces and error output. Anything after the
+// path line is left on stdin for the program itself.
+'use strict';
+
+const fs = require('fs');
+
+function readLine() {
+  const bytes = [];
+  const byte = Buffer.alloc(1);
+  // One byte at a time so nothing past the newline is consumed.
+  while (fs.readSync(0, byte, 0, 1, null) === 1 && byte[0] !== 10) bytes.push(byte[0]);
+  return Buffer.from(bytes).toString('utf8');
+}
+
+const script = readLine();
+if (!script) process.exit(1);
+fs.symlinkSync(script, process.argv[1]);
+process.argv[1] = script;
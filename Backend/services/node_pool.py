@@ -0,0 +1,52 @@
+import atexit
+import os
+import shutil
+import subprocess
+import tempfile
+
+from services.bounded_process import BoundedCompletedProcess
+from services.warm_pool import WarmProcessPool
+
+PRELOAD_SCRIPT = os.path.join(os.path.dirname(__file__), 'node', 'preload.js')
+PLACEHOLDER_ROOT = os.path.join(tempfile.gettempdir(), 'gencode-node')
+
+
+class NodeWorkerPool(WarmProcessPool):
+    """
+    Keep pre-started, single-use Node.js processes ready for /compiler runs.
+
+    Each process preloads ``node/preload.js`` and waits for the path of a
+    submission's ``main.js`` on stdin, then runs it as its main module. The
+    program therefore behaves exactly like ``node main.js`` (stdin, timers,
+    modules and error output included), and no two runs ever share a process.
+    """
+
+    def __init__(self, size: int, node: str = 'node'):
+        super().__init__('node', [node], size)
+        self.node = node
+
+    def _spawn(self) -> subprocess.Popen:
+        os.makedirs(PLACEHOLDER_ROOT, exist_ok=True)
+        workdir = tempfile.mkdtemp(dir=PLACEHOLDER_ROOT)
+        self.argv = [self.node, '-r', PRELOAD_SCRIPT, os.path.join(workdir, 'main.js')]
+        try:
+            worker = super()._spawn()
+        except OSError:
+            shutil.rmtree(workdir, ignore_errors=True)
+            raise
+        worker.workdir = workdir
+        return worker
+
+    def _discard(self, worker: subprocess.Popen) -> None:
+        shutil.rmtree(worker.workdir, ignore_errors=True)
+
+    def run(self, script: str, stdin: bytes = b'', timeout: float = 5) -> BoundedCompletedProcess:
+        """Run the ``main.js`` at ``script`` in a pooled process, raising ``TimeoutExpired`` like ``subprocess.run``."""
+        return self.execute(os.path.abspath(script).encode() + b'\n' + stdin, timeout)
+
+
+node_pool = NodeWorkerPool(
+    size=int(os.getenv('NODE_POOL_SIZE', '2')),
+    node=os.getenv('NODE_EXECUTABLE', 'node'),
+)
+atexit.register(node_pool.shutdown)
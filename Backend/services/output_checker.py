@@ -0,0 +1,176 @@
+import codecs
+import hashlib
+import math
+from itertools import zip_longest
+from typing import IO, Iterable, Iterator, Union
+
+CHUNK_CHARS = 64 * 1024
+DEFAULT_EPSILON = 1e-6
+# Multiset hash for unordered lines: the sum of 128-bit line digests.
+_HASH_MODULUS = 1 << 128
+_MAX_SHOWN = 40
+
+Source = Union[str, bytes, IO, Iterable[Union[str, bytes]]]
+
+
+def _chunks(source: Source) -> Iterator[str]:
+    """Yield ``source`` as text chunks: a string, bytes, a (binary or text) file or an iterable of either."""
+    if isinstance(source, str):
+        for start in range(0, len(source), CHUNK_CHARS):
+            yield source[start:start + CHUNK_CHARS]
+        return
+    if isinstance(source, bytes):
+        source = [source]
+    elif hasattr(source, 'read'):
+        stream = source
+        source = iter(lambda: stream.read(CHUNK_CHARS), stream.read(0))
+
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    for chunk in source:
+        text = decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+        if text:
+            yield text
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+
+def _tokens(source: Source) -> Iterator[str]:
+    carry = ''
+    for chunk in _chunks(source):
+        parts = (carry + chunk).split()
+        # A token touching the end of the chunk may continue in the next one.
+        if parts and not chunk[-1].isspace():
+            carry = parts.pop()
+        else:
+            carry = ''
+        yield from parts
+    if carry:
+        yield carry
+
+
+def _lines(source: Source) -> Iterator[str]:
+    """Lines without their terminator; a trailing newline does not start an extra line."""
+    carry = ''
+    for chunk in _chunks(source):
+        parts = (carry + chunk).split('\n')
+        carry = parts.pop()
+        for line in parts:
+            yield line.rstrip('\r')
+    if carry:
+        yield carry.rstrip('\r')
+
+
+def _trimmed_lines(source: Source) -> Iterator[str]:
+    """Lines with trailing whitespace removed and trailing blank lines dropped."""
+    blank_run = 0
+    for line in _lines(source):
+        line = line.rstrip()
+        if not line:
+            blank_run += 1
+            continue
+        for _ in range(blank_run):
+            yield ''
+        blank_run = 0
+        yield line
+
+
+def _show(text: str | None) -> str:
+    if text is None:
+        return 'end of output'
+    return repr(text if len(text) <= _MAX_SHOWN else text[:_MAX_SHOWN] + '...')
+
+
+def _mismatch(unit: str, index: int, expected: str | None, actual: str | None) -> dict:
+    return {'passed': False, 'message': f"{unit} {index}: expected {_show(expected)}, got {_show(actual)}"}
+
+
+def _floats_equal(expected: str, actual: str, epsilon: float) -> bool:
+    if expected == actual:
+        return True
+    try:
+        want, got = float(expected), float(actual)
+    except ValueError:
+        return False
+    if math.isnan(want) or math.isnan(got):
+        return math.isnan(want) and math.isnan(got)
+    return math.isclose(want, got, rel_tol=epsilon, abs_tol=epsilon)
+
+
+def _check_exact(expected: Source, actual: Source) -> dict:
+    want_chunks, got_chunks = _chunks(expected), _chunks(actual)
+    want = got = ''
+    line = 1
+    while True:
+        want = want or next(want_chunks, '')
+        got = got or next(got_chunks, '')
+        if not want or not got:
+            if want or got:
+                return _mismatch('Line', line, want.split('\n', 1)[0] if want else None,
+                                 got.split('\n', 1)[0] if got else None)
+            return {'passed': True, 'message': 'ok'}
+        size = min(len(want), len(got))
+        if want[:size] != got[:size]:
+            offset = next(i for i in range(size) if want[i] != got[i])
+            line += want.count('\n', 0, offset)
+            return _mismatch('Line', line, want[offset:].split('\n', 1)[0], got[offset:].split('\n', 1)[0])
+        line += want.count('\n', 0, size)
+        want, got = want[size:], got[size:]
+
+
+def _check_sequence(units: Iterator[str], other: Iterator[str], unit: str, equal) -> dict:
+    for index, (want, got) in enumerate(zip_longest(units, other), start=1):
+        if want is None or got is None or not equal(want, got):
+            return _mismatch(unit, index, want, got)
+    return {'passed': True, 'message': 'ok'}
+
+
+def _multiset_digest(lines: Iterator[str]) -> tuple[int, int]:
+    total = count = 0
+    for line in lines:
+        if not line:
+            continue
+        digest = hashlib.blake2b(line.encode(), digest_size=16).digest()
+        total = (total + int.from_bytes(digest, 'big')) % _HASH_MODULUS
+        count += 1
+    return count, total
+
+
+def _check_unordered(expected: Source, actual: Source) -> dict:
+    want_count, want_digest = _multiset_digest(_trimmed_lines(expected))
+    got_count, got_digest = _multiset_digest(_trimmed_lines(actual))
+    if want_count != got_count:
+        return {'passed': False, 'message': f"Expected {want_count} non-empty lines, got {got_count}"}
+    if want_digest != got_digest:
+        return {'passed': False, 'message': 'Lines differ (order ignored)'}
+    return {'passed': True, 'message': 'ok'}
+
+
+CHECKER_MODES = ('exact', 'token', 'whitespace', 'float', 'unordered')
+
+
+def check_output(expected: Source, actual: Source, mode: str = 'token', epsilon: float = DEFAULT_EPSILON) -> dict:
+    """
+    Compare program output with the expected answer.
+
+    ``exact`` compares character for character, ``whitespace`` ignores
+    trailing spaces and trailing blank lines, ``token`` ignores all
+    whitespace layout, ``float`` is ``token`` with numbers equal
+    within ``epsilon`` (absolute or relative) and ``unordered`` compares the
+    non-empty lines as a multiset. Both sides may be strings, bytes, files or
+    iterables of chunks and are read incrementally, so memory stays constant
+    apart from the longest line or token. Returns ``{'passed', 'message'}``
+    where ``message`` points at the first difference.
+    """
+    if mode == 'exact':
+        return _check_exact(expected, actual)
+    if mode == 'whitespace':
+        return _check_sequence(_trimmed_lines(expected), _trimmed_lines(actual), 'Line', str.__eq__)
+    if mode == 'token':
+        return _check_sequence(_tokens(expected), _tokens(actual), 'Token', str.__eq__)
+    if mode == 'float':
+        return _check_sequence(_tokens(expected), _tokens(actual), 'Token',
+                               lambda want, got: _floats_equal(want, got, epsilon))
+    if mode == 'unordered':
+        return _check_unordered(expected, actual)
+    raise ValueError(f"Unknown checker mode: {mode}")
@@ -0,0 +1,188 @@
+import hashlib
+import logging
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+from collections import Counter
+from typing import Iterable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PCH_DIR = os.path.join(tempfile.gettempdir(), 'gencode-pch')
+
+# Include sets worth precompiling before anyone asks for them.
+COMMON_INCLUDE_SETS = {
+    'cpp': [('bits/stdc++.h',)],
+    'c': [],
+}
+
+HEADER_LANGUAGES = {
+    'c': 'c-header',
+    'cpp': 'c++-header',
+}
+
+_INCLUDE_LINE = re.compile(r'#\s*include\s*<([^<>\s]+)>\s*(//.*)?$')
+
+
+def leading_includes(code: str) -> tuple[str, ...] | None:
+    """
+    Return the ordered ``#include <...>`` block that opens ``code``.
+
+    Only blank lines and ``//`` comments may be interleaved. ``None`` means the
+    preamble contains something else (quoted includes, macros, pragmas) that a
+    precompiled header could change the meaning of, so it must not be used.
+    """
+    includes = []
+    for raw_line in code.splitlines():
+        line = raw_line.strip()
+        if not line or line.startswith('//'):
+            continue
+        match = _INCLUDE_LINE.match(line)
+        if match:
+            includes.append(match.group(1))
+            continue
+        if line.startswith('#') or line.startswith('/*'):
+            return None
+        break
+    return tuple(includes) or None
+
+
+class PrecompiledHeaders:
+    """
+    Build and hand out precompiled headers for common C/C++ include sets.
+
+    A header is only used for a submission whose leading include block matches
+    it exactly, so the translation unit is unchanged; anything else compiles
+    normally. Headers are built in the background: common sets eagerly via
+    ``prime`` and other sets once they have been seen ``min_uses`` times.
+    """
+
+    def __init__(self, root: str, max_entries: int, min_uses: int, enabled: bool = True):
+        self.root = root
+        self.max_entries = max_entries
+        self.min_uses = max(min_uses, 1)
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._ready: set[str] = set()
+        self._building: set[str] = set()
+        self._failed: set[str] = set()
+        self._seen: Counter = Counter()
+        self._hits = 0
+        self._misses = 0
+        if enabled:
+            self._load_existing()
+
+    def _load_existing(self) -> None:
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            for name in os.listdir(self.root):
+                if os.path.exists(os.path.join(self.root, name, 'pch.h.gch')):
+                    self._ready.add(name)
+        except OSError as exc:
+            logger.warning("Precompiled header directory %s is unavailable: %s", self.root, exc)
+            self.enabled = False
+
+    @staticmethod
+    def _key(compiler: list[str], toolchain: str, includes: Iterable[str]) -> str:
+        digest = hashlib.sha256('\0'.join([*compiler, toolchain, '', *includes]).encode())
+        return digest.hexdigest()[:24]
+
+    def _header_path(self, key: str) -> str:
+        return os.path.join(self.root, key, 'pch.h')
+
+    def _build(self, key: str, lang: str, compiler: list[str], includes: tuple[str, ...]) -> None:
+        staging = tempfile.mkdtemp(dir=self.root, prefix='.staging-')
+        try:
+            header = os.path.join(staging, 'pch.h')
+            with open(header, 'w') as f:
+                f.writelines(f"#include <{include}>\n" for include in includes)
+            proc = subprocess.run(
+                compiler + ['-x', HEADER_LANGUAGES[lang], header, '-o', header + '.gch'],
+                capture_output=True, text=True, timeout=300,
+            )
+            if proc.returncode != 0:
+                raise RuntimeError(proc.stderr.strip() or f"exit status {proc.returncode}")
+            try:
+                os.rename(staging, os.path.join(self.root, key))
+            except OSError:
+                # Another worker published the same header first.
+                pass
+            with self._lock:
+                self._ready.add(key)
+            logger.info("Built precompiled header for %s", ', '.join(includes))
+        except Exception as exc:
+            logger.warning("Could not precompile %s: %s", ', '.join(includes), exc)
+            with self._lock:
+                self._failed.add(key)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+            with self._lock:
+                self._building.discard(key)
+
+    def _schedule_locked(self, key: str, lang: str, compiler: list[str],
+                         includes: tuple[str, ...]) -> threading.Thread | None:
+        if key in self._ready or key in self._building or key in self._failed:
+            return None
+        if len(self._ready) + len(self._building) >= self.max_entries:
+            return None
+        self._building.add(key)
+        thread = threading.Thread(target=self._build, args=(key, lang, compiler, includes),
+                                  name='pch-build', daemon=True)
+        thread.start()
+        return thread
+
+    def prime(self, lang: str, compiler: list[str], toolchain: str, wait: bool = False) -> None:
+        """Build the common include sets for ``lang`` with ``compiler`` flags."""
+        if not self.enabled:
+            return
+        threads = []
+        with self._lock:
+            for includes in COMMON_INCLUDE_SETS.get(lang, []):
+                thread = self._schedule_locked(self._key(compiler, toolchain, includes), lang, compiler, includes)
+                if thread is not None:
+                    threads.append(thread)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def args_for(self, lang: str, code: str, compiler: list[str], toolchain: str) -> list[str]:
+        """Return extra compiler arguments that load a matching precompiled header, if one is ready."""
+        if not self.enabled or lang not in HEADER_LANGUAGES:
+            return []
+        includes = leading_includes(code)
+        if includes is None:
+            return []
+
+        key = self._key(compiler, toolchain, includes)
+        with self._lock:
+            if key in self._ready:
+                self._hits += 1
+                return ['-include', self._header_path(key)]
+            self._misses += 1
+            self._seen[key] += 1
+            if self._seen[key] >= self.min_uses or includes in COMMON_INCLUDE_SETS.get(lang, []):
+                self._schedule_locked(key, lang, compiler, includes)
+        return []
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'ready': len(self._ready),
+                'building': len(self._building),
+                'failed': len(self._failed),
+                'max_entries': self.max_entries,
+                'hits': self._hits,
+                'misses': self._misses,
+            }
+
+
+pch_manager = PrecompiledHeaders(
+    root=os.getenv('PCH_DIR', DEFAULT_PCH_DIR),
+    max_entries=int(os.getenv('PCH_MAX_ENTRIES', '8')),
+    min_uses=int(os.getenv('PCH_MIN_USES', '2')),
+    enabled=os.getenv('PCH_ENABLED', 'true').lower() == 'true',
+)
@@ -0,0 +1,50 @@
+import atexit
+import os
+
+from services.bounded_process import BoundedCompletedProcess
+from services.warm_pool import WarmProcessPool
+
+# Runs inside each pooled interpreter: block until the length-prefixed source
+# arrives on stdin, then execute it in a fresh __main__ module, like the script
+# runner does. Anything after the source is left on stdin for the program
+# itself. The bootstrap frame is dropped from tracebacks so errors read exactly
+# like `python3 main.py`.
+_BOOTSTRAP = """
+import linecache, sys, traceback, types
+_size = int(sys.stdin.buffer.readline())
+_source = sys.stdin.buffer.read(_size).decode()
+linecache.cache['main.py'] = (len(_source), None, _source.splitlines(True), 'main.py')
+_main = types.ModuleType('__main__')
+_main.__file__ = 'main.py'
+_main.__cached__ = None
+_main.__builtins__ = __builtins__
+sys.modules['__main__'] = _main
+sys.argv = ['main.py']
+try:
+    exec(compile(_source, 'main.py', 'exec'), _main.__dict__)
+except SystemExit:
+    raise
+except BaseException:
+    _type, _value, _tb = sys.exc_info()
+    traceback.print_exception(_type, _value, _tb.tb_next)
+    sys.exit(1)
+"""
+
+
+class PythonWorkerPool(WarmProcessPool):
+    """Keep pre-started, single-use Python interpreters ready for /compiler runs."""
+
+    def __init__(self, size: int, python: str = 'python3'):
+        super().__init__('python', [python, '-c', _BOOTSTRAP], size)
+
+    def run(self, code: str, stdin: bytes = b'', timeout: float = 5) -> BoundedCompletedProcess:
+        """Execute ``code`` in a pooled interpreter, raising ``TimeoutExpired`` like ``subprocess.run``."""
+        source = code.encode()
+        return self.execute(str(len(source)).encode() + b'\n' + source + stdin, timeout)
+
+
+python_pool = PythonWorkerPool(
+    size=int(os.getenv('PYTHON_POOL_SIZE', '2')),
+    python=os.getenv('PYTHON_POOL_EXECUTABLE', 'python3'),
+)
+atexit.register(python_pool.shutdown)
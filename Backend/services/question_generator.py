@@ -1,7 +1,9 @@
 import re
 import random
+from functools import partial
+from typing import Any, Iterator
 
-from config.config import get_llm
+from config.config import get_llm, invoke_many, stream_events
 
 FAANG_COMPANIES = ["Google", "Meta", "Amazon", "Apple", "Netflix"]
 
@@ -98,8 +100,8 @@ def _parse_generated_question(markdown: str, topic: str, source: str = "topic",
     }
 
 
-def generate_dsa_question(topic: str) -> dict:
-    prompt = f"""
+def build_dsa_question_prompt(topic: str) -> str:
+    return f"""
         You are an elite technical interview problem designer and competitive programming author.
 
     Generate a premium-quality, scenario-based DSA problem inspired by the hidden topic "{topic}". The topic should influence only the internal solution—not the title, story, or wording.
@@ -215,10 +217,33 @@ def generate_dsa_question(topic: str) -> dict:
     [Do not reveal the hidden topic by name.]
     ```
     """
-    markdown = get_llm().invoke(prompt).content
+
+
+def generate_dsa_question(topic: str) -> dict:
+    markdown = get_llm().invoke(build_dsa_question_prompt(topic)).content
     return _parse_generated_question(markdown, topic, source="topic")
 
 
+def generate_dsa_questions(topics: list[str]) -> list[dict | Exception]:
+    """Generate questions for several topics concurrently; a failed or unparsable topic yields its exception."""
+    responses = invoke_many([build_dsa_question_prompt(topic) for topic in topics], return_exceptions=True)
+    questions = []
+    for topic, response in zip(topics, responses):
+        if not isinstance(response, Exception):
+            try:
+                response = _parse_generated_question(response.content, topic, source="topic")
+            except Exception as exc:
+                response = exc
+        questions.append(response)
+    return questions
+
+
+def stream_dsa_question(topic: str) -> Iterator[tuple[str, Any]]:
+    """Streaming ``generate_dsa_question``: token events, then the parsed question as a ``done`` event."""
+    return stream_events(build_dsa_question_prompt(topic),
+                         partial(_parse_generated_question, topic=topic, source="topic"))
+
+
 def generate_random_faang_question(existing_topics: list[str] | None = None) -> dict:
     company = random.choice(FAANG_COMPANIES)
     avoided_topics = ", ".join(sorted({topic.strip() for topic in (existing_topics or []) if topic.strip()})[:20])
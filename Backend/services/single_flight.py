@@ -0,0 +1,90 @@
+import os
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from contextlib import nullcontext
+from typing import Any, Callable, ContextManager, Hashable, Optional
+
+from services.execution_pool import execution_pool
+
+
+class SingleFlightTimeout(RuntimeError):
+    """Raised to a waiting caller when the shared call outlives ``wait_timeout``."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("An identical run is still in progress, please retry shortly.")
+        self.retry_after = retry_after
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it is
+    still running wait for it and receive the same result (or exception).
+    Nothing is cached once the call finishes.
+
+    Each waiting caller first enters ``admit()`` (e.g. a queue slot of the
+    execution pool), so a burst of identical calls is bounded exactly like a
+    burst of different ones, and gives up with ``SingleFlightTimeout`` after
+    ``wait_timeout`` seconds.
+    """
+
+    def __init__(self, admit: Optional[Callable[[], ContextManager]] = None,
+                 wait_timeout: Optional[float] = None):
+        self.admit = admit or nullcontext
+        self.wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, Future] = {}
+        self._leaders = 0
+        self._coalesced = 0
+        self._timeouts = 0
+
+    def _wait(self, future: Future) -> Any:
+        with self.admit():
+            try:
+                return future.result(timeout=self.wait_timeout)
+            except FutureTimeoutError:
+                if future.done():
+                    raise
+        with self._lock:
+            self._timeouts += 1
+        raise SingleFlightTimeout(max(1, round(self.wait_timeout or 1)))
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run ``fn`` for ``key``, or wait for the identical call already in flight."""
+        leader = False
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self._coalesced += 1
+            else:
+                future = self._calls[key] = Future()
+                self._leaders += 1
+                future.set_running_or_notify_cancel()
+                leader = True
+        if not leader:
+            return self._wait(future)
+
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as exc:
+            future.set_exception(exc)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return future.result()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'in_flight': len(self._calls),
+                'executions': self._leaders,
+                'coalesced': self._coalesced,
+                'wait_timeouts': self._timeouts,
+            }
+
+
+compile_flight = SingleFlight(
+    admit=execution_pool.reserve,
+    wait_timeout=float(os.getenv('COMPILE_FLIGHT_WAIT_SECONDS', '30')),
+)
@@ -1,7 +1,16 @@
-from config.config import get_llm
+import os
+from typing import Any, Iterator
+
+from config.config import get_llm, stream_events
+from services.complexity import profile_complexity
+from services.execution_pool import ExecutionPoolFull, execution_pool
+from services.judge import judge_code
 
 
 NO_ACTUAL_LOGIC_MARKER = "#NO ACTUAL LOGIC FOUND"
+# LLM evaluations of identical submissions (often untouched starter code) are reused.
+CACHE_TTL_SECONDS = float(os.getenv('SUBMISSION_CACHE_TTL_SECONDS', str(24 * 3600)))
+MAX_TABLE_CELL_LENGTH = 60
 
 
 def _build_incomplete_logic_report() -> str:
@@ -25,26 +34,190 @@ Keep building the solution, then submit again for a full evaluation.
 """.strip()
 
 
-def submit_code(actualSolution: str, description: str, typedSolution: str, typedLanguage: str) -> dict:
-    # Check if the typed solution is empty
-    if not typedSolution or typedSolution.strip() == '':
-        return {
-            'markdown_report': f"""
-## ❌ Empty Solution Submission
+def _table_cell(value: str) -> str:
+    value = str(value).strip().replace('|', '\\|').replace('\n', ' ↵ ')
+    if len(value) > MAX_TABLE_CELL_LENGTH:
+        value = value[:MAX_TABLE_CELL_LENGTH - 1] + '…'
+    return f"`{value}`" if value else '*(empty)*'
+
+
+def _build_judge_table(judge: dict) -> str:
+    rows = [
+        "| Test ID | Category | Input | Expected Output | Your Output | Time | Status |",
+        "|---------|----------|-------|-----------------|-------------|------|--------|",
+    ]
+    for detail in judge['details']:
+        hidden = detail['category'] == 'Hidden'
+        status = '✅' if detail['status'] else f"❌ {detail['run_status'] if detail['run_status'] != 'OK' else 'Wrong Answer'}"
+        rows.append(
+            f"| {detail['id']} | {detail['category']} "
+            f"| {'🔒 hidden' if hidden else _table_cell(detail['input'])} "
+            f"| {'🔒 hidden' if hidden else _table_cell(detail['expected_output'])} "
+            f"| {'🔒 hidden' if hidden else _table_cell(detail['actual_output'])} "
+            f"| {detail['time_ms']:.0f} ms | {status} |"
+        )
+    return "\n".join(rows)
+
+
+def _build_performance_section(profile: dict) -> str:
+    if profile['result'] != 'Success':
+        return f"## ⚡ Performance Metrics\n\n*Growth could not be measured: {profile.get('message', 'unknown error')}*"
+
+    submission, reference = profile['submission'], profile['reference']
+
+    def largest_run(program: dict | None) -> str:
+        finished = [p for p in (program or {}).get('points', []) if p['status'] == 'OK']
+        return f"{finished[-1]['time_ms']:.1f} ms at n={finished[-1]['n']}" if finished else '—'
+
+    rows = [
+        "| Metric | Reference Solution | User Solution |",
+        "|--------|-------------------|---------------|",
+        f"| Measured Time Complexity | {(reference or {}).get('complexity') or '—'} | {submission.get('complexity') or '—'} |",
+        f"| Largest Input Finished | {largest_run(reference)} | {largest_run(submission)} |",
+    ]
+    lines = ["## ⚡ Performance Metrics", "", *rows, ""]
+    if profile['slowdown'] is not None:
+        lines.append(f"- **Slowdown vs Reference**: {profile['slowdown']}x")
+    lines.append(f"- **Performance Verdict**: {profile['verdict']}")
+    lines.extend(f"  - {reason}" for reason in profile['reasons'])
+    return "\n".join(lines)
+
+
+def _build_narrative(actualSolution: str, description: str, typedSolution: str, judge: dict) -> str:
+    prompt = f"""
+You are reviewing a coding submission that has already been executed against real test cases.
+Do not invent or re-run test cases; the results below are authoritative.
 
-**Error: No solution provided**
-- Please write your code solution before submitting
-- Ensure you have typed something in the code editor
-- If you're stuck, you can request a hint or view the problem description
+- **Description**: {description}
+- **Reference Solution**: {actualSolution}
+- **Submitted Solution**: {typedSolution}
+- **Judge Result**: {judge['passed']}/{judge['total']} test cases passed.
 
-*Tip: Every great solution starts with writing the first line of code!* 🖊️
-""",
-            'status': 'Not Accepted'
+Respond in Markdown with exactly these sections:
+## 🧩 Logical Correctness
+## 🔧 Code Quality Insights
+### 💡 Learning Pathways
+Keep each section to a few concise bullet points.
+"""
+    return get_llm().invoke(prompt).content
+
+
+def _wrap_report(evaluation: str) -> str:
+    return f"""
+# 🚀 Code Submission Evaluation Report
+
+## 📊 Comprehensive Solution Analysis
+
+{evaluation}
+
+---
+
+*Generated by GenCode-AI [Designed and Developed by Aswin Hariram] 🤖✨*
+        """
+
+
+def _judge_and_profile(
+    actualSolution: str,
+    typedSolution: str,
+    typedLanguage: str,
+    testcases: list[dict] | None,
+    hidden_testcases: list[dict] | None,
+    profile: bool,
+    checker: str,
+) -> tuple[dict, dict | None]:
+    """The code-running part of ``judge_submission``, run as one execution-pool job."""
+    judge = judge_code(typedSolution, typedLanguage, actualSolution, testcases, hidden_testcases, checker=checker)
+    performance = None
+    if profile and judge['result'] == 'Success' and judge['details']:
+        performance = profile_complexity(typedSolution, typedLanguage, judge['details'][0]['input'], actualSolution)
+    return judge, performance
+
+
+def judge_submission(
+    actualSolution: str,
+    description: str,
+    typedSolution: str,
+    typedLanguage: str,
+    testcases: list[dict] | None,
+    hidden_testcases: list[dict] | None,
+    narrative: bool = False,
+    profile: bool = False,
+    checker: str = 'token',
+) -> dict:
+    """
+    Evaluate a submission by executing it locally instead of asking the LLM to simulate test runs.
+
+    Only the judge and profiler runs hold an execution slot; the narrative LLM
+    call happens after it is released. Raises ``ExecutionPoolFull`` when there
+    is no room to run the code.
+    """
+    judge, performance = execution_pool.run(_judge_and_profile, actualSolution, typedSolution, typedLanguage,
+                                            testcases, hidden_testcases, profile, checker)
+
+    if judge['result'] != 'Success':
+        evaluation = f"""
+## ❌ Compilation Error
+
+Your code could not be compiled or started, so no test cases were run.
+
+```text
+{judge['message'].strip()}
+```
+""".strip()
+        return {
+            'markdown_report': _wrap_report(evaluation),
+            'status': 'Not Accepted',
+            'no_actual_logic': False,
+            'test_cases': judge,
         }
 
-    try:
-        # Construct a detailed prompt for evaluating the typed solution
-        validation_prompt = f"""
+    if judge['pass_rate'] == 100:
+        status = 'Accepted'
+    elif judge['pass_rate'] > 0:
+        status = 'Partially Accepted'
+    else:
+        status = 'Not Accepted'
+
+    slowest = max((detail['time_ms'] for detail in judge['details']), default=0)
+    # Runs whose memory could not be measured (see services.bounded_process) are left out.
+    peak_memory_kb = max((detail['max_rss_kb'] for detail in judge['details'] if detail['max_rss_kb'] is not None),
+                         default=None)
+    memory_used = f"{peak_memory_kb / 1024:.1f} MB" if peak_memory_kb is not None else 'Not measured'
+    evaluation = f"""
+## 🧪 Test Case Performance
+
+{_build_judge_table(judge)}
+
+Total Test Cases passed : **{judge['passed']}/{judge['total']}**
+
+- **Verdict**: {status}
+- **Slowest Test Case**: {slowest:.0f} ms
+- **Peak Memory**: {memory_used}
+""".strip()
+
+    if performance is not None:
+        evaluation += "\n\n" + _build_performance_section(performance)
+
+    if narrative:
+        try:
+            evaluation += "\n\n" + _build_narrative(actualSolution, description, typedSolution, judge)
+        except Exception as e:
+            evaluation += f"\n\n*Narrative review unavailable: {str(e)}*"
+
+    return {
+        'markdown_report': _wrap_report(evaluation),
+        'status': status,
+        'no_actual_logic': False,
+        'runtime': f"{slowest:.0f} ms",
+        'memory_used': memory_used,
+        'test_cases': judge,
+        'performance': performance,
+    }
+
+
+def build_validation_prompt(description: str, actualSolution: str, typedSolution: str) -> str:
+    """Prompt for the LLM-only evaluation, shared by the blocking and streaming paths."""
+    return f"""
 🤖 **Expert Code Evaluation System**
 1. Should not autocorrect or change the typed solution code.
 2. Check if the code has proper header files and imports.
@@ -154,92 +327,136 @@ Test Requirements:
 2.Suggest similar Geeksforgeeks problems to upscale my knowledge with links
 3.Suggest similar Codechef problems to upscale my knowledge with links
 4.Suggest other similar important Concepts to upscale my knowledge
-        """
-
-        # Use the LLM to generate evaluation
-        evaluation = get_llm().invoke(validation_prompt).content
-        no_actual_logic = NO_ACTUAL_LOGIC_MARKER in evaluation
-
-        if no_actual_logic:
-            evaluation = _build_incomplete_logic_report()
-
-        # Format the markdown report with enhanced styling
-        markdown_report = f"""
-# 🚀 Code Submission Evaluation Report
-
-## 📊 Comprehensive Solution Analysis
-
-{evaluation}
-
----
-
-*Generated by GenCode-AI [Designed and Developed by Aswin Hariram] 🤖✨*
-        """
+    """
+
+
+def _finish_llm_evaluation(evaluation: str) -> dict:
+    """Turn the LLM's evaluation markdown into the submission result."""
+    no_actual_logic = NO_ACTUAL_LOGIC_MARKER in evaluation
+
+    if no_actual_logic:
+        evaluation = _build_incomplete_logic_report()
+
+    # Format the markdown report with enhanced styling
+    markdown_report = _wrap_report(evaluation)
+    
+    # Determine solution status based on evaluation content
+    status = 'Not Accepted'
+    
+    # Extract test case data from the table
+    test_case_data = {
+        'total': 0,
+        'passed': 0,
+        'failed': 0,
+        'pass_rate': 0,
+        'details': []
+    }
+    
+    # Parse the test case table if it exists
+    if '| Test ID |' in evaluation:
+        # Find the test case table
+        table_start = evaluation.find('| Test ID |')
+        table_end = evaluation.find('\n\n', table_start)
+        table = evaluation[table_start:table_end].strip()
         
-        # Determine solution status based on evaluation content
-        status = 'Not Accepted'
+        # Process each line of the table
+        for line in table.split('\n')[2:]:  # Skip header and separator lines
+            if '|' in line:
+                parts = [p.strip() for p in line.split('|')[1:-1]]  # Remove empty first and last parts
+                if len(parts) >= 7:  # Ensure we have all columns
+                    test_case = {
+                        'id': parts[0],
+                        'category': parts[1],
+                        'input_level': parts[2],
+                        'input_value': parts[3],
+                        'expected_output': parts[4],
+                        'actual_output': parts[5],
+                        'status': '✅' in parts[6]
+                    }
+                    test_case_data['details'].append(test_case)
+                    test_case_data['total'] += 1
+                    if test_case['status']:
+                        test_case_data['passed'] += 1
+                    else:
+                        test_case_data['failed'] += 1
         
-        # Extract test case data from the table
-        test_case_data = {
-            'total': 0,
-            'passed': 0,
-            'failed': 0,
-            'pass_rate': 0,
-            'details': []
-        }
-        
-        # Parse the test case table if it exists
-        if '| Test ID |' in evaluation:
-            # Find the test case table
-            table_start = evaluation.find('| Test ID |')
-            table_end = evaluation.find('\n\n', table_start)
-            table = evaluation[table_start:table_end].strip()
-            
-            # Process each line of the table
-            for line in table.split('\n')[2:]:  # Skip header and separator lines
-                if '|' in line:
-                    parts = [p.strip() for p in line.split('|')[1:-1]]  # Remove empty first and last parts
-                    if len(parts) >= 7:  # Ensure we have all columns
-                        test_case = {
-                            'id': parts[0],
-                            'category': parts[1],
-                            'input_level': parts[2],
-                            'input_value': parts[3],
-                            'expected_output': parts[4],
-                            'actual_output': parts[5],
-                            'status': '✅' in parts[6]
-                        }
-                        test_case_data['details'].append(test_case)
-                        test_case_data['total'] += 1
-                        if test_case['status']:
-                            test_case_data['passed'] += 1
-                        else:
-                            test_case_data['failed'] += 1
-            
-            # Calculate pass rate
-            if test_case_data['total'] > 0:
-                test_case_data['pass_rate'] = round((test_case_data['passed'] / test_case_data['total']) * 100, 2)
-        
-        # First check for critical failure indicators
-        if no_actual_logic:
-            status = 'Not Accepted'
+        # Calculate pass rate
+        if test_case_data['total'] > 0:
+            test_case_data['pass_rate'] = round((test_case_data['passed'] / test_case_data['total']) * 100, 2)
+    
+    # First check for critical failure indicators
+    if no_actual_logic:
+        status = 'Not Accepted'
+    else:
+        # Check if we have test case data
+        print(test_case_data['pass_rate'])
+        if test_case_data['pass_rate'] == 100:
+            status = 'Accepted'
+        elif test_case_data['pass_rate'] > 0:
+            status = 'Partially Accepted'
         else:
-            # Check if we have test case data
-            print(test_case_data['pass_rate'])
-            if test_case_data['pass_rate'] == 100:
-                status = 'Accepted'
-            elif test_case_data['pass_rate'] > 0:
-                status = 'Partially Accepted'
-            else:
-                status = 'Not Accepted'
-          
-        
+            status = 'Not Accepted'
+      
+    
+    return {
+        'markdown_report': markdown_report,
+        'status': status,
+        'no_actual_logic': no_actual_logic,
+    }
+
+
+def submit_code(
+    actualSolution: str,
+    description: str,
+    typedSolution: str,
+    typedLanguage: str,
+    testcases: list[dict] | None = None,
+    hidden_testcases: list[dict] | None = None,
+    mode: str = 'llm',
+    narrative: bool = False,
+    profile: bool = False,
+    checker: str = 'token',
+) -> dict:
+    # Check if the typed solution is empty
+    if not typedSolution or typedSolution.strip() == '':
         return {
-            'markdown_report': markdown_report,
-            'status': status,
-            'no_actual_logic': no_actual_logic,
+            'markdown_report': f"""
+## ❌ Empty Solution Submission
+
+**Error: No solution provided**
+- Please write your code solution before submitting
+- Ensure you have typed something in the code editor
+- If you're stuck, you can request a hint or view the problem description
+
+*Tip: Every great solution starts with writing the first line of code!* 🖊️
+""",
+            'status': 'Not Accepted'
         }
 
+    if mode == 'judge' and (testcases or hidden_testcases):
+        try:
+            return judge_submission(actualSolution, description, typedSolution, typedLanguage,
+                                    testcases, hidden_testcases, narrative=narrative, profile=profile,
+                                    checker=checker)
+        except ExecutionPoolFull:
+            raise
+        except Exception as e:
+            return {
+                'markdown_report': f"""
+## ❌ Submission Error
+
+**An error occurred during code evaluation:**
+{str(e)}
+Please recheck your solution format or contact the support team if the issue persists.
+""",
+                'status': 'Not Accepted'
+            }
+
+    try:
+        prompt = build_validation_prompt(description, actualSolution, typedSolution)
+        evaluation = get_llm(cache_ttl=CACHE_TTL_SECONDS).invoke(prompt).content
+        return _finish_llm_evaluation(evaluation)
+
     except Exception as e:
         return {
             'markdown_report': f"""
@@ -251,3 +468,31 @@ Please recheck your solution format or contact the support team if the issue per
 """,
             'status': 'Not Accepted'
         }
+
+
+def stream_submit_code(
+    actualSolution: str,
+    description: str,
+    typedSolution: str,
+    typedLanguage: str,
+    testcases: list[dict] | None = None,
+    hidden_testcases: list[dict] | None = None,
+    mode: str = 'llm',
+    narrative: bool = False,
+    profile: bool = False,
+    checker: str = 'token',
+) -> Iterator[tuple[str, Any]]:
+    """
+    Streaming ``submit_code``: the LLM evaluation arrives as token events and
+    the usual result dict as a final ``done`` event. Empty and judge-mode
+    submissions are not LLM-generated and produce only the ``done`` event.
+    """
+    llm_mode = typedSolution and typedSolution.strip() and not (mode == 'judge' and (testcases or hidden_testcases))
+    if not llm_mode:
+        yield 'done', submit_code(actualSolution, description, typedSolution, typedLanguage, testcases,
+                                  hidden_testcases, mode=mode, narrative=narrative, profile=profile,
+                                  checker=checker)
+        return
+
+    yield from stream_events(build_validation_prompt(description, actualSolution, typedSolution),
+                             _finish_llm_evaluation, cache_ttl=CACHE_TTL_SECONDS)
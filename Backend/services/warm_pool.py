@@ -0,0 +1,110 @@
+import logging
+import queue
+import subprocess
+import threading
+from typing import List, Optional
+
+from services.bounded_process import BoundedCompletedProcess, communicate_bounded
+from services.cgroup_sandbox import cgroup_sandbox
+
+logger = logging.getLogger(__name__)
+
+
+class WarmProcessPool:
+    """
+    Keep pre-started, single-use processes ready to receive a job on stdin.
+
+    Each process is handed out once and discarded afterwards, so runs stay as
+    isolated as a fresh ``subprocess.run``; only the startup cost moves off the
+    request path. A background thread refills the pool up to ``size`` once a
+    run has finished, so starting the replacement does not compete with the
+    run itself for CPU.
+    """
+
+    def __init__(self, name: str, argv: List[str], size: int):
+        self.name = name
+        self.argv = argv
+        self.size = max(size, 0)
+        self._idle: 'queue.Queue[subprocess.Popen]' = queue.Queue()
+        self._refill = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._hits = 0
+        self._misses = 0
+
+    def _spawn(self) -> subprocess.Popen:
+        return subprocess.Popen(
+            self.argv,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+
+    def start(self) -> None:
+        """Start the background refill thread (idempotent)."""
+        if self.size == 0:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._refill_loop, name=f'{self.name}-refill', daemon=True)
+            self._thread.start()
+        self._refill.set()
+
+    def _refill_loop(self) -> None:
+        while True:
+            self._refill.wait()
+            self._refill.clear()
+            while self._idle.qsize() < self.size:
+                try:
+                    self._idle.put(self._spawn())
+                except Exception as exc:
+                    logger.error("Could not start pooled %s worker: %s", self.name, exc)
+                    break
+
+    def acquire(self) -> subprocess.Popen:
+        """Hand out a ready process, falling back to a fresh one when the pool is drained."""
+        self.start()
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                self._misses += 1
+                return self._spawn()
+            if worker.poll() is None:
+                self._hits += 1
+                return worker
+
+    def execute(self, payload: bytes, timeout: float) -> BoundedCompletedProcess:
+        """Send ``payload`` to a pooled process and wait, raising ``TimeoutExpired`` like ``subprocess.run``."""
+        with cgroup_sandbox.group() as cgroup:
+            worker = self.acquire()
+            if cgroup is not None:
+                # The worker is blocked reading stdin, so nothing has run unconfined yet.
+                cgroup.attach(worker.pid)
+            try:
+                return communicate_bounded(worker, payload, timeout, cgroup=cgroup)
+            finally:
+                self._discard(worker)
+                self._refill.set()
+
+    def _discard(self, worker: subprocess.Popen) -> None:
+        """Release anything held for ``worker`` once it has run (or been shut down)."""
+
+    def shutdown(self) -> None:
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            worker.kill()
+            worker.wait()
+            self._discard(worker)
+
+    def stats(self) -> dict:
+        return {
+            'size': self.size,
+            'idle': self._idle.qsize(),
+            'hits': self._hits,
+            'misses': self._misses,
+        }
@@ -0,0 +1,130 @@
+import logging
+import os
+import threading
+import time
+import uuid
+
+from services.codeCompiler import BUILD_PROFILES, DEFAULT_PROFILE, compile_code, toolchain_version
+from services.java_server import java_runner_pools
+from services.language_utils import LANGUAGE_LABELS
+from services.node_pool import node_pool
+from services.pch import pch_manager
+from services.python_pool import python_pool
+
+logger = logging.getLogger(__name__)
+
+WARMUP_PROGRAMS = {
+    'c': '#include <stdio.h>\nint main() { printf("ok\\n"); return 0; }\n',
+    'cpp': '#include <bits/stdc++.h>\nusing namespace std;\nint main() { vector<int> v{1}; cout << "ok" << endl; return 0; }\n',
+    'java': 'public class Main { public static void main(String[] args) { System.out.println("ok"); } }\n',
+    'javascript': 'console.log("ok");\n',
+    'python': 'print("ok")\n',
+}
+
+COMMENT_PREFIX = {
+    'c': '//',
+    'cpp': '//',
+    'java': '//',
+    'javascript': '//',
+    'python': '#',
+}
+
+
+class Warmup:
+    """
+    Touch every toolchain once at boot so the first real request is not the cold one.
+
+    Starts the worker pools, builds the common precompiled headers and runs one
+    small program per language and build profile. ``ready`` is set when this
+    finishes, whether or not every language succeeded; per-language results are
+    in ``stats()``. With ``enabled=None`` the ``EXECUTION_WARMUP`` flag is read
+    when ``start()`` is called, so it can be turned off after import.
+    """
+
+    def __init__(self, enabled: bool | None = None):
+        self.enabled = enabled
+        self.ready = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._results: dict[str, dict] = {}
+        self._started_at: float | None = None
+        self._finished_at: float | None = None
+        if enabled is False:
+            self.ready.set()
+
+    def start(self) -> None:
+        """Run the warm-up in a background thread (idempotent)."""
+        with self._lock:
+            if self.enabled is None:
+                self.enabled = os.getenv('EXECUTION_WARMUP', 'true').lower() == 'true'
+                if not self.enabled:
+                    self.ready.set()
+            if self._thread is not None or not self.enabled:
+                return
+            self._started_at = time.monotonic()
+            self._thread = threading.Thread(target=self._run, name='execution-warmup', daemon=True)
+            self._thread.start()
+
+    def _prime_headers(self) -> None:
+        for profile in BUILD_PROFILES.values():
+            for lang in ('c', 'cpp'):
+                compiler = profile[lang]
+                pch_manager.prime(lang, compiler, toolchain_version(compiler[0]), wait=True)
+
+    def _warm_language(self, lang: str) -> dict:
+        # A fresh comment forces a real compile even when the compile cache survived the restart.
+        marker = f"\n{COMMENT_PREFIX[lang]} warmup {uuid.uuid4().hex}\n"
+        profiles = BUILD_PROFILES if lang in BUILD_PROFILES[DEFAULT_PROFILE] else [DEFAULT_PROFILE]
+        started_at = time.perf_counter()
+        for profile in profiles:
+            result = compile_code(WARMUP_PROGRAMS[lang] + marker, lang, profile)
+            if result['result'] != 'Success':
+                return {
+                    'ready': False,
+                    'message': str(result.get('message', ''))[:200],
+                    'time_ms': round((time.perf_counter() - started_at) * 1000, 2),
+                }
+        return {'ready': True, 'message': 'ok', 'time_ms': round((time.perf_counter() - started_at) * 1000, 2)}
+
+    def _run(self) -> None:
+        try:
+            python_pool.start()
+            node_pool.start()
+            for pool in java_runner_pools.values():
+                pool.start()
+            self._prime_headers()
+            for lang in LANGUAGE_LABELS:
+                try:
+                    outcome = self._warm_language(lang)
+                except Exception as exc:
+                    outcome = {'ready': False, 'message': str(exc), 'time_ms': None}
+                with self._lock:
+                    self._results[lang] = outcome
+                if not outcome['ready']:
+                    logger.warning("Warm-up for %s failed: %s", lang, outcome['message'])
+        except Exception as exc:
+            logger.error("Execution warm-up failed: %s", exc)
+        finally:
+            with self._lock:
+                self._finished_at = time.monotonic()
+            self.ready.set()
+            logger.info("Execution warm-up finished in %.1fs", self._finished_at - self._started_at)
+
+    def stats(self) -> dict:
+        with self._lock:
+            if self.enabled is False:
+                message = 'Warm-up disabled'
+            elif self._finished_at is not None:
+                message = f"Warm-up finished in {self._finished_at - self._started_at:.1f}s"
+            elif self._started_at is not None:
+                message = 'Warm-up in progress'
+            else:
+                message = 'Warm-up not started'
+            return {
+                'ready': self.ready.is_set(),
+                'message': message,
+                'languages': dict(self._results),
+            }
+
+
+warmup = Warmup()
@@ -0,0 +1,116 @@
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+SHARED_MEMORY_DIR = '/dev/shm'
+
+
+def default_workspace_root() -> str:
+    """Prefer RAM-backed ``/dev/shm`` so per-run files never touch the disk."""
+    if os.path.isdir(SHARED_MEMORY_DIR) and os.access(SHARED_MEMORY_DIR, os.W_OK | os.X_OK):
+        return os.path.join(SHARED_MEMORY_DIR, 'gencode-workspaces')
+    return os.path.join(tempfile.gettempdir(), 'gencode-workspaces')
+
+
+class WorkspaceManager:
+    """
+    Hand out private scratch directories for a single compile or run.
+
+    Every workspace is removed when its ``with`` block exits. A background
+    sweeper also deletes directories older than ``max_age`` seconds, which only
+    happens when a worker died before its cleanup ran.
+    """
+
+    def __init__(self, root: str, max_age: float, sweep_interval: float):
+        self.root = root
+        self.max_age = max_age
+        self.sweep_interval = sweep_interval
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._active = 0
+        self._created = 0
+        self._swept = 0
+
+    def start(self) -> None:
+        """Create the root and start the orphan sweeper (idempotent)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            os.makedirs(self.root, exist_ok=True)
+            self._thread = threading.Thread(target=self._sweep_loop, name='workspace-sweeper', daemon=True)
+            self._thread.start()
+
+    def _sweep_loop(self) -> None:
+        while True:
+            time.sleep(self.sweep_interval)
+            try:
+                self.sweep()
+            except Exception as exc:
+                logger.error("Workspace sweep failed: %s", exc)
+
+    def sweep(self) -> int:
+        """Remove workspaces older than ``max_age``; returns how many were deleted."""
+        cutoff = time.time() - self.max_age
+        removed = 0
+        try:
+            entries = list(os.scandir(self.root))
+        except FileNotFoundError:
+            return 0
+        for entry in entries:
+            try:
+                if entry.stat(follow_symlinks=False).st_mtime >= cutoff:
+                    continue
+            except FileNotFoundError:
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path, ignore_errors=True)
+            else:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+            removed += 1
+        if removed:
+            logger.info("Swept %d orphaned workspace(s) from %s", removed, self.root)
+            with self._lock:
+                self._swept += removed
+        return removed
+
+    @contextmanager
+    def workspace(self) -> Iterator[str]:
+        """Yield a fresh empty directory that is deleted afterwards, whatever happens inside."""
+        self.start()
+        path = tempfile.mkdtemp(dir=self.root, prefix='run-')
+        with self._lock:
+            self._active += 1
+            self._created += 1
+        try:
+            yield path
+        finally:
+            shutil.rmtree(path, ignore_errors=True)
+            with self._lock:
+                self._active -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'root': self.root,
+                'in_memory': self.root.startswith(SHARED_MEMORY_DIR + os.sep),
+                'active': self._active,
+                'created': self._created,
+                'swept': self._swept,
+            }
+
+
+workspace_manager = WorkspaceManager(
+    root=os.getenv('EXECUTION_WORKSPACE_DIR') or default_workspace_root(),
+    max_age=float(os.getenv('WORKSPACE_MAX_AGE_SECONDS', '600')),
+    sweep_interval=float(os.getenv('WORKSPACE_SWEEP_INTERVAL_SECONDS', '60')),
+)
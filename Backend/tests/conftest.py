@@ -0,0 +1,77 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+COMPLETION = {'choices': [{'message': {'content': ' hello '}}]}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        with self.server.lock:
+            self.server.requests += 1
+            self.server.in_flight += 1
+            self.server.peak = max(self.server.peak, self.server.in_flight)
+            status, delay = self.server.replies.pop(0) if self.server.replies else (200, self.server.delay)
+        time.sleep(delay)
+        with self.server.lock:
+            self.server.in_flight -= 1
+        body = json.dumps(COMPLETION if status == 200 else {'error': status}).encode()
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except OSError:
+            # The client gave up (read timeout) before the reply was sent.
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    """Chat-completions endpoint answering with scripted ``(status, delay)`` replies, then 200s after ``delay``."""
+
+    daemon_threads = True
+
+    def __init__(self, replies=(), delay=0):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.replies = list(replies)
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+        self.in_flight = 0
+        self.peak = 0
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/api/v1"
+
+
+@pytest.fixture
+def stub_server():
+    servers = []
+
+    def start(replies=(), delay=0):
+        server = StubServer(replies, delay)
+        threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,53 @@
+import os
+import subprocess
+
+import pytest
+
+from services.cgroup_sandbox import GATE, CgroupSandbox, RunCgroup, gate_command
+
+
+def test_report_reads_oom_and_throttling_events(tmp_path):
+    (tmp_path / 'memory.events').write_text('low 0\nhigh 0\nmax 4\noom 1\noom_kill 1\n')
+    (tmp_path / 'cpu.stat').write_text('usage_usec 2500\nnr_periods 10\nnr_throttled 3\nthrottled_usec 1500\n')
+    (tmp_path / 'pids.events').write_text('max 2\n')
+    (tmp_path / 'memory.peak').write_text(str(8 * 1024 * 1024))
+
+    report = RunCgroup(str(tmp_path)).report()
+
+    assert report['oom_killed'] is True
+    assert report['memory_limit_hits'] == 4
+    assert report['memory_peak_kb'] == 8192
+    assert report['cpu_throttled_ms'] == 1.5
+    assert report['nr_throttled'] == 3
+    assert report['pids_limit_hits'] == 2
+
+
+def test_sandbox_falls_back_when_controllers_are_missing(tmp_path):
+    (tmp_path / 'cgroup.controllers').write_text('cpu io\n')
+    sandbox = CgroupSandbox(enabled=True, cpu_limit=1, memory_limit_mb=64, pids_max=16, parent=str(tmp_path))
+
+    with sandbox.group() as group:
+        assert group is None
+
+    stats = sandbox.stats()
+    assert stats['available'] is False
+    assert 'memory' in stats['reason']
+
+
+def test_failed_attach_is_reported(tmp_path):
+    group = RunCgroup(str(tmp_path / 'missing'))
+
+    assert group.attach(os.getpid()) is False
+    report = group.report()
+    assert report['attached'] is False
+    assert 'No such file' in report['attach_error']
+
+
+def test_gated_command_waits_for_the_gate_line():
+    proc = subprocess.Popen(gate_command(['cat']), stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    out, _ = proc.communicate(GATE + b'payload', timeout=5)
+
+    assert proc.returncode == 0
+    assert out == b'payload'
+    with pytest.raises(FileNotFoundError):
+        gate_command(['definitely-not-a-real-command'])
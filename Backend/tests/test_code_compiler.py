@@ -1,5 +1,10 @@
-from services.codeCompiler import compile_code
+import time
+import uuid
+
+from services.codeCompiler import RUN_TIMEOUT, _run_process, compile_code, run_batch
+from services.java_server import JVM_FLAGS, java_runner_pools
 from services.language_utils import language_label, normalize_language
+from services.node_pool import node_pool
 
 
 def test_normalize_language_aliases():
@@ -32,3 +37,138 @@ def test_compile_code_preserves_stdout_formatting():
 
     assert result["result"] == "Success"
     assert result["message"] == "hi\n"
+
+
+def test_compile_code_reuses_cached_c_binary():
+    source = '#include <stdio.h>\nint main() { printf("cached\\n"); return 0; }\n'
+    first = compile_code(source, "c")
+    second = compile_code(source, "c")
+
+    assert first["result"] == "Success"
+    assert second["message"] == "cached\n"
+    assert second["cached"] is True
+
+
+def test_python_pool_reports_errors_like_a_script():
+    result = compile_code('def f():\n    raise ValueError("boom")\nf()\n', "python")
+
+    assert result["result"] == "Compilation Error"
+    assert 'File "main.py", line 2, in f' in result["message"]
+    assert result["message"].endswith("ValueError: boom\n")
+
+
+def test_python_pool_runs_code_as_main_module():
+    code = (
+        'import pickle, sys\n'
+        'class P:\n'
+        '    pass\n'
+        'print(type(pickle.loads(pickle.dumps(P()))).__name__, __name__, __file__, sys.argv)\n'
+        'print(sys.modules["__main__"].P is P)\n'
+    )
+    result = compile_code(code, "python")
+
+    assert result["result"] == "Success"
+    assert result["message"] == "P __main__ main.py ['main.py']\nTrue\n"
+
+
+def test_run_batch_compiles_once_and_runs_each_input():
+    source = '#include <iostream>\nint main() { long a, b; std::cin >> a >> b; std::cout << a + b << "\\n"; }\n'
+    result = run_batch(source, "c++", ["1 2", "40 2"])
+
+    assert result["result"] == "Success"
+    assert [case["stdout"] for case in result["results"]] == ["3\n", "42\n"]
+    assert all(case["status"] == "OK" for case in result["results"])
+
+
+def test_compile_code_kills_programs_that_flood_stdout():
+    result = compile_code('while True:\n    print("x" * 1000)\n', "python")
+
+    assert result["result"] == "Output Limit Exceeded"
+    assert result["truncated"] is True
+    assert result["message"].startswith("x" * 1000)
+
+
+def test_javascript_output_flood_is_killed_at_the_cap():
+    started_at = time.monotonic()
+    result = compile_code("while (true) console.log('x');", "javascript")
+
+    # Printing the 1 MB cap one byte at a time takes a while on slow machines,
+    # but the run must end when the cap is hit, not at the timeout.
+    assert result["result"] == "Output Limit Exceeded"
+    assert result["truncated"] is True
+    assert time.monotonic() - started_at < RUN_TIMEOUT * 0.8
+
+
+def test_compile_code_reports_resource_usage():
+    code = 'import time\nblock = bytearray(b"x") * (64 * 1024 * 1024)\ntime.sleep(0.2)\nprint(len(block))\n'
+    result = compile_code(code, "python")
+
+    run_usage = result["usage"]["run"]
+    assert result["usage"]["compile"] is None
+    assert run_usage["wall_ms"] > 0
+    assert 64 * 1024 <= run_usage["max_rss_kb"] < 160 * 1024
+    assert run_usage["max_rss_source"] in {"cgroup", "sampled"}
+    assert {"cpu_user_ms", "cpu_sys_ms"} <= run_usage.keys()
+
+
+def test_peak_memory_is_the_programs_not_the_parents():
+    # wait4's ru_maxrss would report at least this much for any child forked from here.
+    ballast = bytearray(b"x") * (256 * 1024 * 1024)
+    code = '#include <unistd.h>\nint main() { usleep(100000); return 0; }\n'
+    result = compile_code(code, "c")
+    del ballast
+
+    assert result["result"] == "Success"
+    assert result["usage"]["run"].get("max_rss_kb", 0) < 32 * 1024
+
+
+JS_PROGRAMS = [
+    'const a = [3, 1, 2];\na.sort();\nconsole.log(a, { n: a.length });\nconsole.error("done");\n',
+    'console.log(typeof global, typeof require, require.main === module);\nthrow 5;\n',
+    'function f() { throw new TypeError("boom"); }\nf();\n',
+    'const lines = require("fs").readFileSync(0, "utf8").trim().split("\\n");\n'
+    'setTimeout(() => console.log(lines.map(Number).reduce((x, y) => x + y)), 1);\n',
+]
+
+
+def test_javascript_pool_matches_fresh_node_process(tmp_path):
+    script = tmp_path / 'main.js'
+    for code in JS_PROGRAMS:
+        script.write_text(code)
+
+        expected = _run_process(['node', str(script)], b'1\n2\n', 5)
+        actual = node_pool.run(str(script), b'1\n2\n', 5)
+
+        assert (actual.returncode, actual.stdout, actual.stderr) == \
+            (expected.returncode, expected.stdout, expected.stderr)
+
+
+def test_javascript_runs_cannot_tamper_with_later_runs():
+    escape = (
+        'const host = console.log.constructor("return this")();\n'
+        'host.JSON.stringify = () => "PWNED";\n'
+        'host.leaked = true;\n'
+    )
+    assert compile_code(escape, "javascript")["result"] == "Success"
+
+    result = compile_code('console.log(JSON.stringify({ a: 1 }), typeof leaked);', "javascript")
+
+    assert result["message"] == '{"a":1} undefined\n'
+
+
+def test_build_profiles_are_cached_separately():
+    source = f'#include <stdio.h>\nint main() {{ printf("profile\\n"); return 0; }}\n// {uuid.uuid4().hex}\n'
+    ran = compile_code(source, "c", "run")
+    judged = compile_code(source, "c", "judge")
+    judged_again = compile_code(source, "c", "judge")
+
+    assert ran["cached"] is False
+    assert judged["cached"] is False
+    assert judged["message"] == "profile\n"
+    assert judged_again["cached"] is True
+
+
+def test_judge_java_runs_keep_tiered_compilation():
+    assert '-XX:TieredStopAtLevel=1' in JVM_FLAGS['run']
+    assert not any(flag.startswith('-XX:TieredStopAtLevel') for flag in JVM_FLAGS['judge'])
+    assert java_runner_pools['judge'].argv[1:] == JVM_FLAGS['judge']
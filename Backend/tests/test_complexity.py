@@ -0,0 +1,27 @@
+from services.complexity import fit_complexity, make_input_scaler
+
+
+def test_input_scaler_keeps_counts_consistent():
+    assert make_input_scaler('3 1 2 3')(5) == '5 1 2 3 1 2\n'
+    assert make_input_scaler('3 9\n4 5 6')(4) == '4 9\n4 5 6 4\n'
+    assert make_input_scaler('nums = [1, 2]')(3) == 'nums = [1,2,1]'
+    assert make_input_scaler('42') is None
+
+
+def test_fit_complexity_picks_growth_class():
+    sizes = [64 * 2 ** i for i in range(8)]
+    linear = [{'n': n, 'status': 'OK', 'time_ms': 2 + n * 0.01} for n in sizes]
+    quadratic = [{'n': n, 'status': 'OK', 'time_ms': 2 + n * n * 1e-5} for n in sizes]
+
+    assert fit_complexity(linear)['complexity'] == 'O(n)'
+    assert fit_complexity(quadratic)['complexity'] == 'O(n^2)'
+
+
+def test_fit_complexity_skips_classes_that_overflow_at_large_sizes():
+    # The default PROFILE_MIN_SIZE ladder (100..800) and beyond.
+    for sizes in ([100 * 2 ** i for i in range(4)], [500, 600, 700, 800, 900, 999], [512 * 2 ** i for i in range(6)]):
+        linear = [{'n': n, 'status': 'OK', 'time_ms': 2 + n * 0.1} for n in sizes]
+        quadratic = [{'n': n, 'status': 'OK', 'time_ms': 2 + n * n * 1e-4} for n in sizes]
+
+        assert fit_complexity(linear)['complexity'] == 'O(n)'
+        assert fit_complexity(quadratic)['complexity'] == 'O(n^2)'
@@ -0,0 +1,23 @@
+import threading
+
+import pytest
+
+from services.execution_pool import ExecutionPool, ExecutionPoolFull
+
+
+def test_execution_pool_rejects_when_queue_is_full():
+    pool = ExecutionPool(max_concurrency=1, max_queue=1)
+    release = threading.Event()
+
+    running = pool.submit(release.wait)
+    queued = pool.submit(lambda: "done")
+    with pytest.raises(ExecutionPoolFull) as excinfo:
+        pool.submit(lambda: "rejected")
+
+    assert excinfo.value.retry_after >= 1
+    assert pool.stats()["queue_depth"] == 1
+
+    release.set()
+    assert running.result() is True
+    assert queued.result() == "done"
+    assert pool.stats()["rejected"] == 1
@@ -0,0 +1,168 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+import config.config as llm_config
+from config.config import FallbackLLM
+from config.hedging import LatencyTracker, ahedged_call, hedged_call
+
+
+class RecordingExecutor(ThreadPoolExecutor):
+    def __init__(self):
+        super().__init__(max_workers=2, thread_name_prefix='hedge')
+        self.submitted = 0
+
+    def submit(self, fn, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(fn, *args, **kwargs)
+
+
+def after(seconds, answer=None, error=None):
+    """Callable that answers (or raises) after ``seconds`` and records whether it ran."""
+    calls = []
+
+    def call():
+        calls.append(1)
+        time.sleep(seconds)
+        if error is not None:
+            raise error
+        return answer
+
+    call.calls = calls
+    return call
+
+
+def test_fast_primary_is_not_hedged():
+    backup = after(0, 'backup')
+    hedges = []
+    with RecordingExecutor() as executor:
+        result = hedged_call(after(0, 'primary'), backup, 1, executor, lambda: hedges.append(1))
+
+    assert result == 'primary'
+    assert executor.submitted == 1
+    assert backup.calls == []
+    assert hedges == []
+
+
+def test_slow_primary_loses_to_backup():
+    hedges = []
+    with RecordingExecutor() as executor:
+        started_at = time.monotonic()
+        result = hedged_call(after(0.5, 'primary'), after(0, 'backup'), 0.05, executor, lambda: hedges.append(1))
+        elapsed = time.monotonic() - started_at
+
+    assert result == 'backup'
+    assert hedges == [1]
+    assert elapsed < 0.4
+
+
+def test_backup_answers_when_the_hedged_primary_fails():
+    with RecordingExecutor() as executor:
+        result = hedged_call(after(0.1, error=RuntimeError('read timed out')), after(0.2, 'backup'), 0.05, executor)
+
+    assert result == 'backup'
+
+
+def test_primary_error_before_deadline_is_raised():
+    backup = after(0, 'backup')
+    with RecordingExecutor() as executor:
+        with pytest.raises(RuntimeError, match='429'):
+            hedged_call(after(0, error=RuntimeError('429 rate limited')), backup, 1, executor)
+
+    assert backup.calls == []
+
+
+class SleepyLLM:
+    def __init__(self, seconds, answer):
+        self.seconds = seconds
+        self.answer = answer
+        self.model = answer
+
+    def invoke(self, prompt):
+        time.sleep(self.seconds)
+        return SimpleNamespace(content=self.answer)
+
+
+def test_fallback_invoke_returns_the_faster_backup(monkeypatch):
+    monkeypatch.setenv('LLM_HEDGE_DEFAULT_SECONDS', '0.05')
+    llm = FallbackLLM(SleepyLLM(0.5, 'primary'), SleepyLLM(0, 'backup'), hedging=True)
+
+    started_at = time.monotonic()
+    response = llm.invoke('prompt')
+    elapsed = time.monotonic() - started_at
+
+    assert response.content == 'backup'
+    assert elapsed < 0.4
+    assert llm.stats()['hedged'] == 1
+    assert llm.stats()['backup_wins'] == 1
+
+
+class ModelLLM:
+    base_url = 'https://llm.test/api/v1'
+
+    def __init__(self, model):
+        self.model = model
+
+
+def test_hedging_needs_a_distinct_backup():
+    assert FallbackLLM(ModelLLM('a'), ModelLLM('b'), hedging=True).hedging is True
+    assert FallbackLLM(ModelLLM('a'), ModelLLM('a'), hedging=True).hedging is False
+    assert FallbackLLM(ModelLLM('a'), None, hedging=True).hedging is False
+
+
+def test_shared_client_hedges_only_with_a_backup_model(monkeypatch):
+    monkeypatch.setenv('OPENROUTER_API_KEY', 'test-key')
+    monkeypatch.setenv('LLM_HEDGE_ENABLED', 'true')
+    monkeypatch.delenv('OPENROUTER_BACKUP_MODEL', raising=False)
+    monkeypatch.setattr(llm_config, '_llm', None)
+    assert llm_config._get_shared_llm().hedging is False
+
+    monkeypatch.setenv('OPENROUTER_BACKUP_MODEL', 'other/model')
+    monkeypatch.setattr(llm_config, '_llm', None)
+    shared = llm_config._get_shared_llm()
+    assert shared.hedging is True
+    assert shared.backup.model == 'other/model'
+
+
+def test_async_hedge_cancels_the_slow_primary():
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return 'primary'
+
+    async def backup():
+        return 'backup'
+
+    async def run():
+        result = await ahedged_call(slow, backup, 0.05)
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(run()) == 'backup'
+    assert cancelled == [True]
+
+
+def test_deadline_is_default_until_enough_samples_then_clamped_p95():
+    tracker = LatencyTracker(window=100, min_samples=5, default=15, floor=2, ceiling=30)
+    for _ in range(4):
+        tracker.record(4.0)
+    assert tracker.deadline() == 15
+
+    tracker.record(4.0)
+    assert tracker.deadline() == 4.0
+
+    for _ in range(100):
+        tracker.record(0.1)
+    assert tracker.deadline() == 2
+
+    for _ in range(100):
+        tracker.record(60.0)
+    assert tracker.deadline() == 30
@@ -0,0 +1,81 @@
+import asyncio
+
+from services.interactive import STDIN_BUFFER_BYTES, InteractiveSession
+
+
+def _run_session(code, language, drive, max_seconds=10, idle_seconds=10):
+    async def scenario():
+        events = []
+        compiled = asyncio.Event()
+
+        async def send(event):
+            events.append(event)
+            if event['type'] == 'compiled':
+                compiled.set()
+
+        session = InteractiveSession(send, max_seconds, idle_seconds)
+        task = asyncio.create_task(session.run(code, language))
+        await asyncio.wait_for(compiled.wait(), 30)
+        await drive(session, events)
+        await asyncio.wait_for(task, 30)
+        return events
+
+    return asyncio.run(scenario())
+
+
+def _output(events, stream='stdout'):
+    return ''.join(event['data'] for event in events if event['type'] == stream)
+
+
+def test_prompt_is_streamed_before_stdin_arrives():
+    code = '#include <stdio.h>\nint main() { char name[32]; printf("name? "); printf("\\n");\n' \
+           'scanf("%31s", name); printf("hi %s\\n", name); return 0; }\n'
+
+    async def drive(session, events):
+        for _ in range(200):
+            if 'name?' in _output(events):
+                break
+            await asyncio.sleep(0.05)
+        assert 'hi' not in _output(events)
+        session.write('ada\n')
+        session.close_stdin()
+
+    events = _run_session(code, 'c', drive)
+
+    assert _output(events) == 'name? \nhi ada\n'
+    assert events[-1]['type'] == 'exit'
+    assert events[-1]['status'] == 'OK'
+
+
+def test_kill_and_idle_timeout_stop_the_program():
+    async def kill(session, events):
+        await asyncio.sleep(0.2)
+        session.kill()
+
+    async def wait_quietly(session, events):
+        pass
+
+    killed = _run_session('import time\nwhile True:\n    time.sleep(1)\n', 'python', kill)
+    idle = _run_session('input()\n', 'python', wait_quietly, idle_seconds=0.5)
+
+    assert killed[-1]['status'] == 'Killed'
+    assert idle[-1]['status'] == 'Time Limit Exceeded'
+
+
+def test_stdin_flood_is_bounded_and_does_not_keep_the_run_alive():
+    chunk = 'x' * (256 * 1024)
+    accepted, rejected, pending = [], [], []
+
+    async def flood(session, events):
+        while events[-1]['type'] != 'exit':
+            (accepted if session.write(chunk) else rejected).append(1)
+            pending.append(session._stdin_pending)
+            await asyncio.sleep(0.01)
+
+    events = _run_session('import time\nwhile True:\n    time.sleep(1)\n', 'python', flood, idle_seconds=0.5)
+
+    # Stopped by the idle limit, not the 10 s wall-clock limit.
+    assert events[-1]['status'] == 'Time Limit Exceeded'
+    assert events[-1]['usage']['wall_ms'] < 5000
+    assert accepted and rejected
+    assert max(pending) <= STDIN_BUFFER_BYTES
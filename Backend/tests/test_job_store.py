@@ -0,0 +1,15 @@
+from services.execution_pool import ExecutionPool
+from services.job_store import JobStore
+
+
+def test_job_store_long_polls_and_evicts_oldest_finished_jobs():
+    store = JobStore(ExecutionPool(max_concurrency=1, max_queue=4), max_jobs=2, ttl=300)
+
+    first = store.submit(lambda: 'first')
+    assert store.get(first.job_id, wait=5).to_dict()['result'] == 'first'
+    failed = store.submit(lambda: 1 / 0)
+    assert store.get(failed.job_id, wait=5).to_dict()['status'] == 'failed'
+    store.get(store.submit(lambda: 'third').job_id, wait=5)
+
+    assert store.get(first.job_id) is None
+    assert store.stats()['jobs'] == 2
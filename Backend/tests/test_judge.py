@@ -0,0 +1,25 @@
+from services.judge import judge_code, outputs_match
+
+
+REFERENCE = '#include <iostream>\nint main() { long a, b; std::cin >> a >> b; std::cout << a + b << "\\n"; }\n'
+
+
+def test_outputs_match_ignores_whitespace_layout():
+    assert outputs_match("1 2\n3\n", "1  2 3")
+    assert not outputs_match("1 2 3", "1 2")
+
+
+def test_judge_uses_reference_output_as_oracle():
+    submission = 'a, b = map(int, input().split())\nprint(a + b if a < 10 else a - b)\n'
+    result = judge_code(
+        submission,
+        "python",
+        REFERENCE,
+        testcases=[{"input": "1 2", "expected_output": "wrong"}],
+        hidden_testcases=[{"input": "20 2", "expected_output": "22"}],
+    )
+
+    assert result["result"] == "Success"
+    assert [detail["status"] for detail in result["details"]] == [True, False]
+    assert result["details"][0]["expected_source"] == "reference"
+    assert result["pass_rate"] == 50.0
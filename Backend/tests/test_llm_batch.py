@@ -0,0 +1,96 @@
+import asyncio
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+import config.config as llm_config
+from config.config import OpenRouterLLM, agather, invoke_many
+
+
+class SleepyLLM:
+    """Answers ``'<seconds> <text>'`` prompts after that many seconds; ``fail`` prompts raise."""
+
+    async def ainvoke(self, prompt):
+        seconds, text = prompt.split(' ', 1)
+        await asyncio.sleep(float(seconds))
+        if text == 'fail':
+            raise RuntimeError(f"could not answer {prompt!r}")
+        return SimpleNamespace(content=text)
+
+
+@pytest.fixture
+def shared_llm(monkeypatch):
+    """Install ``llm`` as the shared client, with async clients rebuilt from the current environment."""
+    def use(llm, **env):
+        for name, value in env.items():
+            monkeypatch.setenv(name, str(value))
+        monkeypatch.setattr(llm_config, '_async_clients', weakref.WeakKeyDictionary())
+        monkeypatch.setattr(llm_config, '_llm', llm)
+        return llm
+
+    return use
+
+
+def test_agather_keeps_prompt_order(shared_llm):
+    shared_llm(SleepyLLM())
+
+    responses = asyncio.run(agather(['0.06 first', '0.03 second', '0 third']))
+
+    assert [response.content for response in responses] == ['first', 'second', 'third']
+
+
+def test_return_exceptions_keeps_the_rest_of_the_batch(shared_llm):
+    shared_llm(SleepyLLM())
+    prompts = ['0.02 ok', '0 fail', '0.01 also ok']
+
+    responses = invoke_many(prompts, return_exceptions=True)
+
+    assert responses[0].content == 'ok'
+    assert isinstance(responses[1], RuntimeError)
+    assert responses[2].content == 'also ok'
+    with pytest.raises(RuntimeError, match='fail'):
+        invoke_many(prompts)
+
+
+def test_concurrency_is_bounded(stub_server, shared_llm):
+    server = stub_server(delay=0.05)
+    shared_llm(OpenRouterLLM(api_key='test-key', base_url=server.url, model='test/model'),
+               LLM_ASYNC_MAX_CONCURRENCY=3)
+
+    responses = invoke_many([f"prompt {i}" for i in range(12)])
+
+    assert [response.content for response in responses] == ['hello'] * 12
+    assert server.requests == 12
+    assert server.peak == 3
+
+
+def test_batches_from_many_threads_share_one_client_and_bound(stub_server, shared_llm):
+    server = stub_server(delay=0.05)
+    shared_llm(OpenRouterLLM(api_key='test-key', base_url=server.url, model='test/model'),
+               LLM_ASYNC_MAX_CONCURRENCY=3)
+
+    def batch(thread):
+        return [response.content for response in invoke_many([f"{thread} {i}" for i in range(5)])]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(batch, range(4)))
+    connections = server.connections
+    # The client stays open after a batch, so the next one reuses its connections.
+    invoke_many(['again'] * 3)
+
+    assert results == [['hello'] * 5] * 4
+    assert server.requests == 23
+    assert server.peak == 3
+    assert connections <= 3
+    assert server.connections == connections
+
+
+def test_invoke_many_works_inside_a_running_event_loop(shared_llm):
+    shared_llm(SleepyLLM())
+
+    async def handler():
+        return invoke_many(['0 from a coroutine'])
+
+    assert asyncio.run(handler())[0].content == 'from a coroutine'
@@ -0,0 +1,41 @@
+from types import SimpleNamespace
+
+from config.llm_cache import CachedLLM, LLMResponseCache
+
+
+class CountingLLM:
+    model = 'test-model'
+    temperature = 0.7
+
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        return SimpleNamespace(content=f"answer {self.calls} to {prompt}")
+
+
+def test_repeated_prompts_are_served_from_disk(tmp_path):
+    llm = CountingLLM()
+    cached = CachedLLM(llm, LLMResponseCache(str(tmp_path), max_bytes=1024 * 1024), ttl=60)
+
+    first = cached.invoke('convert this').content
+    # A new cache instance (e.g. after a restart) reads the same files.
+    restarted = CachedLLM(llm, LLMResponseCache(str(tmp_path), max_bytes=1024 * 1024), ttl=60)
+
+    assert restarted.invoke('convert this').content == first
+    assert cached.invoke('something else').content == 'answer 2 to something else'
+    assert llm.calls == 2
+
+
+def test_ttl_and_size_limits(tmp_path):
+    cache = LLMResponseCache(str(tmp_path), max_bytes=300)
+    cache.set('a', 'x' * 100)
+    cache.set('b', 'y' * 100)
+    cache.set('c', 'z' * 100)
+
+    assert cache.get('a', ttl=60) is None
+    assert cache.get('c', ttl=60) == 'z' * 100
+    assert cache.get('c', ttl=-1) is None
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['expired'] == 1
@@ -0,0 +1,202 @@
+import io
+import json
+import socket
+import time
+
+import pytest
+import requests
+import urllib3.util.connection
+from requests.adapters import BaseAdapter
+
+import config.config as llm_config
+from config.config import FallbackLLM, OpenRouterLLM
+
+@pytest.fixture
+def make_llm(monkeypatch):
+    """Build an ``OpenRouterLLM`` on a fresh shared session after applying ``env``."""
+    def make(base_url, **env):
+        for name, value in env.items():
+            monkeypatch.setenv(name, str(value))
+        monkeypatch.setattr(llm_config, '_http_session', None)
+        return OpenRouterLLM(api_key='test-key', base_url=base_url, model='test/model')
+
+    return make
+
+
+def test_sequential_calls_reuse_one_connection(stub_server, make_llm):
+    server = stub_server()
+    llm = make_llm(server.url)
+
+    answers = [llm.invoke(f"prompt {i}").content for i in range(5)]
+
+    assert answers == ['hello'] * 5
+    assert server.requests == 5
+    assert server.connections == 1
+
+
+def test_new_clients_share_the_pooled_session(stub_server, make_llm):
+    server = stub_server()
+    first = make_llm(server.url)
+    second = OpenRouterLLM(api_key='test-key', base_url=server.url, model='test/model')
+
+    first.invoke('a')
+    second.invoke('b')
+
+    assert second.session is first.session
+    assert server.connections == 1
+
+
+def test_gateway_errors_are_retried_with_backoff_up_to_the_limit(stub_server, make_llm):
+    server = stub_server([(502, 0), (503, 0), (504, 0)])
+    llm = make_llm(server.url, LLM_HTTP_RETRIES=2)
+
+    started_at = time.monotonic()
+    with pytest.raises(requests.HTTPError, match='504'):
+        llm.invoke('prompt')
+    elapsed = time.monotonic() - started_at
+
+    # One call plus LLM_HTTP_RETRIES retries; the second retry waits 2 * 0.5s.
+    assert server.requests == 3
+    assert elapsed >= 0.9
+
+
+def test_gateway_error_then_success_returns_the_answer(stub_server, make_llm):
+    server = stub_server([(503, 0)])
+    llm = make_llm(server.url, LLM_HTTP_RETRIES=2)
+
+    assert llm.invoke('prompt').content == 'hello'
+    assert server.requests == 2
+
+
+def test_rate_limits_are_not_retried(stub_server, make_llm):
+    server = stub_server([(429, 0)])
+    llm = make_llm(server.url, LLM_HTTP_RETRIES=2)
+
+    with pytest.raises(requests.HTTPError, match='429'):
+        llm.invoke('prompt')
+    assert server.requests == 1
+
+
+def test_read_timeouts_are_not_retried(stub_server, make_llm):
+    server = stub_server([(200, 1.0)])
+    llm = make_llm(server.url, LLM_HTTP_RETRIES=2, LLM_READ_TIMEOUT=0.2)
+
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        llm.invoke('prompt')
+    assert server.requests == 1
+
+
+def test_connect_timeouts_are_retried_up_to_the_limit(make_llm, monkeypatch):
+    attempts = []
+
+    def unreachable(address, *args, **kwargs):
+        attempts.append(address)
+        raise socket.timeout('timed out')
+
+    monkeypatch.setattr(urllib3.util.connection, 'create_connection', unreachable)
+    llm = make_llm('http://llm.invalid/api/v1', LLM_HTTP_RETRIES=1)
+
+    with pytest.raises(requests.exceptions.ConnectTimeout):
+        llm.invoke('prompt')
+    assert len(attempts) == 2
+
+
+class TrickleBody(io.BytesIO):
+    """Response body that arrives a few bytes at a time, splitting lines across network reads."""
+
+    def read(self, size=-1):
+        return super().read(7)
+
+
+class CannedStreamAdapter(BaseAdapter):
+    """Answer every request with a fixed Server-Sent Events body."""
+
+    def __init__(self, body, status=200):
+        super().__init__()
+        self.body = body
+        self.status = status
+        self.sent = []
+
+    def send(self, request, **kwargs):
+        self.sent.append((json.loads(request.body), kwargs))
+        response = requests.Response()
+        response.status_code = self.status
+        response.headers['Content-Type'] = 'text/event-stream'
+        response.encoding = 'utf-8'
+        response.raw = TrickleBody(self.body.encode())
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def canned_llm(body, status=200):
+    adapter = CannedStreamAdapter(body, status)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    return OpenRouterLLM(api_key='test-key', base_url='https://llm.test/api/v1', model='test/model',
+                         session=session), adapter
+
+
+def delta(text):
+    return 'data: ' + json.dumps({'choices': [{'delta': {'content': text}}]}) + '\n\n'
+
+
+def test_stream_yields_deltas_across_split_reads():
+    body = (
+        ': OPENROUTER PROCESSING\n\n'
+        + delta('Hel') + delta('lo, ') + delta('wörld')
+        + 'data: ' + json.dumps({'choices': [{'delta': {'role': 'assistant'}}]}) + '\n\n'
+        + 'data: ' + json.dumps({'choices': [{'delta': {}, 'finish_reason': 'stop'}]}) + '\n\n'
+        + 'data: [DONE]\n\n'
+    )
+    llm, adapter = canned_llm(body)
+
+    assert list(llm.stream('prompt')) == ['Hel', 'lo, ', 'wörld']
+    payload, kwargs = adapter.sent[0]
+    assert payload['stream'] is True
+    assert kwargs['stream'] is True
+
+
+def test_stream_skips_keep_alives_and_stops_at_done():
+    body = (
+        '\n: keep-alive\n\n'
+        + 'event: message\r\n' + delta('a').replace('\n\n', '\r\n\r\n')
+        + ':\n\n'
+        + 'data:' + json.dumps({'choices': [{'delta': {'content': 'b'}}]}) + '\n\n'
+        + 'data: [DONE]\n\n'
+        + delta('after done')
+    )
+    llm, _ = canned_llm(body)
+
+    assert list(llm.stream('prompt')) == ['a', 'b']
+
+
+def test_error_event_mid_stream_raises_after_earlier_tokens():
+    body = delta('partial') + 'data: ' + json.dumps({'error': {'code': 502, 'message': 'upstream died'}}) + '\n\n'
+    llm, _ = canned_llm(body)
+
+    tokens = []
+    with pytest.raises(RuntimeError, match='upstream died'):
+        for token in llm.stream('prompt'):
+            tokens.append(token)
+    assert tokens == ['partial']
+
+
+def test_stream_raises_http_errors_before_reading():
+    llm, _ = canned_llm('', status=429)
+
+    with pytest.raises(requests.HTTPError, match='429'):
+        list(llm.stream('prompt'))
+
+
+def test_fallback_stream_switches_only_before_the_first_token():
+    limited, _ = canned_llm('', status=429)
+    backup, _ = canned_llm(delta('from backup') + 'data: [DONE]\n\n')
+    assert list(FallbackLLM(limited, backup).stream('prompt')) == ['from backup']
+
+    broken, _ = canned_llm(delta('partial') + 'data: ' + json.dumps({'error': 'rate limit'}) + '\n\n')
+    with pytest.raises(RuntimeError, match='rate limit'):
+        list(FallbackLLM(broken, backup).stream('prompt'))
@@ -0,0 +1,36 @@
+import io
+
+import pytest
+
+from services.output_checker import check_output
+
+
+@pytest.mark.parametrize('mode, expected, actual, passed', [
+    ('exact', '1 2\n3\n', '1 2\n3\n', True),
+    ('exact', '1 2\n3\n', '1 2\n3', False),
+    ('whitespace', '1 2\n3\n', '1 2  \n3\n\n', True),
+    ('whitespace', '1 2\n3\n', '1\n2 3\n', False),
+    ('token', '1 2\n3\n', '1  2 3', True),
+    ('token', '1 2 3', '1 2', False),
+    ('float', '0.333333 2', '0.3333331\n2.0', True),
+    ('float', '0.5', '0.51', False),
+    ('unordered', 'b\na\na\n', 'a\nb\na', True),
+    ('unordered', 'a\nb\n', 'a\na\n', False),
+])
+def test_modes(mode, expected, actual, passed):
+    assert check_output(expected, actual, mode)['passed'] is passed
+
+
+def test_streams_split_across_chunks_and_files():
+    expected = io.BytesIO('héllo wörld\n'.encode() * 1000)
+    # Chunks split inside tokens and inside multi-byte characters.
+    data = 'héllo wörld\n'.encode() * 1000
+    actual = (data[i:i + 7] for i in range(0, len(data), 7))
+
+    assert check_output(expected, actual, 'token')['passed']
+
+
+def test_first_difference_is_reported():
+    result = check_output('1\n2\n3\n', '1\n2\n4\n', 'exact')
+
+    assert result == {'passed': False, 'message': "Line 3: expected '3', got '4'"}
@@ -0,0 +1,26 @@
+import threading
+
+from services.pch import PrecompiledHeaders, leading_includes
+
+
+def test_leading_includes_stops_at_first_code_line():
+    code = '#include <stdio.h>\n// helpers\n\n#include <string.h>\nint main() { return 0; }\n#include <math.h>\n'
+
+    assert leading_includes(code) == ('stdio.h', 'string.h')
+    assert leading_includes('#define N 10\n#include <stdio.h>\nint main() {}\n') is None
+    assert leading_includes('#include "local.h"\nint main() {}\n') is None
+
+
+def test_precompiled_header_is_built_after_repeated_use(tmp_path):
+    pch = PrecompiledHeaders(str(tmp_path), max_entries=2, min_uses=2)
+    code = '#include <stdio.h>\nint main() { puts("hi"); return 0; }\n'
+
+    assert pch.args_for('c', code, ['gcc'], 'test') == []
+    assert pch.args_for('c', code, ['gcc'], 'test') == []
+    for thread in threading.enumerate():
+        if thread.name == 'pch-build':
+            thread.join()
+
+    args = pch.args_for('c', code, ['gcc'], 'test')
+    assert args[0] == '-include'
+    assert pch.stats()['ready'] == 1
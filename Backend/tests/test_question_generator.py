@@ -0,0 +1,19 @@
+from types import SimpleNamespace
+
+import services.question_generator as question_generator
+from services.question_generator import generate_dsa_questions
+
+QUESTION = 'Title: Pair Sum\nDifficulty: Easy\n# Problem Statement\nFind a pair.\n## Examples\n'
+
+
+def test_one_malformed_reply_fails_only_its_topic(monkeypatch):
+    replies = {'arrays': SimpleNamespace(content=QUESTION), 'graphs': SimpleNamespace(content=None),
+               'trees': RuntimeError('429 rate limited')}
+    monkeypatch.setattr(question_generator, 'invoke_many',
+                        lambda prompts, return_exceptions: [replies[topic] for topic in ('arrays', 'graphs', 'trees')])
+
+    arrays, graphs, trees = generate_dsa_questions(['arrays', 'graphs', 'trees'])
+
+    assert arrays['title'] == 'Pair Sum'
+    assert isinstance(graphs, TypeError)
+    assert isinstance(trees, RuntimeError)
@@ -0,0 +1,73 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from services.execution_pool import ExecutionPool, ExecutionPoolFull
+from services.single_flight import SingleFlight, SingleFlightTimeout
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def compile_once():
+        calls.append(1)
+        release.wait(5)
+        return {'result': 'Success'}
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(flight.do, 'key', compile_once) for _ in range(4)]
+        while flight.stats()['coalesced'] < 3:
+            time.sleep(0.01)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert len(calls) == 1
+    assert all(result == {'result': 'Success'} for result in results)
+    assert flight.stats() == {'in_flight': 0, 'executions': 1, 'coalesced': 3, 'wait_timeouts': 0}
+
+
+def test_flood_of_identical_calls_respects_admission_limit():
+    pool = ExecutionPool(max_concurrency=1, max_queue=2)
+    flight = SingleFlight(admit=pool.reserve)
+    release = threading.Event()
+    calls = []
+
+    def compile_once():
+        calls.append(1)
+        release.wait(5)
+        return 'done'
+
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        futures = [executor.submit(flight.do, 'key', pool.run, compile_once) for _ in range(10)]
+        # The leader's job plus two waiters fill the pool; everyone else is turned away at once.
+        while pool.stats()['rejected'] < 7:
+            time.sleep(0.01)
+        assert pool.stats()['reserved'] == 2
+        release.set()
+        outcomes = [future.exception() or future.result() for future in futures]
+
+    assert len(calls) == 1
+    assert outcomes.count('done') == 3
+    assert sum(isinstance(outcome, ExecutionPoolFull) for outcome in outcomes) == 7
+    assert pool.stats()['queue_depth'] == 0
+
+
+def test_waiting_caller_gives_up_after_timeout():
+    flight = SingleFlight(wait_timeout=0.05)
+    release = threading.Event()
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(flight.do, 'key', lambda: release.wait(5) and 'done')
+        while flight.stats()['in_flight'] == 0:
+            time.sleep(0.01)
+        with pytest.raises(SingleFlightTimeout) as excinfo:
+            flight.do('key', lambda: 'not run')
+        release.set()
+
+    assert excinfo.value.retry_after >= 1
+    assert leader.result() == 'done'
+    assert flight.stats()['wait_timeouts'] == 1
@@ -0,0 +1,95 @@
+import json
+import os
+
+import pytest
+
+# Importing the app starts these in the background; neither is needed here.
+os.environ['EXECUTION_WARMUP'] = 'false'
+os.environ['INTERACTIVE_ENABLED'] = 'false'
+
+import app as backend  # noqa: E402
+import config.config as llm_config  # noqa: E402
+from tests.test_openrouter import canned_llm, delta  # noqa: E402
+
+ASK_HELP = {
+    'message': 'Why does this loop never end?',
+    'language': 'python',
+    'problemDescription': 'Sum an array.',
+    'problemTopic': 'arrays',
+}
+
+
+def parse_events(body):
+    events = []
+    for block in body.split('\n\n'):
+        if not block:
+            continue
+        fields = dict(line.split(': ', 1) for line in block.split('\n'))
+        events.append((fields['event'], json.loads(fields['data'])))
+    return events
+
+
+@pytest.fixture
+def client():
+    backend.app.config['TESTING'] = True
+    backend.limiter.enabled = False
+    yield backend.app.test_client()
+    backend.limiter.enabled = True
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    """Serve the shared LLM from a canned event stream."""
+    def use(body):
+        llm, adapter = canned_llm(body)
+        monkeypatch.setattr(llm_config, '_llm', llm)
+        return adapter
+
+    return use
+
+
+def test_ask_help_stream_sends_tokens_then_the_blocking_response(client, provider):
+    provider(': OPENROUTER PROCESSING\n\n' + delta('Check ') + delta('the index.') + 'data: [DONE]\n\n')
+
+    response = client.post('/api/ask-help-to-ai/stream', json=ASK_HELP)
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    assert response.headers['Cache-Control'] == 'no-cache'
+    assert response.headers['X-Accel-Buffering'] == 'no'
+    events = parse_events(response.get_data(as_text=True))
+    assert events[:2] == [('token', {'text': 'Check '}), ('token', {'text': 'the index.'})]
+    assert events[2][0] == 'done'
+    assert events[2][1]['status'] == 'success'
+    assert 'Check the index.' in events[2][1]['output']
+    assert len(events) == 3
+
+
+def test_provider_error_mid_stream_becomes_an_error_event(client, provider):
+    provider(delta('Check ') + 'data: ' + json.dumps({'error': {'message': 'upstream died'}}) + '\n\n')
+
+    response = client.post('/api/ask-help-to-ai/stream', json=ASK_HELP)
+
+    assert response.status_code == 200
+    events = parse_events(response.get_data(as_text=True))
+    assert events[0] == ('token', {'text': 'Check '})
+    assert events[1][0] == 'error'
+    assert 'upstream died' in events[1][1]['message']
+    assert len(events) == 2
+
+
+def test_invalid_stream_request_is_rejected_before_streaming(client, provider):
+    adapter = provider('data: [DONE]\n\n')
+
+    response = client.post('/api/ask-help-to-ai/stream', json={'message': 'hi'})
+
+    assert response.status_code == 400
+    assert response.mimetype == 'application/json'
+    assert adapter.sent == []
+
+
+def test_importing_the_app_leaves_warmup_and_the_interactive_port_alone():
+    assert backend.warmup.stats()['message'] == 'Warm-up disabled'
+    assert backend.warmup.ready.is_set()
+    assert backend.interactive_server.stats()['reason'] == 'disabled'
+    assert not backend.interactive_server.stats()['available']
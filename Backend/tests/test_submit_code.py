@@ -0,0 +1,45 @@
+import threading
+
+import pytest
+
+import services.submitCode as submit_module
+from services.execution_pool import ExecutionPool, ExecutionPoolFull
+from services.submitCode import submit_code
+
+REFERENCE = 'a, b = map(int, input().split())\nprint(a + b)\n'
+JUDGE_ARGUMENTS = {
+    'actualSolution': REFERENCE,
+    'description': 'Add two numbers.',
+    'typedSolution': REFERENCE,
+    'typedLanguage': 'python',
+    'testcases': [{'input': '1 2', 'expected_output': '3'}],
+    'mode': 'judge',
+}
+
+
+def test_judge_narrative_is_written_after_the_execution_slot_is_released(monkeypatch):
+    pool = ExecutionPool(max_concurrency=1, max_queue=0)
+    monkeypatch.setattr(submit_module, 'execution_pool', pool)
+    seen = {}
+
+    def narrative(actualSolution, description, typedSolution, judge):
+        seen['running'] = pool.stats()['running']
+        seen['thread'] = threading.current_thread().name
+        return '## 🧩 Logical Correctness'
+
+    monkeypatch.setattr(submit_module, '_build_narrative', narrative)
+
+    result = submit_code(**JUDGE_ARGUMENTS, narrative=True)
+
+    assert result['status'] == 'Accepted'
+    assert pool.stats()['completed'] == 1
+    assert seen == {'running': 0, 'thread': threading.current_thread().name}
+
+
+def test_judge_submission_raises_when_the_execution_pool_is_full(monkeypatch):
+    pool = ExecutionPool(max_concurrency=1, max_queue=0)
+    monkeypatch.setattr(submit_module, 'execution_pool', pool)
+
+    with pool.reserve():
+        with pytest.raises(ExecutionPoolFull):
+            submit_code(**JUDGE_ARGUMENTS)
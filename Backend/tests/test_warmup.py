@@ -0,0 +1,27 @@
+from services.warmup import Warmup
+
+
+def test_disabled_warmup_is_ready_immediately():
+    warmup = Warmup(enabled=False)
+
+    assert warmup.ready.is_set()
+    assert warmup.stats()['message'] == 'Warm-up disabled'
+
+
+def test_default_warmup_reads_its_flag_when_started(monkeypatch):
+    warmup = Warmup()
+    monkeypatch.setenv('EXECUTION_WARMUP', 'false')
+
+    warmup.start()
+
+    assert warmup.ready.is_set()
+    assert warmup.stats()['message'] == 'Warm-up disabled'
+
+
+def test_warm_language_compiles_and_runs_once():
+    warmup = Warmup(enabled=True)
+
+    outcome = warmup._warm_language('python')
+
+    assert outcome['ready'] is True
+    assert not warmup.ready.is_set()
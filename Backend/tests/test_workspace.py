@@ -0,0 +1,42 @@
+import os
+import time
+
+from services.codeCompiler import compile_code
+from services.workspace import WorkspaceManager, workspace_manager
+
+
+def test_workspace_is_removed_after_use_and_on_error(tmp_path):
+    manager = WorkspaceManager(str(tmp_path), max_age=600, sweep_interval=3600)
+
+    with manager.workspace() as workspace:
+        open(os.path.join(workspace, 'main.c'), 'w').close()
+    try:
+        with manager.workspace() as failed:
+            raise RuntimeError('boom')
+    except RuntimeError:
+        pass
+
+    assert not os.path.exists(workspace)
+    assert not os.path.exists(failed)
+    assert manager.stats()['active'] == 0
+
+
+def test_sweep_removes_only_stale_workspaces(tmp_path):
+    manager = WorkspaceManager(str(tmp_path), max_age=60, sweep_interval=3600)
+    stale = tmp_path / 'run-stale'
+    fresh = tmp_path / 'run-fresh'
+    stale.mkdir()
+    fresh.mkdir()
+    old = time.time() - 120
+    os.utime(stale, (old, old))
+
+    assert manager.sweep() == 1
+    assert not stale.exists()
+    assert fresh.exists()
+
+
+def test_javascript_run_leaves_no_files_behind():
+    result = compile_code('console.log("clean")', 'javascript')
+
+    assert result['result'] == 'Success'
+    assert not any(name.startswith('run-') for name in os.listdir(workspace_manager.root))